@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Company Search Benchmark
+
+Creates the schema from database_schema.py in a scratch database, fills it
+with synthetic companies (names, standard names and aliases), and times the
+company_search.py lookups: short prefixes, substrings, whole words and
+full-text queries taken from the generated names. For comparison, the
+substring lookups are repeated with index scans disabled, which is what the
+previous btree-only schema amounted to for ILIKE '%q%'.
+
+The database at --database-url is wiped, so point it at a scratch database.
+
+Usage: python benchmarks/bench_company_search.py --database-url postgresql://localhost/bds_bench
+           [--companies 100000] [--queries 200]
+"""
+
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import logging
+logging.disable(logging.INFO)
+
+from company_search import search_companies, suggest_companies
+from database_schema import create_database_schema
+
+SUFFIXES = ['Inc', 'Ltd', 'Group', 'Holdings', 'Systems', 'Industries', 'Technologies', '']
+
+
+def _word(rng: random.Random) -> str:
+    syllables = [rng.choice('bcdfghklmnprstvz') + rng.choice('aeiou') for _ in range(rng.randint(2, 4))]
+    return ''.join(syllables).capitalize()
+
+
+def generate_companies(count: int, seed: int = 7):
+    """Synthetic (id, name, standard_name, aliases) tuples over a shared vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = list({_word(rng) for _ in range(count // 5 + 100)})
+    companies = []
+    for n in range(count):
+        words = rng.sample(vocabulary, rng.randint(1, 3))
+        name = ' '.join(words + [rng.choice(SUFFIXES)]).strip()
+        standard_name = f"{name} {rng.choice(['Corporation', 'Limited', 'PLC'])}" if rng.random() < 0.3 else None
+        aliases = [' '.join(rng.sample(vocabulary, 2))] if rng.random() < 0.3 else []
+        companies.append((f'company-{n}', name, standard_name, aliases))
+    return companies
+
+
+def load(conn, companies):
+    """COPY the companies and their aliases, then ANALYZE"""
+    cursor = conn.cursor()
+    companies_buffer = io.StringIO()
+    aliases_buffer = io.StringIO()
+    for company_id, name, standard_name, aliases in companies:
+        companies_buffer.write(f"{company_id}\t{name}\t{standard_name or chr(92) + 'N'}\t"
+                               f"{' '.join(aliases) or chr(92) + 'N'}\n")
+        for alias in aliases:
+            aliases_buffer.write(f"{company_id}\t{alias}\n")
+    companies_buffer.seek(0)
+    aliases_buffer.seek(0)
+    cursor.copy_expert("COPY companies (id, name, standard_name, aliases_text) FROM STDIN", companies_buffer)
+    cursor.copy_expert("COPY company_aliases (company_id, alias) FROM STDIN", aliases_buffer)
+    conn.commit()
+    conn.autocommit = True
+    cursor.execute("ANALYZE companies")
+    cursor.execute("ANALYZE company_aliases")
+    cursor.close()
+
+
+def query_sets(companies, count: int, seed: int = 11):
+    """Query strings of each kind, cut from random company names"""
+    rng = random.Random(seed)
+    names = [c[1] for c in rng.sample(companies, count)]
+    substrings = []
+    for name in names:
+        start = rng.randrange(max(1, len(name) - 4))
+        substrings.append(name[start:start + 4])
+    return {
+        'prefix 2 chars': [name[:2] for name in names],
+        'prefix 4 chars': [name[:4] for name in names],
+        'substring 4 chars': substrings,
+        'whole word': [name.split()[0] for name in names],
+    }
+
+
+def timed_lookups(func, cursor, queries):
+    """Per-query latencies in ms, and the mean number of results"""
+    latencies = []
+    results = 0
+    for query in queries:
+        start = time.perf_counter()
+        results += len(func(cursor, query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results / len(queries)
+
+
+def report(label, latencies, results):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<36} {statistics.median(latencies):>9.3f} {p95:>9.3f} {results:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', required=True, help="Scratch Postgres (its tables are dropped)")
+    parser.add_argument('--companies', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200, help="Queries of each kind")
+    args = parser.parse_args()
+
+    create_database_schema(args.database_url)
+    companies = generate_companies(args.companies)
+    conn = psycopg2.connect(args.database_url)
+    start = time.perf_counter()
+    load(conn, companies)
+    print(f"Loaded {len(companies)} companies in {time.perf_counter() - start:.1f}s")
+
+    cursor = conn.cursor()
+    queries = query_sets(companies, args.queries)
+    print(f"{'lookup (limit 10)':<36} {'median ms':>9} {'p95 ms':>9} {'results':>8}")
+    for kind, kind_queries in queries.items():
+        report(f"suggest: {kind}", *timed_lookups(suggest_companies, cursor, kind_queries))
+    report("full text: whole word", *timed_lookups(search_companies, cursor, queries['whole word']))
+
+    # The same substring lookups without the new indexes
+    cursor.execute("SET enable_bitmapscan = off")
+    cursor.execute("SET enable_indexscan = off")
+    baseline = queries['substring 4 chars'][:max(1, args.queries // 10)]
+    report("suggest: substring, no index scans", *timed_lookups(suggest_companies, cursor, baseline))
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Entity Resolution Benchmark
+
+Times FuzzyEntityResolver on synthetic company names of growing size to show
+that the time per company levels off as the number of companies grows, unlike
+an all-pairs comparison.
+
+Usage: python benchmarks/bench_entity_resolution.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from entity_resolver import FuzzyEntityResolver
+from name_normalizer import normalize_many
+
+WORDS = [
+    'global', 'capital', 'systems', 'energy', 'partners', 'holdings', 'technologies',
+    'international', 'industries', 'networks', 'solutions', 'ventures', 'resources',
+    'logistics', 'security', 'defense', 'medical', 'financial', 'foods', 'motors'
+]
+SUFFIXES = ['', ' Inc', ' Ltd.', ' Corporation', ' Group', ' LLC']
+
+
+def synthetic_names(count: int, duplicate_rate: float, seed: int = 42):
+    """Generate company names where a fraction are misspelled copies of earlier ones"""
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        if names and rng.random() < duplicate_rate:
+            # Near-duplicate: drop or swap a single character of an existing name
+            base = list(rng.choice(names))
+            i = rng.randrange(len(base))
+            if rng.random() < 0.5:
+                del base[i]
+            else:
+                base[i] = rng.choice(string.ascii_lowercase)
+            names.append(''.join(base))
+        else:
+            stem = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))).title()
+            names.append(f"{stem} {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}{rng.choice(SUFFIXES)}")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000, 100000])
+    parser.add_argument('--threshold', type=float, default=0.9)
+    parser.add_argument('--duplicate-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"{'companies':>10} {'seconds':>9} {'us/company':>11} {'comparisons':>12} {'cmp/company':>12} {'clusters':>9}")
+    for size in args.sizes:
+        names = normalize_many(synthetic_names(size, args.duplicate_rate))
+        resolver = FuzzyEntityResolver(args.threshold)
+
+        start = time.perf_counter()
+        clusters = resolver.find_clusters(names)
+        elapsed = time.perf_counter() - start
+
+        print(f"{size:>10} {elapsed:>9.3f} {elapsed / size * 1e6:>11.1f} "
+              f"{resolver.comparisons:>12} {resolver.comparisons / size:>12.2f} {len(clusters):>9}")
+
+
+if __name__ == "__main__":
+    main()
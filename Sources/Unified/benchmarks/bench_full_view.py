@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Full View Read Benchmark
+
+Times reads of the plain companies_full_view against the materialized
+companies_full_materialized on a loaded database: full scans, and lookups of
+random companies by id. Also times a plain and a concurrent refresh of the
+materialized view.
+
+Usage: python benchmarks/bench_full_view.py --database-url postgresql://localhost/bds_bench
+           [--lookups 200] [--scans 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from database_schema import FULL_VIEW, FULL_VIEW_MATERIALIZED
+
+
+def timed(cursor, sql, params=None):
+    start = time.perf_counter()
+    cursor.execute(sql, params)
+    if cursor.description is not None:
+        cursor.fetchall()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', required=True,
+                        help="Postgres loaded by unify_data.py (schema from database_schema.py)")
+    parser.add_argument('--lookups', type=int, default=200, help="Random companies looked up by id")
+    parser.add_argument('--scans', type=int, default=3, help="Full scans per view")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.database_url)
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT id FROM companies ORDER BY random() LIMIT %s", (args.lookups,))
+    ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT count(*) FROM companies")
+    print(f"Companies: {cursor.fetchone()[0]}")
+
+    print(f"{'view':>30} {'full scan ms':>13} {'by id ms':>9}")
+    for view in (FULL_VIEW, FULL_VIEW_MATERIALIZED):
+        scan = sum(timed(cursor, f"SELECT * FROM {view}") for _ in range(args.scans)) / args.scans
+        lookup = sum(timed(cursor, f"SELECT * FROM {view} WHERE id = %s", (i,)) for i in ids) / max(1, len(ids))
+        print(f"{view:>30} {scan * 1000:>13.1f} {lookup * 1000:>9.2f}")
+
+    refresh = timed(cursor, f"REFRESH MATERIALIZED VIEW {FULL_VIEW_MATERIALIZED}")
+    concurrent = timed(cursor, f"REFRESH MATERIALIZED VIEW CONCURRENTLY {FULL_VIEW_MATERIALIZED}")
+    print(f"Refresh: {refresh * 1000:.1f} ms, concurrently: {concurrent * 1000:.1f} ms")
+
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Involvement Classifier Benchmark
+
+Classifies the AFSC summaries, Boycott.thewitness reasons and Who Profits
+involvement fields of the current sources (repeated --repeat times, or
+synthetic texts with --synthetic N) with the compiled classifier, with and
+without its memo cache, and with one substring check per keyword as the
+loaders used to do.
+
+Usage: python benchmarks/bench_involvement_classifier.py [--repeat 20] [--synthetic 100000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from involvement_classifier import DEFAULT_TAXONOMY, InvolvementClassifier
+
+SOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+
+def load_texts():
+    """Free texts the loaders classify, from the current source files"""
+    texts = []
+    with open(os.path.join(SOURCES_DIR, 'investigate.afsc.org', 'investigate-dataset-july-2025.csv'),
+              encoding='utf-8') as f:
+        texts.extend(row.get('Summary', '') for row in csv.DictReader(f))
+    with open(os.path.join(SOURCES_DIR, 'boycott.thewitness', 'sample_output.json'), encoding='utf-8') as f:
+        texts.extend(b.get('reason', '') for b in json.load(f).get('sample_enhanced_brands', []))
+    with open(os.path.join(SOURCES_DIR, 'dontbuyintooccupation.org', 'output', 'who_profits_results_latest.json'),
+              encoding='utf-8') as f:
+        for company in json.load(f).get('results', {}).values():
+            texts.extend(m.get('involvement', '') for m in company.get('matches', []))
+    return texts
+
+
+def synthetic_texts(count: int, seed: int = 7):
+    """Distinct summary-length texts, a quarter of them mentioning a keyword"""
+    rng = random.Random(seed)
+    keywords = [k for entry in DEFAULT_TAXONOMY.values() for k in entry['keywords']]
+    filler = 'the company provides services and equipment to customers in several regions'.split()
+    texts = []
+    for n in range(count):
+        words = rng.choices(filler, k=60) + [str(n)]
+        if rng.random() < 0.25:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        texts.append(' '.join(words))
+    return texts
+
+
+def per_keyword(texts):
+    """One lowercase pass plus one substring scan per keyword and text"""
+    taxonomy = [(t, entry['keywords']) for t, entry in DEFAULT_TAXONOMY.items()]
+    results = []
+    for text in texts:
+        lowered = text.lower()
+        results.append(tuple(t for t, keywords in taxonomy if any(k in lowered for k in keywords)))
+    return results
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help="Times the source texts are classified")
+    parser.add_argument('--synthetic', type=int, default=0, help="Classify N distinct synthetic texts instead")
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.synthetic) if args.synthetic else load_texts() * args.repeat
+    print(f"Texts: {len(texts)} ({len(set(texts))} distinct)")
+
+    baseline, baseline_time = timed(lambda: per_keyword(texts))
+
+    uncached = InvolvementClassifier(cache_size=0)
+    compiled, compiled_time = timed(lambda: uncached.classify_many(texts))
+    cached = InvolvementClassifier()
+    memoized, memoized_time = timed(lambda: cached.classify_many(texts))
+
+    assert [r.types for r in compiled] == baseline == [r.types for r in memoized]
+
+    print(f"{'method':>22} {'seconds':>9} {'texts/sec':>12}")
+    for name, elapsed in (('substring per keyword', baseline_time), ('compiled pattern', compiled_time),
+                          ('compiled + memo', memoized_time)):
+        print(f"{name:>22} {elapsed:>9.3f} {len(texts) / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
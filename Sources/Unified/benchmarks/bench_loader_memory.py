@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Loader Peak Memory Benchmark
+
+Writes a synthetic AFSC Investigate shaped CSV of a given size and measures
+the peak RSS of loading it in a fresh process: materializing every record
+in a list (the old loader behaviour) versus streaming records from the
+generator, with and without merging them into a DataUnifier.
+
+Usage: python benchmarks/bench_loader_memory.py [--size-mb 2048] [--unique-companies 5000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+AFSC_COLUMNS = [
+    'Company Short Name', 'Company Standard Name', 'Country of HQ', 'Primary Symbol',
+    'Primary Exchange Short', 'Primary Exchange Name', 'Industry', 'Primary ISIN',
+    'Summary', 'Divestment Shortlist', 'Prisons', 'Occupations', 'Borders', 'Link'
+]
+MODES = ['list', 'stream', 'unify']
+
+
+def write_afsc_csv(path: str, size_mb: int, unique_companies: int, seed: int = 7) -> int:
+    """Write AFSC-shaped rows until the file reaches size_mb, returning the row count"""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(AFSC_COLUMNS)
+        while f.tell() < target:
+            n = rng.randrange(unique_companies)
+            writer.writerow([
+                f'Company {n}', f'Company {n} Holdings Inc', rng.choice(['USA', 'Israel', 'Germany']),
+                f'C{n % 10000:04d}', 'NYSE', 'NEW YORK STOCK EXCHANGE, INC.', 'Industrials',
+                f'US{n:010d}',
+                f'Company {n} supplies military equipment and settlement infrastructure. ' * 4,
+                rng.choice(['', '1']), rng.choice(['', '1']), rng.choice(['', '1']), rng.choice(['', '1']),
+                f'https://investigate.info/company/company-{n}'
+            ])
+            rows += 1
+    return rows
+
+
+def run_child(mode: str, path: str):
+    """Load the file in the requested mode and print peak RSS in MB"""
+    import logging
+    logging.disable(logging.INFO)
+    from unify_data import DataUnifier
+
+    unifier = DataUnifier(tempfile.mkdtemp())
+    start = time.perf_counter()
+    if mode == 'list':
+        records = list(unifier.load_afsc_investigate_csv(path))
+        count = len(records)
+    elif mode == 'stream':
+        count = sum(1 for _ in unifier.load_afsc_investigate_csv(path))
+    else:
+        unifier._add_records(unifier.load_afsc_investigate_csv(path))
+        count = len(unifier.unified_data)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{peak_mb:.1f} {elapsed:.2f} {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=2048)
+    parser.add_argument('--unique-companies', type=int, default=5000)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'afsc_synthetic.csv')
+        rows = write_afsc_csv(path, args.size_mb, args.unique_companies)
+        print(f"Synthetic AFSC CSV: {os.path.getsize(path) / 1024 / 1024:.0f} MB, {rows} rows, "
+              f"{args.unique_companies} unique companies")
+        print(f"{'mode':>8} {'peak RSS MB':>12} {'seconds':>9} {'records':>9}")
+        for mode in MODES:
+            output = subprocess.run([sys.executable, __file__, '--child', mode, path],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            peak_mb, elapsed, count = output
+            print(f"{mode:>8} {float(peak_mb):>12.1f} {float(elapsed):>9.2f} {int(count):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Record Memory Benchmark
+
+Loads the real sources (or the synthetic ones written by
+bench_unify_pipeline.py, with --sources-dir) and measures the traced memory
+per record of keeping them as the loaders' dicts versus as CompanyRecord
+objects with interned strings, then the memory held by a full unification.
+
+Usage: python benchmarks/bench_record_memory.py [--sources-dir DIR]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+logging.disable(logging.WARNING)
+
+from company_record import CompanyRecord
+from unify_data import DataUnifier
+
+SOURCES = [
+    ('load_bds_coalition_csv', os.path.join('bdscoalition.ca', 'BDS Shame List (20AUG2025).csv')),
+    ('load_afsc_investigate_csv', os.path.join('investigate.afsc.org', 'investigate-dataset-july-2025.csv')),
+    ('load_boycott_thewitness_json', os.path.join('boycott.thewitness', 'sample_output.json')),
+    ('load_who_profits_json', os.path.join('dontbuyintooccupation.org', 'output', 'who_profits_results_latest.json')),
+]
+
+
+def traced(build):
+    """Return (result, bytes still allocated by build())"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sources-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    args = parser.parse_args()
+
+    unifier = DataUnifier(tempfile.mkdtemp(), trace_memory=False)
+
+    def load_all(convert):
+        records = []
+        for loader_name, path in SOURCES:
+            records.extend(convert(r) for r in getattr(unifier, loader_name)(os.path.join(args.sources_dir, path)))
+        return records
+
+    dicts, dict_bytes = traced(lambda: load_all(lambda r: r))
+    count = len(dicts)
+    del dicts
+    _, object_bytes = traced(lambda: load_all(CompanyRecord.from_dict))
+
+    print(f"Loaded records: {count}")
+    print(f"{'representation':>16} {'total MB':>9} {'bytes/record':>13}")
+    print(f"{'dict':>16} {dict_bytes / 1024 / 1024:>9.2f} {dict_bytes / count:>13.0f}")
+    print(f"{'CompanyRecord':>16} {object_bytes / 1024 / 1024:>9.2f} {object_bytes / count:>13.0f}")
+
+    def unify():
+        unifier.unified_data.clear()
+        unifier.unify_all_sources(args.sources_dir)
+        return unifier.unified_data
+
+    unified, unified_bytes = traced(unify)
+    print(f"Unified companies: {len(unified)}, {unified_bytes / 1024 / 1024:.2f} MB "
+          f"({unified_bytes / len(unified):.0f} bytes/company, including lookup indexes)")
+
+
+if __name__ == "__main__":
+    main()
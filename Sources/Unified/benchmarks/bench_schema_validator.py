@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Schema Validator Throughput Benchmark
+
+Validates synthetic records built from generate_complete_record (a mix of
+valid records and records with common defects) with the generated validator
+and with jsonschema's Draft7Validator, checks that both report exactly the
+same error messages, and prints records/sec for each.
+
+Usage: python benchmarks/bench_schema_validator.py [--records 100000] [--invalid-rate 0.1]
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from schema_validator import BDSSchemaValidator, compile_schema
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unified_schema.json')
+
+
+def _apply_defect(record, rng):
+    """Apply one random defect to a record"""
+    defect = rng.randrange(8)
+    if defect == 0:
+        del record['reasons']
+    elif defect == 1:
+        record['id'] = record['id'].upper()
+    elif defect == 2:
+        record['name'] = ''
+    elif defect == 3:
+        record['aliases'].append(record['aliases'][0])
+    elif defect == 4:
+        record['involvement_types'].append('unknown_type')
+    elif defect == 5:
+        record['stock_symbols'][0]['isin'] = 'not-an-isin'
+    elif defect == 6:
+        record['confidence_score'] = 1.5
+    else:
+        record['divestment_priority'] = 7
+    return record
+
+
+def generate_records(validator: BDSSchemaValidator, count: int, invalid_rate: float, seed: int = 7):
+    rng = random.Random(seed)
+    template = validator.generate_complete_record()
+    records = []
+    for n in range(count):
+        record = copy.deepcopy(template)
+        record['id'] = f'comp_{n}_example'
+        record['name'] = f'Example Corporation {n}'
+        record['aliases'] = [f'Example Corp {n}', f'ExCorp {n}']
+        if rng.random() < invalid_rate:
+            _apply_defect(record, rng)
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--invalid-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    draft7 = BDSSchemaValidator(SCHEMA_PATH, use_compiled=False)
+    records = generate_records(draft7, args.records, args.invalid_rate)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        compile_schema(draft7.schema, cache_dir)
+    compile_ms = (time.perf_counter() - start) * 1000
+    compiled = BDSSchemaValidator(SCHEMA_PATH)
+
+    results = {}
+    for label, validator in (('Draft7Validator', draft7), ('compiled', compiled)):
+        start = time.perf_counter()
+        results[label] = [validator.validate_record(record) for record in records]
+        elapsed = time.perf_counter() - start
+        invalid = sum(1 for is_valid, _ in results[label] if not is_valid)
+        print(f"{label:>16}: {len(records) / elapsed:>10.0f} records/sec "
+              f"({elapsed:.2f}s, {invalid} invalid)")
+
+    mismatches = sum(1 for a, b in zip(results['Draft7Validator'], results['compiled']) if a != b)
+    print(f"Compile time: {compile_ms:.1f} ms; records with differing errors: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Unification Pipeline Benchmark
+
+Generates synthetic BDS Coalition CSV, AFSC Investigate CSV, Boycott.thewitness
+JSON and Who Profits JSON sources for a growing number of companies, with a
+configurable share of companies listed by more than one source, and runs
+DataUnifier.unify_all_sources and validate_and_save on them. Each size runs
+in a fresh process; time and peak memory per stage (from the unifier's
+StageTimer) and the peak RSS are written as JSON so runs can be compared over
+time.
+
+Database writes are disabled unless --database-url points at a (local)
+Postgres with the schema from database_schema.py.
+
+Usage: python benchmarks/bench_unify_pipeline.py [--sizes 1000 10000 100000 1000000]
+           [--duplicate-rate 0.2] [--database-url postgresql://localhost/bds_bench]
+           [--output results.json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Source files at the paths unify_all_sources expects under its base directory
+BDS_COALITION_FILE = os.path.join('bdscoalition.ca', 'BDS Shame List (20AUG2025).csv')
+AFSC_FILE = os.path.join('investigate.afsc.org', 'investigate-dataset-july-2025.csv')
+WITNESS_FILE = os.path.join('boycott.thewitness', 'sample_output.json')
+WHO_PROFITS_FILE = os.path.join('dontbuyintooccupation.org', 'output', 'who_profits_results_latest.json')
+
+# Share of companies whose first listing is in each source
+SOURCE_WEIGHTS = {'bds': 0.6, 'afsc': 0.25, 'witness': 0.1, 'who_profits': 0.05}
+
+# Name variants of a company as listed by a second source; all normalize to the same key
+NAME_VARIANTS = ['{name}', '{name} Inc', '{name} Ltd.', '{name}, LLC', '{upper}']
+
+
+def _company(template, n: int, rng: random.Random):
+    """Derive synthetic company n from the complete example record"""
+    name = f"{template['name']} {n}"
+    return {
+        'name': name,
+        'standard_name': f"{template['standard_name']} {n}",
+        'parent_company': template['parent_company'] if rng.random() < 0.3 else '',
+        'country_hq': rng.choice([template['country_hq'], 'Israel', 'Germany', 'United Kingdom']),
+        'description': f"{template['description']} ({name})",
+        'reason': template['reasons'][0]['details'],
+        'source': f"{template['reasons'][0]['source']}/{n}",
+        'symbol': f"{template['stock_symbols'][0]['symbol']}{n}",
+        'exchange': template['stock_symbols'][0]['exchange'],
+        'isin': f"US{n:010d}",
+        'industry': template['industry'],
+        'sectors': template['sectors'],
+        'boycott_actions': template['boycott_actions'],
+        'alternatives': template['alternatives'],
+    }
+
+
+def _listed_name(company, rng: random.Random) -> str:
+    variant = rng.choice(NAME_VARIANTS)
+    return variant.format(name=company['name'], upper=company['name'].upper())
+
+
+def write_sources(base_dir: str, companies: int, duplicate_rate: float, seed: int = 7):
+    """
+    Write the four synthetic source files
+
+    Args:
+        base_dir: Directory to create the source folders in
+        companies: Number of distinct companies
+        duplicate_rate: Share of companies also listed by a second source
+        seed: Random seed
+
+    Returns:
+        Number of listings written per source
+    """
+    from schema_validator import BDSSchemaValidator
+
+    rng = random.Random(seed)
+    template = BDSSchemaValidator().generate_complete_record()
+    sources = list(SOURCE_WEIGHTS)
+    listings = {source: [] for source in sources}
+
+    for n in range(companies):
+        company = _company(template, n, rng)
+        home = rng.choices(sources, weights=list(SOURCE_WEIGHTS.values()))[0]
+        listings[home].append(dict(company, listed_name=company['name']))
+        if rng.random() < duplicate_rate:
+            other = rng.choice([s for s in sources if s != home])
+            listings[other].append(dict(company, listed_name=_listed_name(company, rng)))
+
+    for folder in (BDS_COALITION_FILE, AFSC_FILE, WITNESS_FILE, WHO_PROFITS_FILE):
+        os.makedirs(os.path.join(base_dir, os.path.dirname(folder)), exist_ok=True)
+
+    with open(os.path.join(base_dir, BDS_COALITION_FILE), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(['Name', 'Description', 'Sources / Links', 'Parent Company', 'Country'])
+        for c in listings['bds']:
+            writer.writerow([c['listed_name'], c['description'], c['source'], c['parent_company'], c['country_hq']])
+
+    with open(os.path.join(base_dir, AFSC_FILE), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Company Short Name', 'Company Standard Name', 'Country of HQ', 'Primary Symbol',
+                         'Primary Exchange Short', 'Primary Exchange Name', 'Industry', 'Primary ISIN',
+                         'Summary', 'Divestment Shortlist', 'Prisons', 'Occupations', 'Borders', 'Link'])
+        for c in listings['afsc']:
+            writer.writerow([c['listed_name'], c['standard_name'], c['country_hq'], c['symbol'], c['exchange'],
+                             c['exchange'], c['industry'], c['isin'], f"{c['description']} {c['reason']}",
+                             rng.choice(['', '1']), rng.choice(['', '1']), rng.choice(['', '1']),
+                             rng.choice(['', '1']), c['source']])
+
+    with open(os.path.join(base_dir, WITNESS_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'sample_enhanced_brands': [{
+            'name': c['listed_name'],
+            'description': c['description'],
+            'reason': c['reason'],
+            'categories': c['sectors'],
+            'how_to_boycott': c['boycott_actions'],
+            'alternatives': c['alternatives'],
+            'source': c['source'],
+        } for c in listings['witness']]}, f)
+
+    with open(os.path.join(base_dir, WHO_PROFITS_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'results': {str(booth): {
+            'company_name': c['listed_name'],
+            'found': True,
+            'matches': [{
+                'company_name': c['listed_name'],
+                'headquarters': c['country_hq'],
+                'involvement': 'Settlement Enterprise|Military Support|',
+            }],
+        } for booth, c in enumerate(listings['who_profits'])}}, f)
+
+    return {source: len(rows) for source, rows in listings.items()}
+
+
+def run_child(base_dir: str, workers: int, trace_memory: bool):
+    """Unify the sources in base_dir and print the run statistics as JSON"""
+    import logging
+    logging.disable(logging.WARNING)
+    from unify_data import DataUnifier
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        unifier = DataUnifier(output_dir, workers=workers, trace_memory=trace_memory)
+        unifier.unify_all_sources(base_dir)
+        unifier.validate_and_save()
+        elapsed = time.perf_counter() - start
+
+    stats = {key: value for key, value in unifier.stats.items() if key != 'stages'}
+    print(json.dumps({
+        'seconds': round(elapsed, 3),
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'stats': stats,
+        'stages': unifier.stats['stages'],
+    }))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--duplicate-rate', type=float, default=0.2,
+                        help="Share of companies listed by a second source (default: 0.2)")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--database-url', default='',
+                        help="Postgres to load into (default: database writes disabled)")
+    parser.add_argument('--no-trace-memory', dest='trace_memory', action='store_false',
+                        help="Skip per-stage tracemalloc peaks (faster, peak RSS only)")
+    parser.add_argument('--output', default=f"unify_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                        help="Results file (default: unify_pipeline_<timestamp>.json)")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--child', nargs=3, metavar=('BASE_DIR', 'WORKERS', 'TRACE_MEMORY'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        base_dir, workers, trace_memory = args.child
+        run_child(base_dir, int(workers), trace_memory == '1')
+        return
+
+    # An empty DATABASE_URL also keeps the unifier from picking one up from .env
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    results = {
+        'generated_at': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'duplicate_rate': args.duplicate_rate,
+        'workers': args.workers,
+        'database': bool(args.database_url),
+        'runs': [],
+    }
+
+    print(f"{'companies':>10} {'listings':>10} {'unified':>10} {'seconds':>9} {'peak RSS MB':>12}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as base_dir:
+            listings = write_sources(base_dir, size, args.duplicate_rate, args.seed)
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', base_dir, str(args.workers), '1' if args.trace_memory else '0'],
+                capture_output=True, text=True, check=True, env=env
+            ).stdout.splitlines()[-1]
+
+        run = dict(json.loads(output), companies=size, listings=listings)
+        results['runs'].append(run)
+        print(f"{size:>10} {sum(listings.values()):>10} {run['stats']['total_records']:>10} "
+              f"{run['seconds']:>9.2f} {run['peak_rss_mb']:>12.1f}")
+        for name, stage in run['stages'].items():
+            memory = f"  peak {stage['peak_memory_mb']:.1f} MB" if stage['peak_memory_mb'] is not None else ""
+            print(f"{'':>12}{name:<32} {stage['wall_seconds']:>8.2f}s{memory}")
+
+        # Keep partial results if a larger size is interrupted
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Columnar Export of the Unified Dataset
+
+This module writes the unified companies and each of their child lists as
+separate Arrow tables, so analysts can load them without parsing nested
+JSON. Parquet files are sorted by company id with row-group statistics for
+predicate pushdown; Arrow IPC files are uncompressed so they can be
+memory-mapped and read with zero copies. Repeated strings are dictionary
+encoded in both formats.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+except ImportError:  # Optional: only needed when an export format is requested
+    pa = None
+
+EXPORT_FORMATS = ('parquet', 'arrow')
+
+PARQUET_ROW_GROUP_SIZE = 65536
+
+INVOLVEMENT_DETAIL_KEYS = ['occupations', 'prisons', 'borders', 'settlements', 'military']
+
+# Child lists of plain strings: record field -> value column name
+STRING_LIST_TABLES = {
+    'sectors': 'sector',
+    'involvement_types': 'involvement_type',
+    'sources': 'source_url',
+    'aliases': 'alias',
+    'data_sources': 'data_source',
+}
+
+
+def _dictionary_string():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def _company_columns(records: Sequence[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Flatten the scalar fields of each company into columns"""
+    columns: Dict[str, List[Any]] = {
+        name: [] for name in [
+            'id', 'name', 'standard_name', 'parent_company', 'country_hq', 'industry',
+            'description', 'booth_number', 'divestment_priority', 'confidence_score',
+            'verification_status', 'last_updated'
+        ]
+    }
+    for key in INVOLVEMENT_DETAIL_KEYS:
+        columns[f'involvement_{key}'] = []
+
+    for record in records:
+        for name, values in columns.items():
+            if name.startswith('involvement_'):
+                values.append(record.get('involvement_details', {}).get(name[len('involvement_'):]))
+            else:
+                values.append(record.get(name))
+    return columns
+
+
+def build_tables(records: Iterable[Dict[str, Any]]) -> Dict[str, 'pa.Table']:
+    """
+    Build the companies table and one table per child list
+
+    Args:
+        records: Validated unified records
+
+    Returns:
+        Tables keyed by name, each sorted by company id
+    """
+    records = sorted(records, key=lambda r: r['id'])
+
+    company_schema = pa.schema(
+        [('id', pa.string()), ('name', pa.string()), ('standard_name', pa.string()),
+         ('parent_company', pa.string()), ('country_hq', _dictionary_string()),
+         ('industry', _dictionary_string()), ('description', pa.string()),
+         ('booth_number', pa.string()), ('divestment_priority', _dictionary_string()),
+         ('confidence_score', pa.float64()), ('verification_status', _dictionary_string()),
+         ('last_updated', pa.string())] +
+        [(f'involvement_{key}', pa.bool_()) for key in INVOLVEMENT_DETAIL_KEYS]
+    )
+    tables = {'companies': pa.table(_company_columns(records), schema=company_schema)}
+
+    stock_symbols = {'company_id': [], 'symbol': [], 'exchange': [], 'isin': []}
+    reasons = {'company_id': [], 'summary': [], 'details': [], 'source': [], 'date_added': []}
+    string_lists = {field: {'company_id': [], column: []} for field, column in STRING_LIST_TABLES.items()}
+
+    for record in records:
+        company_id = record['id']
+        for symbol in record.get('stock_symbols', []):
+            stock_symbols['company_id'].append(company_id)
+            stock_symbols['symbol'].append(symbol['symbol'])
+            stock_symbols['exchange'].append(symbol['exchange'])
+            stock_symbols['isin'].append(symbol.get('isin'))
+        for reason in record.get('reasons', []):
+            reasons['company_id'].append(company_id)
+            for key in ('summary', 'details', 'source', 'date_added'):
+                reasons[key].append(reason.get(key))
+        for field, column in STRING_LIST_TABLES.items():
+            for value in record.get(field, []):
+                string_lists[field]['company_id'].append(company_id)
+                string_lists[field][column].append(value)
+
+    tables['stock_symbols'] = pa.table(stock_symbols, schema=pa.schema([
+        ('company_id', _dictionary_string()), ('symbol', pa.string()),
+        ('exchange', _dictionary_string()), ('isin', pa.string())
+    ]))
+    tables['reasons'] = pa.table(reasons, schema=pa.schema([
+        ('company_id', _dictionary_string()), ('summary', pa.string()), ('details', pa.string()),
+        ('source', _dictionary_string()), ('date_added', pa.string())
+    ]))
+    for field, column in STRING_LIST_TABLES.items():
+        tables[field] = pa.table(string_lists[field], schema=pa.schema([
+            ('company_id', _dictionary_string()), (column, _dictionary_string())
+        ]))
+    return tables
+
+
+def _publish_directory(path: Path, latest_path: Path):
+    """Atomically point the latest_path symlink at path"""
+    tmp_link = latest_path.with_name(f'.{latest_path.name}.tmp')
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    os.symlink(path.name, tmp_link)
+    os.replace(tmp_link, latest_path)
+
+
+def export_columnar(records: Iterable[Dict[str, Any]], output_dir: Path, timestamp: str,
+                    formats: Sequence[str] = EXPORT_FORMATS) -> Path:
+    """
+    Write the unified dataset as Parquet and/or Arrow IPC files
+
+    Args:
+        records: Validated unified records
+        output_dir: Directory for the output files
+        timestamp: Timestamp used in the export directory name
+        formats: Any of "parquet" and "arrow"
+
+    Returns:
+        The unified_bds_columnar_{timestamp} directory holding one file per table and format
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet/Arrow export (pip install pyarrow)")
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export formats: {sorted(unknown)}")
+
+    export_dir = Path(output_dir) / f'unified_bds_columnar_{timestamp}'
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    for name, table in build_tables(records).items():
+        if 'parquet' in formats:
+            pq.write_table(table, export_dir / f'{name}.parquet', compression='zstd',
+                           row_group_size=PARQUET_ROW_GROUP_SIZE, write_statistics=True)
+        if 'arrow' in formats:
+            # Uncompressed so readers can memory-map the file without copying
+            feather.write_feather(table, export_dir / f'{name}.arrow', compression='uncompressed')
+
+    _publish_directory(export_dir, Path(output_dir) / 'unified_bds_columnar_latest')
+    return export_dir
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Compact Company Records
+
+This module defines the in-memory representation of unified companies used
+while merging sources. Records, reasons and stock symbols are slotted
+dataclasses instead of dicts, and their repeated strings (countries,
+industries, source URLs, data source names, descriptions repeated as reason
+details, ...) are interned so each distinct value is stored once.
+
+Records are converted from the loaders' dicts when they enter the unifier
+and back to dicts (the unified schema's JSON form) at the validation,
+database and serialization boundaries.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+
+class _Missing:
+    """Marks a field that was absent from the source dict (distinct from None)"""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'MISSING'
+
+    def __reduce__(self):
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_list(values: Any) -> Any:
+    if isinstance(values, list):
+        return [_intern(v) for v in values]
+    return values
+
+
+def _to_dict(obj) -> Dict[str, Any]:
+    """Fields of a slotted dataclass as a dict, in declaration order, skipping missing ones"""
+    result = {}
+    for name in obj.__slots__:
+        value = getattr(obj, name)
+        if value is not MISSING:
+            result[name] = value
+    return result
+
+
+@dataclass(frozen=True, slots=True)
+class StockSymbol:
+    """A listing of a company on an exchange"""
+
+    symbol: str
+    exchange: str
+    isin: Optional[str] = MISSING
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StockSymbol':
+        return cls(**{key: _intern(value) for key, value in data.items()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class Reason:
+    """Why a source lists a company; hashable so merged reasons can be deduplicated"""
+
+    summary: str
+    details: Optional[str] = MISSING
+    source: Optional[str] = MISSING
+    date_added: Optional[str] = MISSING
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Reason':
+        return cls(**{key: _intern(value) for key, value in data.items()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+
+# Array fields merged as sets (kept in first-seen order), whose order carries no meaning
+UNORDERED_ARRAY_FIELDS = [
+    'aliases', 'sectors', 'involvement_types', 'sources', 'evidence_links',
+    'boycott_actions', 'alternatives', 'campaigns', 'data_sources'
+]
+
+# Fields whose values are unique per company, so interning them saves nothing
+_UNIQUE_FIELDS = ('id', 'name', 'last_updated')
+
+
+@dataclass(slots=True)
+class CompanyRecord:
+    """
+    A unified company, with the fields of the unified schema in schema order
+
+    While records are being merged, the array fields may temporarily hold
+    insertion-ordered sets (dicts) and stock_symbols/reasons maps; finalize()
+    turns them back into lists.
+    """
+
+    id: str
+    name: str
+    standard_name: Optional[str] = MISSING
+    aliases: Union[List[str], Dict[str, None]] = MISSING
+    parent_company: Optional[str] = MISSING
+    country_hq: Optional[str] = MISSING
+    description: Optional[str] = MISSING
+    stock_symbols: Union[List[StockSymbol], Dict[str, StockSymbol]] = MISSING
+    industry: Optional[str] = MISSING
+    sectors: Union[List[str], Dict[str, None]] = MISSING
+    involvement_types: Union[List[str], Dict[str, None]] = MISSING
+    involvement_details: Dict[str, bool] = MISSING
+    divestment_priority: Optional[str] = MISSING
+    booth_number: Optional[str] = MISSING
+    reasons: Union[List[Reason], Dict[Reason, None]] = MISSING
+    sources: Union[List[str], Dict[str, None]] = MISSING
+    evidence_links: Union[List[str], Dict[str, None]] = MISSING
+    boycott_actions: Union[List[str], Dict[str, None]] = MISSING
+    alternatives: Union[List[str], Dict[str, None]] = MISSING
+    campaigns: Union[List[str], Dict[str, None]] = MISSING
+    data_sources: Union[List[str], Dict[str, None]] = MISSING
+    last_updated: str = MISSING
+    confidence_score: float = MISSING
+    verification_status: str = MISSING
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompanyRecord':
+        """
+        Build a record from a loader's (or the unified schema's) dict
+
+        Args:
+            data: Record dict; keys must be fields of the unified schema
+
+        Returns:
+            The record, with repeated strings interned
+        """
+        values = {}
+        for key, value in data.items():
+            if key == 'stock_symbols':
+                value = [StockSymbol.from_dict(s) for s in value]
+            elif key == 'reasons':
+                value = [Reason.from_dict(r) for r in value]
+            elif key in UNORDERED_ARRAY_FIELDS:
+                value = _intern_list(value)
+            elif key not in _UNIQUE_FIELDS:
+                value = _intern(value)
+            values[key] = value
+        return cls(**values)
+
+    def finalize(self) -> 'CompanyRecord':
+        """Convert merge accumulators back to lists (safe to call more than once)"""
+        for field in UNORDERED_ARRAY_FIELDS:
+            values = getattr(self, field)
+            if isinstance(values, dict):
+                setattr(self, field, list(values))
+        if isinstance(self.stock_symbols, dict):
+            self.stock_symbols = list(self.stock_symbols.values())
+        if isinstance(self.reasons, dict):
+            self.reasons = list(self.reasons)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record in the unified schema's JSON form (call finalize() first)"""
+        result = _to_dict(self)
+        if 'stock_symbols' in result:
+            result['stock_symbols'] = [s.to_dict() for s in result['stock_symbols']]
+        if 'reasons' in result:
+            result['reasons'] = [r.to_dict() for r in result['reasons']]
+        return result
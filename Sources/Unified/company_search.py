@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Company Search Queries
+
+This module provides the company lookups behind search boxes and
+autocompletion, written to use the indexes created by
+database_schema.create_search_indexes:
+
+- suggest_companies: prefix matches on name, standard name and aliases from
+  the lower(column) pattern indexes, topped up with substring matches served
+  by the trigram GIN indexes
+- search_companies: full-text search over the generated search_vector column
+"""
+
+from typing import Any, Dict, List
+
+# Shorter queries have no complete trigram, so the trigram indexes cannot narrow them down
+MIN_TRIGRAM_LENGTH = 3
+
+DEFAULT_LIMIT = 10
+
+# Each branch walks one lower(column) text_pattern_ops index in order and stops
+# after %(limit)s rows, so only a few rows are joined and sorted however many
+# names share the prefix. ~<~ is the ordering of text_pattern_ops (byte order).
+_PREFIX_SQL = """
+    SELECT c.id, c.name, c.standard_name
+    FROM (
+        (SELECT id, lower(name) AS matched FROM companies
+         WHERE lower(name) LIKE %(prefix)s ORDER BY lower(name) USING ~<~ LIMIT %(limit)s)
+        UNION ALL
+        (SELECT id, lower(standard_name) FROM companies
+         WHERE lower(standard_name) LIKE %(prefix)s ORDER BY lower(standard_name) USING ~<~ LIMIT %(limit)s)
+        UNION ALL
+        (SELECT company_id, lower(alias) FROM company_aliases
+         WHERE lower(alias) LIKE %(prefix)s ORDER BY lower(alias) USING ~<~ LIMIT %(limit)s)
+    ) m
+    JOIN companies c ON c.id = m.id
+    GROUP BY c.id
+    ORDER BY min(m.matched COLLATE "C"), c.id
+    LIMIT %(limit)s
+"""
+
+# Matches per column taken from the trigram index before ranking. Ranking every
+# match means rechecking thousands of rows for common trigrams; below this many
+# matches the ranking is exact, above it the shortest of the first ones found win.
+SUBSTRING_CANDIDATES = 200
+
+# Each branch stops the index scan after %(candidates)s matches and keeps the
+# %(limit)s shortest of them (shortest names are the closest to the query). The
+# cap is a row_number() condition rather than a LIMIT: under a LIMIT the planner
+# expects to find the matches early and switches to a sequential scan, which
+# reads most of the table for rare substrings (Postgres 15+ stops the window
+# scan at the cap).
+_SUBSTRING_SQL = """
+    SELECT c.id, c.name, c.standard_name
+    FROM companies c
+    WHERE c.id IN (
+        (SELECT id FROM (SELECT id, name AS matched, row_number() OVER () AS n FROM companies
+                         WHERE name ILIKE %(pattern)s) m
+         WHERE n <= %(candidates)s ORDER BY length(matched), matched, id LIMIT %(limit)s)
+        UNION
+        (SELECT id FROM (SELECT id, standard_name AS matched, row_number() OVER () AS n FROM companies
+                         WHERE standard_name ILIKE %(pattern)s) m
+         WHERE n <= %(candidates)s ORDER BY length(matched), matched, id LIMIT %(limit)s)
+        UNION
+        (SELECT id FROM (SELECT company_id AS id, alias AS matched, row_number() OVER () AS n
+                         FROM company_aliases WHERE alias ILIKE %(pattern)s) m
+         WHERE n <= %(candidates)s ORDER BY length(matched), matched, id LIMIT %(limit)s)
+    )
+    ORDER BY length(c.name), c.name, c.id
+    LIMIT %(limit)s
+"""
+
+_SEARCH_SQL = """
+    SELECT c.id, c.name, c.standard_name, ts_rank(c.search_vector, q) AS rank
+    FROM companies c, websearch_to_tsquery('simple', %(query)s) q
+    WHERE c.search_vector @@ q
+    ORDER BY rank DESC, c.name
+    LIMIT %(limit)s
+"""
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fetch_dicts(cursor) -> List[Dict[str, Any]]:
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def suggest_companies(cursor, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Find companies whose name, standard name or an alias contains the query
+
+    Args:
+        cursor: psycopg2 cursor
+        query: Text typed so far (case-insensitive, matched literally)
+        limit: Maximum number of companies returned
+
+    Returns:
+        Dicts with id, name and standard_name: prefix matches in alphabetical
+        order, then substring matches (shortest names first, ties by name).
+        When a column has more than SUBSTRING_CANDIDATES substring matches,
+        only the first ones the index scan finds are ranked
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    escaped = _escape_like(query)
+    cursor.execute(_PREFIX_SQL, {'prefix': f'{escaped.lower()}%', 'limit': limit})
+    results = _fetch_dicts(cursor)
+
+    # Too short for trigrams: only prefixes can be looked up in an index
+    if len(results) < limit and len(query) >= MIN_TRIGRAM_LENGTH:
+        found = {result['id'] for result in results}
+        cursor.execute(_SUBSTRING_SQL, {'pattern': f'%{escaped}%', 'limit': limit + len(found),
+                                        'candidates': max(SUBSTRING_CANDIDATES, limit + len(found))})
+        results.extend(r for r in _fetch_dicts(cursor) if r['id'] not in found)
+    return results[:limit]
+
+
+def search_companies(cursor, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Full-text search over company names, standard names and aliases
+
+    Args:
+        cursor: psycopg2 cursor
+        query: Search terms in web search syntax ("quoted phrases", -excluded, or)
+        limit: Maximum number of companies returned
+
+    Returns:
+        Dicts with id, name, standard_name and rank, best matches first
+    """
+    if not query.strip():
+        return []
+    cursor.execute(_SEARCH_SQL, {'query': query, 'limit': limit})
+    return _fetch_dicts(cursor)
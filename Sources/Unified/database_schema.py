@@ -6,7 +6,10 @@ This script creates the necessary PostgreSQL tables to store unified BDS data.
 """
 
 import os
+import sys
 import logging
+from typing import Optional
+
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
@@ -21,10 +24,160 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def create_database_schema():
-    """Create the database schema for unified BDS data"""
+# Companies with all child lists aggregated to JSON, always current but computed on every read
+FULL_VIEW = 'companies_full_view'
+# The same rows stored, refreshed by the unifier after each load that changes companies
+FULL_VIEW_MATERIALIZED = 'companies_full_materialized'
 
-    database_url = os.getenv('DATABASE_URL')
+# Each child list is aggregated in its own subquery, so a company's rows are
+# not multiplied across child tables as they would be by joining them all.
+# The search columns (aliases_text, search_vector) are left out.
+COMPANIES_FULL_SELECT = """
+    SELECT
+        c.id, c.name, c.standard_name, c.parent_company, c.country_hq,
+        c.industry, c.description, c.booth_number, c.divestment_priority,
+        c.confidence_score, c.verification_status, c.involvement_details,
+        c.last_updated, c.content_hash, c.created_at,
+        COALESCE((
+            SELECT json_agg(
+                DISTINCT jsonb_build_object(
+                    'symbol', css.symbol,
+                    'exchange', css.exchange,
+                    'isin', css.isin
+                )
+            )
+            FROM company_stock_symbols css
+            WHERE css.company_id = c.id AND css.symbol IS NOT NULL
+        ), '[]'::json) as stock_symbols,
+        COALESCE((
+            SELECT json_agg(DISTINCT cs.source_url)
+            FROM company_sources cs
+            WHERE cs.company_id = c.id AND cs.source_url IS NOT NULL
+        ), '[]'::json) as sources,
+        COALESCE((
+            SELECT json_agg(DISTINCT cds.data_source)
+            FROM company_data_sources cds
+            WHERE cds.company_id = c.id AND cds.data_source IS NOT NULL
+        ), '[]'::json) as data_sources,
+        COALESCE((
+            SELECT json_agg(
+                DISTINCT jsonb_build_object(
+                    'summary', cr.summary,
+                    'details', cr.details,
+                    'source', cr.source_url,
+                    'date_added', cr.date_added
+                )
+            )
+            FROM company_reasons cr
+            WHERE cr.company_id = c.id AND cr.summary IS NOT NULL
+        ), '[]'::json) as reasons,
+        COALESCE((
+            SELECT json_agg(DISTINCT cba.action)
+            FROM company_boycott_actions cba
+            WHERE cba.company_id = c.id AND cba.action IS NOT NULL
+        ), '[]'::json) as boycott_actions,
+        COALESCE((
+            SELECT json_agg(DISTINCT ca.alternative)
+            FROM company_alternatives ca
+            WHERE ca.company_id = c.id AND ca.alternative IS NOT NULL
+        ), '[]'::json) as alternatives,
+        COALESCE((
+            SELECT json_agg(DISTINCT cc.campaign_name)
+            FROM company_campaigns cc
+            WHERE cc.company_id = c.id AND cc.campaign_name IS NOT NULL
+        ), '[]'::json) as campaigns,
+        COALESCE((
+            SELECT json_agg(DISTINCT csec.sector)
+            FROM company_sectors csec
+            WHERE csec.company_id = c.id AND csec.sector IS NOT NULL
+        ), '[]'::json) as sectors,
+        COALESCE((
+            SELECT json_agg(DISTINCT cit.involvement_type)
+            FROM company_involvement_types cit
+            WHERE cit.company_id = c.id AND cit.involvement_type IS NOT NULL
+        ), '[]'::json) as involvement_types,
+        COALESCE((
+            SELECT json_agg(DISTINCT cal.alias)
+            FROM company_aliases cal
+            WHERE cal.company_id = c.id AND cal.alias IS NOT NULL
+        ), '[]'::json) as aliases
+    FROM companies c
+"""
+
+
+# Text columns searched by company_search.py, as (table, column)
+SEARCH_COLUMNS = [
+    ('companies', 'name'),
+    ('companies', 'standard_name'),
+    ('company_aliases', 'alias'),
+]
+
+
+def create_search_indexes(cursor):
+    """
+    Create the columns and indexes behind company search (safe to re-run)
+
+    Trigram GIN indexes serve substring matches (ILIKE '%q%'), and
+    lower(column) pattern indexes serve prefixes too short to have trigrams.
+    search_vector is generated from name, standard_name and aliases_text (the
+    aliases, denormalized by the unifier because a generated column cannot
+    read other tables) and serves full-text search.
+    """
+    logger.info("Creating search indexes...")
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    cursor.execute("ALTER TABLE companies ADD COLUMN IF NOT EXISTS aliases_text TEXT")
+    cursor.execute("""
+        ALTER TABLE companies ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(standard_name, '') || ' ' ||
+                                  coalesce(aliases_text, ''))
+        ) STORED
+    """)
+    # Fill aliases_text for companies loaded before the column existed
+    cursor.execute("""
+        UPDATE companies c SET aliases_text = a.aliases_text
+        FROM (
+            SELECT company_id, string_agg(alias, ' ') AS aliases_text
+            FROM company_aliases GROUP BY company_id
+        ) a
+        WHERE c.id = a.company_id AND c.aliases_text IS NULL
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_companies_search_vector ON companies USING GIN (search_vector)")
+
+    for table, column in SEARCH_COLUMNS:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_trgm "
+                       f"ON {table} USING GIN ({column} gin_trgm_ops)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_prefix "
+                       f"ON {table} (lower({column}) text_pattern_ops)")
+
+
+def create_companies_full_views(cursor):
+    """
+    Create the plain and materialized full views
+
+    The materialized view has a unique index on id, which REFRESH
+    MATERIALIZED VIEW CONCURRENTLY needs so readers are never blocked. The
+    plain view stays available as a fallback that is always current.
+    """
+    logger.info(f"Creating {FULL_VIEW}...")
+    cursor.execute(f"DROP VIEW IF EXISTS {FULL_VIEW}")
+    cursor.execute(f"CREATE VIEW {FULL_VIEW} AS {COMPANIES_FULL_SELECT}")
+
+    logger.info(f"Creating {FULL_VIEW_MATERIALIZED}...")
+    cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS {FULL_VIEW_MATERIALIZED}")
+    cursor.execute(f"CREATE MATERIALIZED VIEW {FULL_VIEW_MATERIALIZED} AS {COMPANIES_FULL_SELECT}")
+    cursor.execute(f"CREATE UNIQUE INDEX idx_{FULL_VIEW_MATERIALIZED}_id ON {FULL_VIEW_MATERIALIZED}(id)")
+
+
+def create_database_schema(database_url: Optional[str] = None):
+    """
+    Create the database schema for unified BDS data
+
+    Args:
+        database_url: Database to (re)create the schema in (default: DATABASE_URL)
+    """
+
+    database_url = database_url or os.getenv('DATABASE_URL')
     if not database_url:
         raise ValueError("DATABASE_URL environment variable not set")
 
@@ -40,12 +193,14 @@ def create_database_schema():
         logger.info("Dropping existing tables if they exist...")
         cursor.execute("DROP TABLE IF EXISTS company_stock_symbols CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_sources CASCADE")
+        cursor.execute("DROP TABLE IF EXISTS company_data_sources CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_reasons CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_boycott_actions CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_alternatives CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_campaigns CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_sectors CASCADE")
         cursor.execute("DROP TABLE IF EXISTS company_involvement_types CASCADE")
+        cursor.execute("DROP TABLE IF EXISTS company_aliases CASCADE")
         cursor.execute("DROP TABLE IF EXISTS companies CASCADE")
 
         # Create companies table
@@ -65,6 +220,7 @@ def create_database_schema():
                 verification_status VARCHAR(20),
                 involvement_details JSONB,
                 last_updated TIMESTAMP WITH TIME ZONE,
+                content_hash CHAR(64),
                 created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
             )
         """)
@@ -192,78 +348,11 @@ def create_database_schema():
         """)
         cursor.execute("CREATE INDEX idx_aliases_company ON company_aliases(company_id)")
 
-        # Create a view for easy querying
-        logger.info("Creating companies_full_view...")
-        cursor.execute("""
-            CREATE OR REPLACE VIEW companies_full_view AS
-            SELECT
-                c.*,
-                COALESCE(
-                    json_agg(
-                        DISTINCT jsonb_build_object(
-                            'symbol', css.symbol,
-                            'exchange', css.exchange,
-                            'isin', css.isin
-                        )
-                    ) FILTER (WHERE css.symbol IS NOT NULL),
-                    '[]'::json
-                ) as stock_symbols,
-                COALESCE(
-                    json_agg(DISTINCT cs.source_url) FILTER (WHERE cs.source_url IS NOT NULL),
-                    '[]'::json
-                ) as sources,
-                COALESCE(
-                    json_agg(DISTINCT cds.data_source) FILTER (WHERE cds.data_source IS NOT NULL),
-                    '[]'::json
-                ) as data_sources,
-                COALESCE(
-                    json_agg(
-                        DISTINCT jsonb_build_object(
-                            'summary', cr.summary,
-                            'details', cr.details,
-                            'source', cr.source_url,
-                            'date_added', cr.date_added
-                        )
-                    ) FILTER (WHERE cr.summary IS NOT NULL),
-                    '[]'::json
-                ) as reasons,
-                COALESCE(
-                    json_agg(DISTINCT cba.action) FILTER (WHERE cba.action IS NOT NULL),
-                    '[]'::json
-                ) as boycott_actions,
-                COALESCE(
-                    json_agg(DISTINCT ca.alternative) FILTER (WHERE ca.alternative IS NOT NULL),
-                    '[]'::json
-                ) as alternatives,
-                COALESCE(
-                    json_agg(DISTINCT cc.campaign_name) FILTER (WHERE cc.campaign_name IS NOT NULL),
-                    '[]'::json
-                ) as campaigns,
-                COALESCE(
-                    json_agg(DISTINCT csec.sector) FILTER (WHERE csec.sector IS NOT NULL),
-                    '[]'::json
-                ) as sectors,
-                COALESCE(
-                    json_agg(DISTINCT cit.involvement_type) FILTER (WHERE cit.involvement_type IS NOT NULL),
-                    '[]'::json
-                ) as involvement_types,
-                COALESCE(
-                    json_agg(DISTINCT cal.alias) FILTER (WHERE cal.alias IS NOT NULL),
-                    '[]'::json
-                ) as aliases
-            FROM companies c
-            LEFT JOIN company_stock_symbols css ON c.id = css.company_id
-            LEFT JOIN company_sources cs ON c.id = cs.company_id
-            LEFT JOIN company_data_sources cds ON c.id = cds.company_id
-            LEFT JOIN company_reasons cr ON c.id = cr.company_id
-            LEFT JOIN company_boycott_actions cba ON c.id = cba.company_id
-            LEFT JOIN company_alternatives ca ON c.id = ca.company_id
-            LEFT JOIN company_campaigns cc ON c.id = cc.company_id
-            LEFT JOIN company_sectors csec ON c.id = csec.company_id
-            LEFT JOIN company_involvement_types cit ON c.id = cit.company_id
-            LEFT JOIN company_aliases cal ON c.id = cal.company_id
-            GROUP BY c.id
-        """)
+        # Create the search columns and indexes
+        create_search_indexes(cursor)
+
+        # Create the full views for easy querying
+        create_companies_full_views(cursor)
 
         logger.info("Database schema created successfully!")
 
@@ -285,5 +374,27 @@ def create_database_schema():
         raise
 
 
+def upgrade_database_schema():
+    """Add the columns and indexes newer than the database and (re)create the full views, keeping existing data"""
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable not set")
+
+    conn = psycopg2.connect(database_url)
+    conn.autocommit = True
+    try:
+        cursor = conn.cursor()
+        # Change detection of the unifier's sync; the full views select it too
+        cursor.execute("ALTER TABLE companies ADD COLUMN IF NOT EXISTS content_hash CHAR(64)")
+        create_search_indexes(cursor)
+        create_companies_full_views(cursor)
+        cursor.close()
+    finally:
+        conn.close()
+
+
 if __name__ == "__main__":
-    create_database_schema()
\ No newline at end of file
+    if '--upgrade' in sys.argv[1:]:
+        upgrade_database_schema()
+    else:
+        create_database_schema()
\ No newline at end of file
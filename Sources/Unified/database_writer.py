@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Pipelined Database Writer
+
+This module writes records to PostgreSQL on background threads while the
+caller is still producing them (e.g. validating), so CPU-bound validation
+and network-bound inserts overlap instead of running one after the other.
+
+Records are grouped into batches that flow through a bounded queue to a few
+writer threads. Each thread borrows a connection from a psycopg2 connection
+pool, writes a batch and commits it. When the writers fall behind, the queue
+fills up and put() blocks, so memory stays bounded (backpressure). psycopg2
+releases the GIL while waiting on the network, so the producer keeps running
+while batches are in flight.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from psycopg2.pool import ThreadedConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WRITERS = 2
+DEFAULT_BATCH_SIZE = 2000
+# Batches waiting for a writer before put() blocks
+DEFAULT_QUEUE_BATCHES = 4
+
+_STOP = object()
+
+
+class PipelinedDatabaseWriter:
+    """Writes batches of records on pooled connections in background threads"""
+
+    def __init__(self, database_url: str, write_batch: Callable[[Any, List[Dict[str, Any]]], None],
+                 writers: int = DEFAULT_WRITERS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 queue_batches: int = DEFAULT_QUEUE_BATCHES):
+        """
+        Initialize the writer and start its threads
+
+        Args:
+            database_url: PostgreSQL connection string
+            write_batch: Called as write_batch(connection, records) on a writer
+                thread; the batch is committed if it returns, rolled back if it raises
+            writers: Number of writer threads (and pooled connections)
+            batch_size: Records per batch, and so per commit
+            queue_batches: Full batches that may wait for a writer before put() blocks
+        """
+        self.write_batch = write_batch
+        self.batch_size = max(1, batch_size)
+        self.writers = max(1, writers)
+
+        self._pool = ThreadedConnectionPool(1, self.writers, database_url)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_batches))
+        self._batch: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            'records_written': 0,
+            'records_failed': 0,
+            'batches_committed': 0,
+            'batches_failed': 0,
+            # Summed over writer threads
+            'write_seconds': 0.0,
+            # Time put() spent blocked on a full queue
+            'backpressure_seconds': 0.0,
+        }
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f'db-writer-{n}', daemon=True)
+            for n in range(self.writers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, record: Dict[str, Any]):
+        """Queue a record, blocking while all writers are busy and the queue is full"""
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self._put_batch()
+
+    def _put_batch(self):
+        batch, self._batch = self._batch, []
+        start = time.perf_counter()
+        self._queue.put(batch)
+        self.stats['backpressure_seconds'] += time.perf_counter() - start
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is _STOP:
+                return
+            # A writer that dies leaves put() and close() blocked on the full queue,
+            # so whatever goes wrong, count the batch as failed and keep draining
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.error(f"Database writer failed on a batch of {len(batch)} records: {e}")
+                self._record(batch, False, 0.0)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        conn = None
+        broken = False
+        try:
+            conn = self._pool.getconn()
+            self.write_batch(conn, batch)
+            conn.commit()
+            succeeded = True
+        except Exception as e:
+            logger.error(f"Database batch of {len(batch)} records failed: {e}")
+            succeeded = False
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception as rollback_error:
+                    # e.g. InterfaceError on a dropped connection: don't hand it out again
+                    logger.error(f"Rollback failed, discarding connection: {rollback_error}")
+                    broken = True
+        finally:
+            if conn is not None:
+                self._pool.putconn(conn, close=broken)
+        self._record(batch, succeeded, time.perf_counter() - start)
+
+    def _record(self, batch: List[Dict[str, Any]], succeeded: bool, seconds: float):
+        with self._lock:
+            if succeeded:
+                self.stats['records_written'] += len(batch)
+                self.stats['batches_committed'] += 1
+            else:
+                self.stats['records_failed'] += len(batch)
+                self.stats['batches_failed'] += 1
+            self.stats['write_seconds'] += seconds
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write the remaining records, stop the threads and close the pool
+
+        Returns:
+            Writer statistics
+        """
+        if self._closed:
+            return self.stats
+        self._closed = True
+
+        try:
+            if self._batch:
+                self._put_batch()
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for thread in self._threads:
+                thread.join()
+        finally:
+            self._pool.closeall()
+        return self.stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
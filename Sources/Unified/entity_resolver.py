@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Entity Resolution for Company Names
+
+This module finds near-duplicate company names (e.g. "Hewlett-Packard" and
+"Hewlett Packard") without comparing every pair. Names are blocked on pairs
+of their rarest character trigrams (prefix filtering): two names that can
+reach the threshold always share two trigrams among the first few of each in
+rarest-first order, and a pair of rare trigrams seldom occurs by chance, so
+the blocks stay small as the number of names grows and similarity is only
+computed for a handful of candidates per name. Names too short to share two
+trigrams with a match are compared directly. Names are also matched on
+acronyms declared inside a name such as "Hewlett Packard Enterprise (HPE)".
+"""
+
+import math
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+DEFAULT_THRESHOLD = 0.9
+
+
+def name_trigrams(normalized_name: str) -> FrozenSet[str]:
+    """Character trigrams of a normalized name, ignoring spaces and padded at the ends"""
+    compact = f"#{normalized_name.replace(' ', '')}#"
+    return frozenset(compact[i:i + 3] for i in range(len(compact) - 2))
+
+
+def declared_acronyms(normalized_name: str) -> List[str]:
+    """Tokens of a name that spell the initials of its other tokens ("... enterprise hpe")"""
+    tokens = normalized_name.split()
+    if len(tokens) < 3:
+        return []
+
+    acronyms = []
+    for i, token in enumerate(tokens):
+        others = tokens[:i] + tokens[i + 1:]
+        if 2 <= len(token) <= 6 and len(token) == len(others) and token == ''.join(t[0] for t in others):
+            acronyms.append(token)
+    return acronyms
+
+
+def dice_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Sørensen-Dice coefficient of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class _DisjointSet:
+    """Union-find over record positions"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the earliest position as the cluster root
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+
+class FuzzyEntityResolver:
+    """Clusters near-duplicate normalized company names"""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Initialize the resolver
+
+        Args:
+            threshold: Minimum trigram Dice similarity (0-1] for two names to match
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Similarity threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        # Dice >= t is equivalent to Jaccard >= t / (2 - t), which drives prefix filtering
+        self._jaccard_threshold = threshold / (2 - threshold)
+        self.comparisons = 0
+
+    def _pair_prefix_length(self, size: int, overlap_factor: float) -> int:
+        """
+        Number of rarest trigrams among which a name shares at least two with any match
+
+        Args:
+            size: Number of trigrams of the name
+            overlap_factor: Lower bound on the shared trigrams of a match, as a fraction of size
+
+        Returns:
+            Prefix length, one longer than a single-trigram prefix filter needs
+        """
+        return size - math.ceil(overlap_factor * size - 1e-9) + 2
+
+    def _is_short(self, size: int) -> bool:
+        """Whether a name can match a larger one while sharing a single trigram"""
+        tau = self._jaccard_threshold
+        return math.ceil(2 * tau / (1 + tau) * size - 1e-9) < 2
+
+    def find_matches(self, normalized_names: Sequence[str]) -> List[Tuple[int, int, float]]:
+        """
+        Find matching name pairs
+
+        Args:
+            normalized_names: Names already passed through the name normalizer
+
+        Returns:
+            List of (earlier_position, later_position, similarity) tuples
+        """
+        grams = [name_trigrams(name) for name in normalized_names]
+        frequency = Counter(g for name_grams in grams for g in name_grams)
+
+        matches = []
+        # (gram, gram) -> positions of the names with both grams in their prefix
+        pair_index: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        # Names too short for pair blocking, compared directly with later names
+        short_names: List[int] = []
+        tau = self._jaccard_threshold
+        # Lower bound on the trigrams shared with a smaller (indexed) or larger (probed) match
+        index_factor = 2 * tau / (1 + tau)
+
+        # Visit names from smallest to largest trigram set so that only a short
+        # prefix of each name needs to be indexed
+        for position in sorted(range(len(grams)), key=lambda p: len(grams[p])):
+            if not normalized_names[position]:
+                continue
+
+            name_grams = grams[position]
+            ordered = sorted(name_grams, key=lambda g: (frequency[g], g))
+            size = len(ordered)
+            min_size = tau * size
+
+            candidates = set(short_names)
+            if not self._is_short(size):
+                for pair in combinations(ordered[:self._pair_prefix_length(size, tau)], 2):
+                    candidates.update(pair_index.get(pair, ()))
+
+            for candidate in sorted(candidates):
+                # Length filter: smaller sets than this cannot reach the threshold
+                if len(grams[candidate]) < min_size:
+                    continue
+                self.comparisons += 1
+                score = dice_similarity(name_grams, grams[candidate])
+                if score >= self.threshold:
+                    matches.append((min(candidate, position), max(candidate, position), score))
+
+            if self._is_short(size):
+                short_names.append(position)
+            else:
+                for pair in combinations(ordered[:self._pair_prefix_length(size, index_factor)], 2):
+                    pair_index[pair].append(position)
+
+        matches.extend(self._acronym_matches(normalized_names))
+        return matches
+
+    def _acronym_matches(self, normalized_names: Sequence[str]) -> List[Tuple[int, int, float]]:
+        """Match single-token names against acronyms declared by longer names"""
+        declared: Dict[str, List[int]] = defaultdict(list)
+        for position, name in enumerate(normalized_names):
+            for acronym in declared_acronyms(name):
+                declared[acronym].append(position)
+
+        matches = []
+        for position, name in enumerate(normalized_names):
+            for other in declared.get(name, []):
+                matches.append((min(position, other), max(position, other), 1.0))
+        return matches
+
+    def find_clusters(self, normalized_names: Sequence[str]) -> List[List[int]]:
+        """
+        Group names into clusters of near-duplicates
+
+        Args:
+            normalized_names: Names already passed through the name normalizer
+
+        Returns:
+            Clusters with more than one member, as sorted lists of positions
+        """
+        disjoint_set = _DisjointSet(len(normalized_names))
+        for a, b, _ in self.find_matches(normalized_names):
+            disjoint_set.union(a, b)
+
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for position in range(len(normalized_names)):
+            clusters[disjoint_set.find(position)].append(position)
+
+        return [members for members in clusters.values() if len(members) > 1]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Involvement Classification
+
+This module derives involvement types (and the matching involvement_details
+flags) from free text such as AFSC summaries, Boycott.thewitness reasons and
+Who Profits involvement fields. The taxonomy maps each involvement type to
+the keywords that indicate it; all keywords are compiled into one
+Aho-Corasick automaton (or one regular expression when pyahocorasick is not
+installed), so each text is scanned once however many keywords there are,
+and results are memoized, since the same texts repeat heavily across sources.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # Fall back to a single regular expression, slower on long texts
+    ahocorasick = None
+
+# Involvement type -> involvement_details flag (None if the schema has none)
+# and the lowercase keywords that indicate it; keywords match anywhere in the text
+DEFAULT_TAXONOMY = {
+    'settlements': {'detail': 'settlements', 'keywords': ['settlement']},
+    'military_support': {'detail': 'military', 'keywords': ['military', 'weapon', 'defense']},
+    'occupation': {'detail': 'occupations', 'keywords': ['occupation']},
+    'surveillance': {'detail': None, 'keywords': ['surveillance']},
+}
+
+DEFAULT_CACHE_SIZE = 65536
+
+
+class Involvement(NamedTuple):
+    """Involvement found in a text, in taxonomy order"""
+
+    types: Tuple[str, ...]
+    details: Tuple[str, ...]
+
+
+NO_INVOLVEMENT = Involvement((), ())
+
+
+def load_taxonomy(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read a taxonomy (same shape as DEFAULT_TAXONOMY) from a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class InvolvementClassifier:
+    """Finds the involvement types of a taxonomy in text with a single compiled pattern"""
+
+    def __init__(self, taxonomy: Optional[Dict[str, Dict[str, Any]]] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the classifier
+
+        Args:
+            taxonomy: Involvement type -> {'detail': flag or None, 'keywords': [...]}
+                (default: DEFAULT_TAXONOMY)
+            cache_size: Maximum number of memoized texts
+        """
+        self.taxonomy = taxonomy if taxonomy is not None else DEFAULT_TAXONOMY
+        self._types = list(self.taxonomy)
+        self._details = [self.taxonomy[t].get('detail') for t in self._types]
+
+        # Keyword -> bitmask of the types it indicates
+        masks: Dict[str, int] = {}
+        for position, involvement_type in enumerate(self._types):
+            for keyword in self.taxonomy[involvement_type]['keywords']:
+                keyword = keyword.lower()
+                masks[keyword] = masks.get(keyword, 0) | (1 << position)
+
+        self._all = (1 << len(self._types)) - 1
+        self._automaton = None
+        self._pattern = None
+
+        if ahocorasick is not None and masks:
+            # The automaton reports every occurrence, including overlapping ones
+            self._automaton = ahocorasick.Automaton()
+            for keyword, mask in masks.items():
+                self._automaton.add_word(keyword, mask)
+            self._automaton.make_automaton()
+        elif masks:
+            # A regex match consumes the longest keyword at the leftmost position,
+            # so a keyword also carries the types of the keywords it contains
+            masks = {keyword: mask | self._contained_mask(keyword, masks) for keyword, mask in masks.items()}
+            alternation = '|'.join(re.escape(k) for k in sorted(masks, key=len, reverse=True))
+            # Keywords that can overlap need a lookahead to report a match at every position
+            if self._overlapping(masks):
+                self._pattern = re.compile(f'(?=({alternation}))')
+            else:
+                self._pattern = re.compile(f'({alternation})')
+        self._masks = masks
+
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    @staticmethod
+    def _contained_mask(keyword: str, masks: Dict[str, int]) -> int:
+        mask = 0
+        for other, other_mask in masks.items():
+            if other != keyword and other in keyword:
+                mask |= other_mask
+        return mask
+
+    @staticmethod
+    def _overlapping(keywords: Iterable[str]) -> bool:
+        """Whether a proper suffix of one keyword is a proper prefix of another"""
+        keywords = list(keywords)
+        for keyword in keywords:
+            for other in keywords:
+                if other != keyword and any(keyword.endswith(other[:n]) for n in range(1, len(other))):
+                    return True
+        return False
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the taxonomy, for cache keys of derived data"""
+        payload = json.dumps(self.taxonomy, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+    def _classify(self, text: str) -> Involvement:
+        """Involvement types and details flags indicated by a text (case-insensitive)"""
+        if not text or not self._masks:
+            return NO_INVOLVEMENT
+
+        if self._automaton is not None:
+            matches = (mask for _, mask in self._automaton.iter(text.lower()))
+        else:
+            masks = self._masks
+            matches = (masks[match.group(1)] for match in self._pattern.finditer(text.lower()))
+
+        found = 0
+        for mask in matches:
+            found |= mask
+            if found == self._all:
+                break
+        if not found:
+            return NO_INVOLVEMENT
+
+        positions = [p for p in range(len(self._types)) if found >> p & 1]
+        return Involvement(
+            tuple(self._types[p] for p in positions),
+            tuple(self._details[p] for p in positions if self._details[p])
+        )
+
+    def classify_many(self, texts: Iterable[str]) -> List[Involvement]:
+        """
+        Classify a batch of texts (e.g. a whole column)
+
+        Args:
+            texts: Texts to classify
+
+        Returns:
+            Involvement per text, in the same order as the input
+        """
+        classify = self.classify
+        return [classify(text) for text in texts]
+
+    def cache_info(self):
+        """Return memo cache statistics for classify()"""
+        return self.classify.cache_info()
+
+    def clear_cache(self):
+        """Drop all memoized texts"""
+        self.classify.cache_clear()
+
+
+_default_classifier = InvolvementClassifier()
+
+
+def classify_involvement(text: str) -> Involvement:
+    """Classify a text with the default taxonomy"""
+    return _default_classifier.classify(text)
+
+
+def classify_involvement_many(texts: Iterable[str]) -> List[Involvement]:
+    """Classify a batch of texts with the default taxonomy"""
+    return _default_classifier.classify_many(texts)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Company Name Normalization
+
+This module provides the company name normalization shared by the data
+unifier and the Who Profits scraper. Legal suffixes are removed with a single
+precompiled pattern and results are memoized, since the same names repeat
+heavily across sources.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, List, Sequence
+
+# Legal-form suffixes stripped from the end of company names
+LEGAL_SUFFIXES = (
+    'LLC', 'Inc', 'Ltd', 'Corporation', 'Corp', 'Company', 'Co', 'Group',
+    'plc', 'SE', 'SA', 'AG', 'GmbH', 'NV', 'BV', 'AB', 'AS'
+)
+
+DEFAULT_CACHE_SIZE = 65536
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def _fold_unicode(text: str) -> str:
+    """Casefold text and drop accents (e.g. "L'Oréal" -> "l'oreal")"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+class NameNormalizer:
+    """Strips legal suffixes and builds matching keys for company names"""
+
+    def __init__(self, suffixes: Sequence[str] = LEGAL_SUFFIXES,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the normalizer
+
+        Args:
+            suffixes: Suffixes to strip from the end of names (case-insensitive)
+            cache_size: Maximum number of memoized names per operation
+        """
+        # Longest alternatives first so "Corporation" wins over "Corp" and "Co"
+        alternation = '|'.join(re.escape(s) for s in sorted(set(suffixes), key=len, reverse=True))
+        self._suffix_pattern = re.compile(rf'(?:[\s,]+(?:{alternation})\.?)+$', re.IGNORECASE)
+
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+        self.strip_suffixes = lru_cache(maxsize=cache_size)(self._strip_suffixes)
+
+    def _strip_suffixes(self, name: str) -> str:
+        """Remove trailing legal suffixes, keeping the original case and accents"""
+        if not name:
+            return ""
+        return self._suffix_pattern.sub('', name.strip()).strip()
+
+    def _normalize(self, name: str) -> str:
+        """Build the lowercase, accent- and punctuation-free matching key for a name"""
+        if not name:
+            return ""
+
+        normalized = self._suffix_pattern.sub('', _fold_unicode(name.strip()))
+        normalized = _PUNCTUATION.sub('', normalized)
+        return ' '.join(normalized.split())
+
+    def normalize_many(self, names: Iterable[str]) -> List[str]:
+        """
+        Normalize a batch of names
+
+        Args:
+            names: Company names to normalize
+
+        Returns:
+            Matching keys in the same order as the input
+        """
+        normalize = self.normalize
+        return [normalize(name) for name in names]
+
+    def cache_info(self):
+        """Return memo cache statistics for normalize()"""
+        return self.normalize.cache_info()
+
+    def clear_cache(self):
+        """Drop all memoized names"""
+        self.normalize.cache_clear()
+        self.strip_suffixes.cache_clear()
+
+
+_default_normalizer = NameNormalizer()
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a company name for matching using the default suffix list"""
+    return _default_normalizer.normalize(name)
+
+
+def normalize_many(names: Iterable[str]) -> List[str]:
+    """Normalize a batch of company names using the default suffix list"""
+    return _default_normalizer.normalize_many(names)
+
+
+def strip_suffixes(name: str) -> str:
+    """Remove legal suffixes from a company name using the default suffix list"""
+    return _default_normalizer.strip_suffixes(name)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Unified Data Output Writer
+
+This module streams unified company records to disk in a single
+serialization pass. Records are written one at a time as compact JSON or
+NDJSON, the finished file is moved into place atomically, and the "latest"
+file is published as a hardlink to the same bytes.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Set
+
+OUTPUT_FORMATS = ('json', 'ndjson')
+
+
+def publish_latest(path: Path, latest_path: Path):
+    """Atomically point latest_path at the contents of path (hardlink, or copy as fallback)"""
+    tmp_path = latest_path.with_name(f'.{latest_path.name}.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    try:
+        os.link(path, tmp_path)
+    except OSError:
+        # Filesystems without hardlink support (e.g. some bind mounts)
+        shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, latest_path)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class UnifiedDataWriter:
+    """Streams records to unified_bds_data_{timestamp} and publishes the latest copy"""
+
+    def __init__(self, output_dir: Path, timestamp: str, output_format: str = 'json'):
+        """
+        Initialize the writer
+
+        Args:
+            output_dir: Directory for the output files
+            timestamp: Timestamp used in the output file names
+            output_format: "json" (one document) or "ndjson" (one record per line,
+                metadata in a separate unified_bds_metadata_{timestamp}.json file)
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        self.output_dir = Path(output_dir)
+        self.output_format = output_format
+        self.path = self.output_dir / f'unified_bds_data_{timestamp}.{output_format}'
+        self.latest_path = self.output_dir / f'unified_bds_data_latest.{output_format}'
+        self.metadata_path = self.output_dir / f'unified_bds_metadata_{timestamp}.json'
+        self.latest_metadata_path = self.output_dir / 'unified_bds_metadata_latest.json'
+
+        self.count = 0
+        self.sources_processed: Set[str] = set()
+
+        # Write next to the target so the final rename stays on one filesystem
+        self._tmp_path = self.path.with_name(f'.{self.path.name}.tmp')
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        if output_format == 'json':
+            self._file.write('{"companies":[')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self._file.closed:
+            # Not finalized: drop the partial file
+            self._file.close()
+            self._tmp_path.unlink(missing_ok=True)
+        return False
+
+    def write(self, record: Dict[str, Any]):
+        """Serialize one record to the output file"""
+        if self.output_format == 'json':
+            self._file.write(',\n' if self.count else '\n')
+            self._file.write(_dumps(record))
+        else:
+            self._file.write(_dumps(record))
+            self._file.write('\n')
+
+        self.count += 1
+        self.sources_processed.update(record.get('data_sources', []))
+
+    def finalize(self, metadata: Dict[str, Any]):
+        """Write the metadata, move the file into place and publish the latest copy"""
+        if self.output_format == 'json':
+            self._file.write('\n],"metadata":')
+            self._file.write(_dumps(metadata))
+            self._file.write('}\n')
+        self._file.close()
+
+        os.replace(self._tmp_path, self.path)
+        publish_latest(self.path, self.latest_path)
+
+        if self.output_format == 'ndjson':
+            with open(self.metadata_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            publish_latest(self.metadata_path, self.latest_metadata_path)
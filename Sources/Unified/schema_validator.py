@@ -7,25 +7,313 @@ It can validate individual records and batch validate multiple records.
 """
 
 import json
+import hashlib
+import importlib.util
+import types
 import jsonschema
 from jsonschema import validate, ValidationError, Draft7Validator
-from typing import Dict, List, Any, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Validator built once per worker process by _init_worker
+_worker_validator = None
+
+
+def _init_worker(schema_path: str, use_compiled: bool = True):
+    """Build the validator used by a worker process"""
+    global _worker_validator
+    _worker_validator = BDSSchemaValidator(schema_path, use_compiled)
+
+
+def _validate_chunk(records: List[Dict[str, Any]]) -> List[Tuple[bool, List[str]]]:
+    """Validate a chunk of records in a worker process"""
+    return [_worker_validator.validate_record(record) for record in records]
+
+
+def _chunked(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Bump when the generated code changes, so cached validator modules are rebuilt
+SCHEMA_COMPILER_VERSION = 1
+
+# Keywords that only annotate the schema. "format" is listed here because the
+# Draft7Validator used by BDSSchemaValidator is built without a format checker.
+_ANNOTATION_KEYWORDS = {
+    '$schema', '$id', '$comment', 'title', 'description', 'default', 'examples', 'format'
+}
+
+_TYPE_CHECKS = {
+    'string': 'isinstance({v}, str)',
+    'null': '{v} is None',
+    'array': 'isinstance({v}, list)',
+    'object': 'isinstance({v}, dict)',
+    'boolean': 'isinstance({v}, bool)',
+    'number': '(isinstance({v}, numbers.Number) and not isinstance({v}, bool))',
+    'integer': '((isinstance({v}, int) and not isinstance({v}, bool)) '
+               'or (isinstance({v}, float) and {v}.is_integer()))',
+}
+
+# Compiled validate functions by schema hash, shared within a process
+_compiled_validators: Dict[str, Callable[[Any], List[str]]] = {}
+
+
+class _SchemaCompiler:
+    """Translates a Draft 7 schema into straight-line Python checks"""
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self.constants: List[str] = []
+        self.functions: List[str] = []
+        self.fallback_schemas: List[Dict[str, Any]] = []
+
+    def _constant(self, expression: str) -> str:
+        name = f'_C{len(self.constants)}'
+        self.constants.append(f'{name} = {expression}')
+        return name
+
+    def _is_supported(self, schema: Dict[str, Any]) -> bool:
+        for keyword, value in schema.items():
+            if keyword in _ANNOTATION_KEYWORDS:
+                continue
+            if keyword == 'type':
+                types = value if isinstance(value, list) else [value]
+                if not all(t in _TYPE_CHECKS for t in types):
+                    return False
+            elif keyword == 'enum':
+                # Membership tests are only exact for strings and null
+                if not all(e is None or isinstance(e, str) for e in value):
+                    return False
+            elif keyword == 'items':
+                if not isinstance(value, dict):
+                    return False
+            elif keyword == 'properties':
+                if not all(isinstance(s, dict) for s in value.values()):
+                    return False
+            elif keyword not in ('required', 'pattern', 'minLength', 'maxLength', 'minItems',
+                                 'maxItems', 'uniqueItems', 'minimum', 'maximum'):
+                return False
+        return True
+
+    def compile_function(self, schema: Dict[str, Any]) -> str:
+        """Emit a check function for a subschema and return its name"""
+        name = f'_check_{len(self.functions)}'
+        self.functions.append('')  # Reserve the slot so nested functions get later numbers
+        body = []
+
+        if not self._is_supported(schema):
+            # Unsupported keywords: let jsonschema walk this subschema
+            index = len(self.fallback_schemas)
+            self.fallback_schemas.append(schema)
+            body.append(f'    for error in _FALLBACK_VALIDATORS[{index}].iter_errors(value):')
+            body.append('        errors.append(_format_fallback(path, error))')
+        else:
+            # Keywords are checked in schema order, as jsonschema does
+            for keyword, value in schema.items():
+                body.extend(self._compile_keyword(keyword, value, schema))
+
+        if not body:
+            body.append('    pass')
+        self.functions[int(name.rsplit('_', 1)[1])] = '\n'.join(
+            [f'def {name}(value, path, errors):'] + body
+        )
+        return name
+
+    def _compile_keyword(self, keyword: str, value: Any, schema: Dict[str, Any]) -> List[str]:
+        check = lambda t: _TYPE_CHECKS[t].format(v='value')
+
+        if keyword == 'type':
+            types = value if isinstance(value, list) else [value]
+            reprs = ', '.join(repr(t) for t in types)
+            condition = ' or '.join(check(t) for t in types)
+            return [f'    if not ({condition}):',
+                    f'        errors.append(_message(path, f"{{value!r}} is not of type {_escape(reprs)}"))']
+        if keyword == 'required':
+            required = self._constant(repr(tuple(value)))
+            return ['    if isinstance(value, dict):',
+                    f'        for prop in {required}:',
+                    '            if prop not in value:',
+                    '                errors.append(_message(path, f"{prop!r} is a required property"))']
+        if keyword == 'properties':
+            lines = ['    if isinstance(value, dict):']
+            for prop, subschema in value.items():
+                function = self.compile_function(subschema)
+                lines.append(f'        if {prop!r} in value:')
+                lines.append(f'            {function}(value[{prop!r}], _join(path, {prop!r}), errors)')
+            return lines
+        if keyword == 'items':
+            function = self.compile_function(value)
+            return ['    if isinstance(value, list):',
+                    '        for index, item in enumerate(value):',
+                    f'            {function}(item, _join(path, index), errors)']
+        if keyword == 'pattern':
+            pattern = self._constant(f're.compile({value!r})')
+            return [f'    if isinstance(value, str) and not {pattern}.search(value):',
+                    f'        errors.append(_message(path, f"{{value!r}} does not match {_escape(repr(value))}"))']
+        if keyword in ('minLength', 'minItems'):
+            kind = 'str' if keyword == 'minLength' else 'list'
+            message = 'should be non-empty' if value == 1 else 'is too short'
+            return [f'    if isinstance(value, {kind}) and len(value) < {value!r}:',
+                    f'        errors.append(_message(path, f"{{value!r}} {message}"))']
+        if keyword in ('maxLength', 'maxItems'):
+            kind = 'str' if keyword == 'maxLength' else 'list'
+            message = 'is expected to be empty' if value == 0 else 'is too long'
+            return [f'    if isinstance(value, {kind}) and len(value) > {value!r}:',
+                    f'        errors.append(_message(path, f"{{value!r}} {message}"))']
+        if keyword == 'uniqueItems':
+            if not value:
+                return []
+            return ['    if isinstance(value, list) and not _unique(value):',
+                    '        errors.append(_message(path, f"{value!r} has non-unique elements"))']
+        if keyword == 'enum':
+            members = self._constant(f'frozenset({value!r})')
+            return [f'    if not (value is None or isinstance(value, str)) or value not in {members}:',
+                    f'        errors.append(_message(path, f"{{value!r}} is not one of {_escape(repr(value))}"))']
+        if keyword in ('minimum', 'maximum'):
+            number = _TYPE_CHECKS['number'].format(v='value')
+            operator, message = ('<', 'is less than the minimum of') if keyword == 'minimum' \
+                else ('>', 'is greater than the maximum of')
+            return [f'    if {number} and value {operator} {value!r}:',
+                    f'        errors.append(_message(path, f"{{value!r}} {message} {value!r}"))']
+        return []  # Annotations
+
+    def module_source(self, schema_hash: str) -> str:
+        entry = self.compile_function(self.schema)
+        header = [
+            f'# Generated by schema_validator.compile_schema (compiler v{SCHEMA_COMPILER_VERSION}).',
+            '# Do not edit: it is rebuilt whenever the schema changes.',
+            'import numbers',
+            'import re',
+            '',
+            f'SCHEMA_HASH = {schema_hash!r}',
+            '',
+            # Filled in by the loader with Draft7Validators for unsupported subschemas
+            '_FALLBACK_VALIDATORS = []',
+            '',
+        ] + self.constants
+        helpers = [
+            '',
+            '',
+            'def _join(path, key):',
+            '    return f"{path} -> {key}" if path else str(key)',
+            '',
+            '',
+            'def _message(path, message):',
+            '    return f"{path}: {message}" if path else message',
+            '',
+            '',
+            'def _format_fallback(path, error):',
+            '    full_path = path',
+            '    for key in error.path:',
+            '        full_path = _join(full_path, key)',
+            '    return _message(full_path, error.message)',
+            '',
+            '',
+            'def _unique(items):',
+            '    if all(isinstance(item, str) for item in items):',
+            '        return len(set(items)) == len(items)',
+            '    return _UNIQUE_ITEMS_VALIDATOR.is_valid(items)',
+            '',
+            '',
+            'def validate(instance):',
+            '    """Return the list of error messages for an instance (empty when valid)"""',
+            '    errors = []',
+            f'    {entry}(instance, "", errors)',
+            '    return errors',
+        ]
+        return '\n'.join(header + helpers) + ''.join(f'\n\n\n{f}' for f in self.functions) + '\n'
+
+
+def _escape(text: str) -> str:
+    """Escape text for embedding in a generated f-string literal"""
+    return text.replace('\\', '\\\\').replace('{', '{{').replace('}', '}}').replace('"', '\\"')
+
+
+def _schema_hash(schema: Dict[str, Any]) -> str:
+    payload = json.dumps(schema, sort_keys=True) + f'|{SCHEMA_COMPILER_VERSION}'
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def compile_schema(schema: Dict[str, Any], cache_dir: Optional[str] = None) -> Callable[[Any], List[str]]:
+    """
+    Compile a schema into a specialized validate(instance) -> list_of_errors function
+
+    The generated module is written to cache_dir (keyed by the schema hash and
+    compiler version) and imported from there on later runs. Error messages
+    and their order match BDSSchemaValidator's Draft7Validator path;
+    subschemas using unsupported keywords are delegated to jsonschema.
+
+    Args:
+        schema: The JSON schema
+        cache_dir: Directory for generated modules (None compiles in memory only)
+
+    Returns:
+        The compiled validate function
+    """
+    schema_hash = _schema_hash(schema)
+    if schema_hash in _compiled_validators:
+        return _compiled_validators[schema_hash]
+
+    compiler = _SchemaCompiler(schema)
+    source = compiler.module_source(schema_hash)
+    module_name = f'_bds_schema_{schema_hash}'
+
+    module = None
+    if cache_dir is not None:
+        module_path = os.path.join(cache_dir, f'{module_name}.py')
+        try:
+            if not os.path.exists(module_path):
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = f'{module_path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                os.replace(tmp_path, module_path)
+            spec = importlib.util.spec_from_file_location(module_name, module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except OSError:
+            module = None  # Read-only location: fall back to compiling in memory
+
+    if module is None:
+        module = types.ModuleType(module_name)
+        exec(compile(source, f'<{module_name}>', 'exec'), module.__dict__)
+
+    module._FALLBACK_VALIDATORS[:] = [Draft7Validator(s) for s in compiler.fallback_schemas]
+    module._UNIQUE_ITEMS_VALIDATOR = Draft7Validator({'uniqueItems': True})
+    _compiled_validators[schema_hash] = module.validate
+    return module.validate
+
 
 class BDSSchemaValidator:
     """Validator for BDS unified data schema"""
 
-    def __init__(self, schema_path: str = "unified_schema.json"):
+    def __init__(self, schema_path: str = "unified_schema.json", use_compiled: bool = True):
         """
         Initialize the validator with the schema
 
         Args:
             schema_path: Path to the JSON schema file
+            use_compiled: Validate with a validator generated from the schema
+                (cached in .schema_cache next to it) instead of Draft7Validator
         """
         self.schema_path = schema_path
         self.schema = self._load_schema()
         self.validator = Draft7Validator(self.schema)
+        self.compiled_validate = None
+        if use_compiled:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(schema_path)), '.schema_cache')
+            self.compiled_validate = compile_schema(self.schema, cache_dir)
 
     def _load_schema(self) -> Dict:
         """Load the JSON schema from file"""
@@ -45,29 +333,70 @@ class BDSSchemaValidator:
         Returns:
             Tuple of (is_valid, list_of_errors)
         """
+        if self.compiled_validate is not None:
+            errors = self.compiled_validate(record)
+            return not errors, errors
+
+        # Single pass with the precompiled validator
         errors = []
+        for error in self.validator.iter_errors(record):
+            error_path = " -> ".join([str(p) for p in error.path])
+            if error_path:
+                errors.append(f"{error_path}: {error.message}")
+            else:
+                errors.append(error.message)
+        return not errors, errors
 
-        try:
-            validate(instance=record, schema=self.schema)
-            return True, []
-        except ValidationError as e:
-            # Collect all validation errors
-            for error in self.validator.iter_errors(record):
-                error_path = " -> ".join([str(p) for p in error.path])
-                if error_path:
-                    errors.append(f"{error_path}: {error.message}")
-                else:
-                    errors.append(error.message)
-            return False, errors
+    def validate_iter(self, records: Iterable[Dict[str, Any]], workers: int = 1,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE
+                      ) -> Iterator[Tuple[Dict[str, Any], bool, List[str]]]:
+        """
+        Lazily validate records, yielding results in input order
+
+        Args:
+            records: Records to validate
+            workers: Number of processes to validate chunks in (1 validates inline)
+            chunk_size: Records sent to a worker at a time
+
+        Yields:
+            Tuples of (record, is_valid, list_of_errors)
+        """
+        if workers <= 1:
+            for record in records:
+                is_valid, errors = self.validate_record(record)
+                yield record, is_valid, errors
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.schema_path, self.compiled_validate is not None)) as pool:
+            # Keep a bounded number of chunks in flight so input is consumed lazily
+            pending = deque()
+            try:
+                for chunk in _chunked(records, chunk_size):
+                    pending.append((chunk, pool.submit(_validate_chunk, chunk)))
+                    if len(pending) >= workers * 2:
+                        yield from self._chunk_results(*pending.popleft())
+                while pending:
+                    yield from self._chunk_results(*pending.popleft())
+            finally:
+                # Stopping early (e.g. stop_on_error) skips chunks not yet started
+                for _, future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _chunk_results(chunk, future) -> Iterator[Tuple[Dict[str, Any], bool, List[str]]]:
+        for record, (is_valid, errors) in zip(chunk, future.result()):
+            yield record, is_valid, errors
 
     def validate_batch(self, records: List[Dict[str, Any]],
-                      stop_on_error: bool = False) -> Dict[str, Any]:
+                      stop_on_error: bool = False, workers: int = 1) -> Dict[str, Any]:
         """
         Validate multiple records
 
         Args:
             records: List of records to validate
             stop_on_error: If True, stop validation on first error
+            workers: Number of processes to validate chunks of records in
 
         Returns:
             Dictionary with validation results
@@ -80,9 +409,8 @@ class BDSSchemaValidator:
             "validation_time": datetime.now().isoformat()
         }
 
-        for i, record in enumerate(records):
+        for i, (record, is_valid, errors) in enumerate(self.validate_iter(records, workers=workers)):
             record_id = record.get('id', f'record_{i}')
-            is_valid, errors = self.validate_record(record)
 
             if is_valid:
                 results["valid"] += 1
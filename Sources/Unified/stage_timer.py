@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Pipeline Stage Instrumentation
+
+This module times the stages of the unification pipeline (each loader,
+merging, validation, database writes, output). For every stage it records
+wall time, CPU time, records processed, records/sec and the peak traced
+memory (tracemalloc) while the stage was running, and can optionally collect
+a cProfile profile per stage.
+
+Stages may nest (a loader generator is consumed inside the merge loop). Time
+spent in a nested stage is attributed to that stage only, so the reported
+times of all stages add up to the instrumented total.
+"""
+
+import cProfile
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+
+class _Frame:
+    """An active stage on the stack"""
+
+    __slots__ = ('name', 'wall_start', 'cpu_start', 'child_wall', 'child_cpu', 'peak')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.peak = 0
+
+
+class StageTimer:
+    """Accumulates timing, throughput and memory statistics per pipeline stage"""
+
+    def __init__(self, trace_memory: bool = False, profile: bool = False):
+        """
+        Initialize the timer
+
+        Args:
+            trace_memory: Track peak memory per stage with tracemalloc (slows allocation)
+            profile: Collect a cProfile profile per stage (see dump_profiles)
+        """
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[_Frame] = []
+        self._profilers: Dict[str, cProfile.Profile] = {}
+
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def _stage_stats(self, name: str) -> Dict[str, Any]:
+        if name not in self.stages:
+            self.stages[name] = {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'records': 0,
+                                 'calls': 0, 'peak_memory_bytes': 0}
+        return self.stages[name]
+
+    def _fold_peak(self):
+        """Credit the peak traced memory since the last reset to every open stage"""
+        if not self.trace_memory:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            if peak > frame.peak:
+                frame.peak = peak
+        tracemalloc.reset_peak()
+
+    def _enter(self, name: str):
+        self._fold_peak()
+        if self.profile:
+            # Only one profiler can be active at a time, so pause the parent's
+            if self._stack:
+                self._profilers[self._stack[-1].name].disable()
+            self._profilers.setdefault(name, cProfile.Profile()).enable()
+        self._stack.append(_Frame(name))
+
+    def _exit(self, records: int):
+        self._fold_peak()
+        frame = self._stack.pop()
+        wall = time.perf_counter() - frame.wall_start
+        cpu = time.process_time() - frame.cpu_start
+
+        if self.profile:
+            self._profilers[frame.name].disable()
+            if self._stack:
+                self._profilers[self._stack[-1].name].enable()
+
+        stats = self._stage_stats(frame.name)
+        stats['wall_seconds'] += wall - frame.child_wall
+        stats['cpu_seconds'] += cpu - frame.child_cpu
+        stats['records'] += records
+        stats['peak_memory_bytes'] = max(stats['peak_memory_bytes'], frame.peak)
+
+        if self._stack:
+            self._stack[-1].child_wall += wall
+            self._stack[-1].child_cpu += cpu
+
+    @contextmanager
+    def stage(self, name: str, records: int = 0):
+        """
+        Time a block of code as one call of a stage
+
+        Args:
+            name: Stage name; repeated calls accumulate
+            records: Records processed by the block (the yielded dict's
+                "records" entry may be updated inside the block instead)
+        """
+        counter = {'records': records}
+        self._stage_stats(name)['calls'] += 1
+        self._enter(name)
+        try:
+            yield counter
+        finally:
+            self._exit(counter['records'])
+
+    def iterate(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """
+        Time the production of each item of an iterable (e.g. a loader generator)
+
+        Only the time spent inside the iterable is attributed to the stage,
+        not the time the consumer spends on each item.
+        """
+        self._stage_stats(name)['calls'] += 1
+        iterator = iter(iterable)
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._exit(0)
+                return
+            except BaseException:
+                self._exit(0)
+                raise
+            self._exit(1)
+            yield item
+
+    def merge(self, stages: Dict[str, Dict[str, Any]]):
+        """Add stage statistics collected by another timer (e.g. in a worker process)"""
+        for name, other in stages.items():
+            stats = self._stage_stats(name)
+            for key in ('wall_seconds', 'cpu_seconds', 'records', 'calls'):
+                stats[key] += other[key]
+            stats['peak_memory_bytes'] = max(stats['peak_memory_bytes'], other['peak_memory_bytes'])
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage statistics in first-seen order, with derived records/sec"""
+        summary = {}
+        for name, stats in self.stages.items():
+            wall = stats['wall_seconds']
+            summary[name] = {
+                'wall_seconds': round(wall, 4),
+                'cpu_seconds': round(stats['cpu_seconds'], 4),
+                'records': stats['records'],
+                'records_per_sec': round(stats['records'] / wall, 1) if wall > 0 and stats['records'] else None,
+                'calls': stats['calls'],
+                'peak_memory_mb': round(stats['peak_memory_bytes'] / 1024 / 1024, 2) if self.trace_memory else None,
+            }
+        return summary
+
+    def dump_profiles(self, profile_dir: Path) -> List[Path]:
+        """
+        Write one cProfile file per stage
+
+        Args:
+            profile_dir: Directory for the <stage>.prof files (readable with pstats/snakeviz)
+
+        Returns:
+            Paths of the written files
+        """
+        profile_dir = Path(profile_dir)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name, profiler in self._profilers.items():
+            path = profile_dir / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.prof"
+            profiler.dump_stats(str(path))
+            paths.append(path)
+        return paths
+
+    def close(self):
+        """Stop tracing memory if this timer started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
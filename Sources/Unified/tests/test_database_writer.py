@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for PipelinedDatabaseWriter failure handling, with a fake connection pool
+
+Usage: python -m unittest discover -s tests (from Sources/Unified)
+"""
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+import psycopg2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import database_writer
+from database_writer import PipelinedDatabaseWriter
+
+# Seconds put()/close() may take before the writer is considered hung
+TIMEOUT = 10
+
+
+class FakeConnection:
+    def __init__(self, rollback_error=None):
+        self.rollback_error = rollback_error
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        if self.rollback_error:
+            raise self.rollback_error
+
+
+class FakePool:
+    """Stands in for ThreadedConnectionPool; records how connections were returned"""
+
+    def __init__(self, rollback_error=None, getconn_error=None):
+        self.rollback_error = rollback_error
+        self.getconn_error = getconn_error
+        self.returned = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        if self.getconn_error:
+            raise self.getconn_error
+        return FakeConnection(self.rollback_error)
+
+    def putconn(self, conn, close=False):
+        with self._lock:
+            self.returned.append(close)
+
+    def closeall(self):
+        self.closed = True
+
+
+def run_writer(pool, write_batch, records, batch_size=2):
+    """Put the records through a writer on the fake pool; fails the test if it hangs"""
+    result = {}
+
+    def target():
+        with mock.patch.object(database_writer, 'ThreadedConnectionPool', lambda *args: pool):
+            writer = PipelinedDatabaseWriter('postgresql://fake', write_batch, writers=2,
+                                             batch_size=batch_size, queue_batches=1)
+        for record in records:
+            writer.put(record)
+        result['stats'] = writer.close()
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT)
+    if thread.is_alive():
+        raise AssertionError("put()/close() did not return: writer threads died")
+    return result['stats']
+
+
+def failing_write(conn, batch):
+    raise RuntimeError("batch failed")
+
+
+class PipelinedDatabaseWriterFailureTest(unittest.TestCase):
+
+    def test_failed_rollback_discards_connection_and_keeps_draining(self):
+        pool = FakePool(rollback_error=psycopg2.InterfaceError("connection already closed"))
+        stats = run_writer(pool, failing_write, [{'id': n} for n in range(20)])
+
+        self.assertEqual(stats['batches_failed'], 10)
+        self.assertEqual(stats['records_failed'], 20)
+        self.assertEqual(stats['records_written'], 0)
+        self.assertEqual(pool.returned, [True] * 10)
+        self.assertTrue(pool.closed)
+
+    def test_getconn_failure_is_counted(self):
+        pool = FakePool(getconn_error=RuntimeError("pool exhausted"))
+        stats = run_writer(pool, failing_write, [{'id': n} for n in range(20)])
+
+        self.assertEqual(stats['batches_failed'], 10)
+        self.assertEqual(stats['records_failed'], 20)
+        self.assertEqual(pool.returned, [])
+
+    def test_failed_batch_does_not_stop_later_batches(self):
+        pool = FakePool()
+
+        def write_batch(conn, batch):
+            if batch[0]['id'] == 0:
+                raise RuntimeError("batch failed")
+
+        stats = run_writer(pool, write_batch, [{'id': n} for n in range(6)])
+
+        self.assertEqual(stats['batches_failed'], 1)
+        self.assertEqual(stats['batches_committed'], 2)
+        self.assertEqual(stats['records_written'], 4)
+        self.assertEqual(sorted(pool.returned), [False] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for NameNormalizer against the per-suffix regex normalizer it replaced
+
+Usage: python -m unittest discover -s tests (from Sources/Unified)
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from name_normalizer import NameNormalizer, normalize_many, normalize_name, strip_suffixes
+
+
+def legacy_normalize(name):
+    """DataUnifier.normalize_company_name before the shared normalizer"""
+    if not name:
+        return ""
+
+    suffixes = [
+        r'\s+LLC$', r'\s+Inc\.?$', r'\s+Ltd\.?$', r'\s+Corporation$',
+        r'\s+Corp\.?$', r'\s+Company$', r'\s+Co\.?$', r'\s+Group$',
+        r'\s+plc$', r'\s+PLC$', r'\s+SE$', r'\s+SA$', r'\s+AG$',
+        r'\s+GmbH$', r'\s+NV$', r'\s+BV$', r'\s+AB$', r'\s+AS$'
+    ]
+
+    normalized = name.strip()
+    for suffix in suffixes:
+        normalized = re.sub(suffix, '', normalized, flags=re.IGNORECASE)
+
+    normalized = re.sub(r'[^\w\s]', '', normalized.lower())
+    return ' '.join(normalized.split())
+
+
+SUFFIX_CASES = [
+    'Acme LLC', 'Acme   LLC', 'Acme\tInc', 'Acme Inc', 'Acme Inc.', 'ACME INC.', 'Acme Ltd', 'Acme Ltd.',
+    'Acme Corporation', 'Acme Corp', 'Acme Corp.', 'Acme Company', 'Acme Co', 'Acme Co.', 'Acme Group',
+    'Acme plc', 'Acme PLC', 'Acme SE', 'Acme SA', 'Siemens AG', 'Acme GmbH', 'Acme NV', 'Acme BV',
+    'Acme AB', 'Acme AS', 'Acme, Inc.', 'Motorola Solutions, Inc.', 'Foo Group Inc.',
+    # Suffix words that are not at the end, or not separate words
+    'Corporation Bank', 'Inc Magazine', 'Group One', 'Costco', 'Tesco', 'Inc', 'Acme Inc..',
+]
+
+PUNCTUATION_CASES = [
+    'Hewlett-Packard', 'Procter & Gamble', 'AT&T Inc.', "Ben & Jerry's", '  Caterpillar   Inc  ',
+    '3M Company', 'Coca-Cola Co.', 'Elbit Systems Ltd.', 'snake_case Ltd', '',
+]
+
+
+class NameNormalizerTest(unittest.TestCase):
+
+    def test_matches_legacy_normalizer(self):
+        for name in SUFFIX_CASES + PUNCTUATION_CASES:
+            with self.subTest(name=name):
+                self.assertEqual(normalize_name(name), legacy_normalize(name))
+                # Second call is served from the memo cache
+                self.assertEqual(normalize_name(name), legacy_normalize(name))
+
+    def test_normalize_many_keeps_order(self):
+        names = SUFFIX_CASES + PUNCTUATION_CASES
+        self.assertEqual(normalize_many(names), [legacy_normalize(name) for name in names])
+
+    def test_intended_differences(self):
+        # Stacked suffixes are all removed, whatever their order
+        self.assertEqual(normalize_name('Foo Inc Ltd'), 'foo')
+        # Accents are folded
+        self.assertEqual(normalize_name("L'Oréal"), 'loreal')
+        self.assertEqual(normalize_name('Nestlé S.A.'), 'nestle sa')
+        # Every suffix may end with a dot or follow a bare comma
+        self.assertEqual(normalize_name('Acme LLC.'), 'acme')
+        self.assertEqual(normalize_name('Acme Group.'), 'acme')
+        self.assertEqual(normalize_name('Acme,Inc'), 'acme')
+
+    def test_strip_suffixes_keeps_case_and_punctuation(self):
+        self.assertEqual(strip_suffixes('AT&T Inc.'), 'AT&T')
+        self.assertEqual(strip_suffixes('Motorola Solutions, Inc.'), 'Motorola Solutions')
+        self.assertEqual(strip_suffixes("L'Oréal SA"), "L'Oréal")
+        self.assertEqual(strip_suffixes('Corporation Bank'), 'Corporation Bank')
+
+    def test_evicted_names_normalize_the_same(self):
+        normalizer = NameNormalizer(cache_size=2)
+        names = SUFFIX_CASES + PUNCTUATION_CASES
+        for _ in range(2):
+            self.assertEqual(normalizer.normalize_many(names), [legacy_normalize(name) for name in names])
+        self.assertLessEqual(normalizer.cache_info().currsize, 2)
+
+        normalizer.clear_cache()
+        self.assertEqual(normalizer.cache_info().currsize, 0)
+        self.assertEqual(normalizer.normalize('Acme Corp.'), 'acme')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests that the compiled schema validator reports the same errors as Draft7Validator
+
+Usage: python -m unittest discover -s tests (from Sources/Unified)
+"""
+
+import copy
+import os
+import sys
+import unittest
+from unittest import mock
+
+from jsonschema import Draft7Validator
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import schema_validator
+from schema_validator import BDSSchemaValidator, compile_schema
+
+# Values of every JSON type, plus arrays that break uniqueItems in the ways jsonschema checks
+BAD_VALUES = [
+    None, True, 0, -1, 1.5, 2, '', 'x', 'comp_Bad', [], ['a', 'a'], [1, True], [1, 1.0],
+    [{'a': 1}, {'a': 1}], [[1], [1]], [None, 'a'], {}, {'summary': ''}, {'symbol': 1},
+]
+
+# Uses keywords the compiler hands over to jsonschema
+FALLBACK_SCHEMA = {
+    'type': 'object',
+    'required': ['kind', 'tags'],
+    'properties': {
+        'kind': {'const': 'company'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}, 'uniqueItems': True},
+        'extra': {
+            'type': 'object',
+            'additionalProperties': False,
+            'properties': {'a': {'type': 'integer'}, 'b': {'oneOf': [{'type': 'string'}, {'type': 'integer'}]}},
+        },
+        'items': {'type': 'array', 'items': {'type': 'object', 'properties': {'size': {'enum': [1, 2]}}}},
+        'score': {'type': ['number', 'null'], 'minimum': 0, 'maximum': 1},
+    },
+}
+
+
+def compile_fresh(schema):
+    """Compile a schema from the current compiler, bypassing the module caches"""
+    with mock.patch.dict(schema_validator._compiled_validators, clear=True):
+        return compile_schema(schema)
+
+
+def draft7_errors(validator, instance):
+    """Errors as BDSSchemaValidator formats them on the Draft7Validator path"""
+    errors = []
+    for error in validator.iter_errors(instance):
+        error_path = " -> ".join([str(p) for p in error.path])
+        errors.append(f"{error_path}: {error.message}" if error_path else error.message)
+    return errors
+
+
+class CompiledValidatorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = BDSSchemaValidator(use_compiled=False)
+        cls.compiled = BDSSchemaValidator(use_compiled=False)
+        # .schema_cache may hold a module generated by an older compiler
+        cls.compiled.compiled_validate = compile_fresh(cls.reference.schema)
+        cls.complete = cls.reference.generate_complete_record()
+
+    def assert_same_errors(self, record):
+        expected = self.reference.validate_record(record)
+        self.assertEqual(self.compiled.validate_record(record), expected)
+        return expected
+
+    def test_complete_and_minimal_records_are_valid(self):
+        self.assertEqual(self.assert_same_errors(self.complete), (True, []))
+        self.assertEqual(self.assert_same_errors(self.reference.generate_minimal_record()), (True, []))
+
+    def test_bad_top_level_values(self):
+        for field in self.reference.schema['properties']:
+            for value in BAD_VALUES:
+                with self.subTest(field=field, value=value):
+                    record = dict(self.complete, **{field: value})
+                    self.assert_same_errors(record)
+
+    def test_bad_nested_values(self):
+        nested = [
+            ('stock_symbols', 'symbol'), ('stock_symbols', 'exchange'), ('stock_symbols', 'isin'),
+            ('reasons', 'summary'), ('reasons', 'details'), ('reasons', 'date_added'),
+        ]
+        for field, key in nested:
+            for value in BAD_VALUES + ['us0000000001']:
+                with self.subTest(field=field, key=key, value=value):
+                    record = copy.deepcopy(self.complete)
+                    record[field].append(dict(record[field][0], **{key: value}))
+                    self.assert_same_errors(record)
+
+        for key in ('occupations', 'military', 'unknown'):
+            for value in BAD_VALUES:
+                with self.subTest(field='involvement_details', key=key, value=value):
+                    record = copy.deepcopy(self.complete)
+                    record['involvement_details'][key] = value
+                    self.assert_same_errors(record)
+
+    def test_error_order_with_many_errors(self):
+        record = copy.deepcopy(self.complete)
+        del record['name']
+        del record['data_sources']
+        record['id'] = 'Example'
+        record['aliases'] = ['a', 7, 'a']
+        record['stock_symbols'] = [{'exchange': 5}, 'NYSE']
+        record['involvement_types'] = ['occupation', 'piracy', 'occupation']
+        record['reasons'] = [{'summary': ''}, {}]
+        record['confidence_score'] = 3
+        record['verification_status'] = None
+        is_valid, errors = self.assert_same_errors(record)
+        self.assertFalse(is_valid)
+        self.assertGreater(len(errors), 10)
+
+    def test_non_object_records(self):
+        for value in (None, [], 'comp_x', 1):
+            with self.subTest(value=value):
+                self.assert_same_errors(value)
+
+    def test_fallback_subschemas(self):
+        validate = compile_fresh(FALLBACK_SCHEMA)
+        reference = Draft7Validator(FALLBACK_SCHEMA)
+        instances = [
+            {'kind': 'company', 'tags': ['a']},
+            {'kind': 'person', 'tags': ['a', 'a', 3]},
+            {'tags': [], 'extra': {'a': 1.5, 'b': None, 'c': 1}},
+            {'kind': 'company', 'tags': [{'x': 1}, {'x': 1}], 'extra': {'b': 'x'}},
+            {'kind': 'company', 'tags': [], 'items': [{'size': 3}, {'size': 1}, 'x'], 'score': -0.5},
+            {'kind': 'company', 'tags': 'a', 'score': True},
+            [],
+        ]
+        for instance in instances:
+            with self.subTest(instance=instance):
+                self.assertEqual(validate(instance), draft7_errors(reference, instance))
+
+
+if __name__ == "__main__":
+    unittest.main()
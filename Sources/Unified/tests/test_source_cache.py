@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for SourceCache invalidation when source files or loaders change
+
+Usage: python -m unittest discover -s tests (from Sources/Unified)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+from source_cache import SourceCache
+from unify_data import DataUnifier
+
+
+def write_source(path, lines, mtime=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(f'{line}\n' for line in lines))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class SourceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'source.csv')
+        self.cache = SourceCache(os.path.join(self.directory.name, 'cache'), 'loader-1', 'schema-1')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fill(self, loader_name='load_csv', records=({'name': 'Acme'},)):
+        key = self.cache.key(loader_name, self.source)
+        self.assertEqual(list(self.cache.put(loader_name, key, records)), list(records))
+
+    def cached(self, loader_name='load_csv', cache=None):
+        cache = cache or self.cache
+        entry = cache.get(loader_name, cache.key(loader_name, self.source))
+        return None if entry is None else list(entry)
+
+    def test_unchanged_source_hits(self):
+        write_source(self.source, ['Acme'])
+        self.fill(records=[{'name': 'Acme', 'sectors': ['defense']}, {'name': 'Beta'}])
+        self.assertEqual(self.cached(), [{'name': 'Acme', 'sectors': ['defense']}, {'name': 'Beta'}])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+
+    def test_size_change_misses(self):
+        write_source(self.source, ['Acme'])
+        self.fill()
+        write_source(self.source, ['Acme', 'Beta'])
+        self.assertIsNone(self.cached())
+
+    def test_same_size_edit_with_same_mtime_misses(self):
+        write_source(self.source, ['Acme'], mtime=1_700_000_000)
+        self.fill()
+        # Entries are keyed on content, so an edit that keeps size and mtime is still seen
+        write_source(self.source, ['Acne'], mtime=1_700_000_000)
+        self.assertIsNone(self.cached())
+
+    def test_touched_source_with_same_content_hits(self):
+        write_source(self.source, ['Acme'], mtime=1_700_000_000)
+        self.fill()
+        write_source(self.source, ['Acme'], mtime=1_800_000_000)
+        self.assertEqual(self.cached(), [{'name': 'Acme'}])
+
+    def test_loader_and_schema_versions_invalidate(self):
+        write_source(self.source, ['Acme'])
+        self.fill()
+        directory = self.cache.cache_dir
+        self.assertIsNone(self.cached(cache=SourceCache(directory, 'loader-2', 'schema-1')))
+        self.assertIsNone(self.cached(cache=SourceCache(directory, 'loader-1', 'schema-2')))
+        self.assertIsNone(self.cached(loader_name='load_json'))
+        self.assertEqual(self.cached(cache=SourceCache(directory, 'loader-1', 'schema-1')), [{'name': 'Acme'}])
+
+    def test_partially_consumed_put_leaves_no_entry(self):
+        write_source(self.source, ['Acme'])
+        key = self.cache.key('load_csv', self.source)
+        records = self.cache.put('load_csv', key, [{'name': 'Acme'}, {'name': 'Beta'}])
+        next(records)
+        records.close()
+        self.assertIsNone(self.cached())
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+
+    def test_invalidate_by_loader(self):
+        write_source(self.source, ['Acme'])
+        self.fill('load_csv')
+        self.fill('load_json')
+        self.assertEqual(self.cache.invalidate('load_csv'), 1)
+        self.assertIsNone(self.cached('load_csv'))
+        self.assertEqual(self.cached('load_json'), [{'name': 'Acme'}])
+
+
+class UnifierSourceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'companies.txt')
+        self.unifier = DataUnifier(os.path.join(self.directory.name, 'output'),
+                                   source_cache_dir=os.path.join(self.directory.name, 'cache'))
+        self.loads = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def load_companies(self, file_path):
+        """Loader reading one company name per line, recording each real parse"""
+        self.loads.append(file_path)
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('!'):
+                    # Loaders log errors and stop early
+                    self.unifier.incomplete_sources.append(file_path)
+                    return
+                yield {'id': f'comp_{line.strip().lower()}', 'name': line.strip()}
+
+    def load(self):
+        return [record['name'] for record in self.unifier._load_source(self.load_companies, self.source)]
+
+    def test_changed_source_is_parsed_again(self):
+        write_source(self.source, ['Acme', 'Beta'], mtime=1_700_000_000)
+        self.assertEqual(self.load(), ['Acme', 'Beta'])
+        self.assertEqual(self.load(), ['Acme', 'Beta'])
+        self.assertEqual(len(self.loads), 1)
+
+        write_source(self.source, ['Acme', 'Beta', 'Gamma'])
+        self.assertEqual(self.load(), ['Acme', 'Beta', 'Gamma'])
+        self.assertEqual(len(self.loads), 2)
+
+        write_source(self.source, ['Acme', 'Beta', 'Gamme'])
+        self.assertEqual(self.load(), ['Acme', 'Beta', 'Gamme'])
+        self.assertEqual(len(self.loads), 3)
+
+    def test_failed_load_is_not_replayed(self):
+        write_source(self.source, ['Acme', '!broken', 'Beta'])
+        self.assertEqual(self.load(), ['Acme'])
+        self.unifier.incomplete_sources = []
+        self.assertEqual(self.load(), ['Acme'])
+        self.assertEqual(len(self.loads), 2)
+        self.assertEqual(self.unifier.incomplete_sources, [self.source])
+
+
+if __name__ == "__main__":
+    unittest.main()
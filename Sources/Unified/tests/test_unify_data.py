@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Tests for DataUnifier record merging and removal of companies no source lists anymore
+
+Usage: python -m unittest discover -s tests (from Sources/Unified)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+from unify_data import DataUnifier, content_hash
+
+
+class LinearScanUnifier(DataUnifier):
+    """Finds the record to merge into by scanning every existing record, as before the name index"""
+
+    def _find_existing_id(self, record, normalized_name):
+        for existing_id, existing_record in self.unified_data.items():
+            if self.normalize_company_name(existing_record.name) == normalized_name or existing_id == record.id:
+                return existing_id
+        return None
+
+
+def source_record(record_id, name, source):
+    """A loader record; its reason records which input row it came from"""
+    return {
+        'id': record_id,
+        'name': name,
+        'sectors': [source.split('-')[0]],
+        'reasons': [{'summary': f"Listed by {source}"}],
+        'data_sources': [source.split('-')[0]],
+    }
+
+
+def merged_state(unifier):
+    """Unified records in insertion order, without merge timestamps"""
+    unifier.finalize_records()
+    state = []
+    for record_id, record in unifier.unified_data.items():
+        data = record.to_dict()
+        data.pop('last_updated', None)
+        state.append((record_id, data))
+    return state
+
+
+class IndexedMergeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.output_dir.cleanup()
+
+    def assert_merges_like_linear_scan(self, records):
+        indexed = DataUnifier(self.output_dir.name)
+        linear = LinearScanUnifier(self.output_dir.name)
+        indexed._add_records(records)
+        linear._add_records(records)
+
+        self.assertEqual(merged_state(indexed), merged_state(linear))
+        self.assertEqual(indexed.stats['total_records'], linear.stats['total_records'])
+        self.assertEqual(indexed.stats['duplicates_merged'], linear.stats['duplicates_merged'])
+
+    def test_name_and_id_matches(self):
+        records = [
+            source_record('a', 'Acme Inc', 'bds-1'),
+            source_record('b', 'Beta Ltd.', 'afsc-1'),
+            # Same normalized name as "Acme Inc"
+            source_record('c', 'ACME', 'afsc-2'),
+            # Same id as "Beta Ltd.", different name
+            source_record('b', 'Gamma', 'witness-1'),
+            # "Gamma" was merged into b, so its name alone matches nothing
+            source_record('d', 'Gamma Corp', 'witness-2'),
+            # Matches d by id and the earlier b by name: the earlier record wins
+            source_record('d', 'Beta', 'whoprofits-1'),
+            source_record('a', 'Delta', 'whoprofits-2'),
+        ]
+        self.assert_merges_like_linear_scan(records)
+
+        unifier = DataUnifier(self.output_dir.name)
+        unifier._add_records(records)
+        self.assertEqual(list(unifier.unified_data), ['a', 'b', 'd'])
+        self.assertEqual([r.summary for r in unifier.unified_data['b'].finalize().reasons],
+                         ['Listed by afsc-1', 'Listed by witness-1', 'Listed by whoprofits-1'])
+
+    def test_random_collisions(self):
+        rng = random.Random(3)
+        names = ['Acme', 'Acme Inc', 'ACME Ltd.', 'Beta Group', 'beta', 'Gamma Co.', 'Delta', 'Delta AG']
+        sources = ['bds', 'afsc', 'witness', 'whoprofits']
+        records = [source_record(f"id{rng.randrange(12)}", rng.choice(names), f"{rng.choice(sources)}-{n}")
+                   for n in range(300)]
+        self.assert_merges_like_linear_scan(records)
+
+
+# Source files under a base directory, as unify_all_sources finds them
+BDS_FILE = os.path.join('bdscoalition.ca', 'BDS Shame List (20AUG2025).csv')
+AFSC_FILE = os.path.join('investigate.afsc.org', 'investigate-dataset-july-2025.csv')
+WITNESS_FILE = os.path.join('boycott.thewitness', 'sample_output.json')
+WHO_PROFITS_FILE = os.path.join('dontbuyintooccupation.org', 'output', 'who_profits_results_latest.json')
+
+
+def write_sources(base_dir):
+    """One company per source"""
+    contents = {
+        BDS_FILE: 'Name,Country,Description\nAcme Inc,USA,Makes things\n',
+        AFSC_FILE: 'Company Short Name,Summary,Prisons\nBeta Corp,Runs prisons,1\n',
+        WITNESS_FILE: json.dumps({'sample_enhanced_brands': [{'name': 'Gamma', 'reason': 'Listed'}]}),
+        WHO_PROFITS_FILE: json.dumps({'results': {'12': {'found': True, 'matches': [
+            {'company_name': 'Delta Ltd', 'headquarters': 'Israel', 'involvement': 'Settlements'}]}}}),
+    }
+    for relative_path, content in contents.items():
+        path = os.path.join(base_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+class StubCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.connection.stored_rows
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+    """Stands in for the psycopg2 connection: serves the stored companies and records statements"""
+
+    def __init__(self, stored_rows):
+        self.stored_rows = stored_rows
+        self.executed = []
+
+    def cursor(self):
+        return StubCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def deletes(self):
+        return [params for sql, params in self.executed if sql.startswith('DELETE')]
+
+
+class DeleteRemovedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.base_dir = os.path.join(self.directory.name, 'Sources')
+        write_sources(self.base_dir)
+
+        # Stored by an earlier complete load, plus a company no source lists anymore
+        unifier = self.load()
+        stored_updated = datetime(2025, 8, 20)
+        self.stored_rows = [(record_id, content_hash(record.to_dict()), stored_updated)
+                            for record_id, record in unifier.unified_data.items()]
+        self.stored_rows.append(('comp_gone_00000000', 'f' * 64, stored_updated))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def load(self):
+        unifier = DataUnifier(os.path.join(self.directory.name, 'output'), db_load_mode='row')
+        unifier.unify_all_sources(self.base_dir)
+        return unifier
+
+    def sync(self, unifier):
+        unifier.db_conn = StubConnection(self.stored_rows)
+        unifier.sync_to_database(list(unifier.unified_data.values()))
+        return unifier.db_conn
+
+    def test_complete_load_deletes_removed_companies(self):
+        unifier = self.load()
+        self.assertEqual(len(unifier.unified_data), 4)
+        self.assertEqual(unifier.incomplete_sources, [])
+
+        connection = self.sync(unifier)
+
+        self.assertEqual(connection.deletes(), [(['comp_gone_00000000'],)])
+        self.assertEqual(unifier.stats['database_deletes'], 1)
+        self.assertEqual(unifier.stats['database_unchanged'], 4)
+
+    def test_source_that_fails_to_load_blocks_deletes(self):
+        with open(os.path.join(self.base_dir, WITNESS_FILE), 'w', encoding='utf-8') as f:
+            f.write('{"sample_enhanced_brands": [')
+        unifier = self.load()
+        self.assertEqual(len(unifier.unified_data), 3)
+        self.assertEqual(unifier.incomplete_sources, [os.path.join(self.base_dir, WITNESS_FILE)])
+
+        connection = self.sync(unifier)
+
+        self.assertEqual(connection.deletes(), [])
+        self.assertEqual(unifier.stats['database_deletes'], 0)
+
+    def test_missing_source_blocks_deletes(self):
+        os.remove(os.path.join(self.base_dir, WHO_PROFITS_FILE))
+        unifier = self.load()
+        self.assertEqual(len(unifier.unified_data), 3)
+
+        connection = self.sync(unifier)
+
+        self.assertEqual(connection.deletes(), [])
+        self.assertEqual(unifier.stats['database_deletes'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the Who Profits scraper's search planning: each distinct term is
+fetched once and its rows fanned out to every company that uses it
+
+Usage: python -m unittest discover -s tests (from Sources/Unified)
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'dontbuyintooccupation.org'))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import main as who_profits
+from http_client import _new_stats
+from main import build_search_variations, fan_out, merge_matches, plan_searches
+
+COMPANIES = {
+    '101': 'Southern Company',
+    '102': 'Southern Copper Corp.',
+    '103': 'Caterpillar Inc.',
+    # Listed at two booths
+    '104': 'Caterpillar Inc.',
+    # Cleaned name and first word equal the full name
+    '105': 'Motorola',
+}
+
+# What the site returns for each term (company names only)
+SITE = {
+    'Southern Company': ['Southern Company'],
+    'Southern': ['Southern Company', 'Southern Copper', 'Pacific Southern'],
+    'Southern Copper Corp.': [],
+    'Southern Copper': ['Southern Copper'],
+    'Caterpillar Inc.': ['Caterpillar'],
+    'Caterpillar': ['Caterpillar', 'Caterpillar Financial'],
+    'Motorola': ['Motorola Solutions', 'Unrelated Ltd'],
+}
+
+
+def site_rows(search_term):
+    """Rows as parse_search_rows reads them from a results page"""
+    return [{'company_name': name, 'traded_in': '', 'headquarters': '', 'involvement': '',
+             'search_term': search_term} for name in SITE.get(search_term, [])]
+
+
+def search_each_company(companies, rows_for_term):
+    """The search before planning: every variation of every company, in order"""
+    found = {}
+    for booth, company in companies.items():
+        all_results = []
+        for search_term in build_search_variations(company):
+            rows = rows_for_term(search_term)
+            if rows:
+                merge_matches(all_results, rows)
+        found[booth] = all_results
+    return found
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.status = 200
+        self.text = text
+
+
+class FakeHttpClient:
+    """Stands in for HttpClient, answering searches from SITE"""
+
+    requested = []
+
+    def __init__(self, **kwargs):
+        self.stats = _new_stats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get(self, url, params):
+        term = params['Text']
+        FakeHttpClient.requested.append(term)
+        self.stats['network_requests'] += 1
+        rows = ''.join(f'<tr><td>1</td><td>{name}</td><td></td><td></td><td></td></tr>' for name in SITE.get(term, []))
+        return FakeResponse(f'<table class="search-tbl"><tbody>{rows}</tbody></table>')
+
+
+class PlanSearchesTest(unittest.TestCase):
+
+    def test_terms_are_distinct_in_order_of_first_use(self):
+        variations, terms = plan_searches(COMPANIES)
+
+        self.assertEqual(variations, {booth: build_search_variations(name) for booth, name in COMPANIES.items()})
+        self.assertEqual(terms, ['Southern Company', 'Southern', 'Southern Copper Corp.', 'Southern Copper',
+                                 'Caterpillar Inc.', 'Caterpillar', 'Motorola'])
+        self.assertEqual(sum(len(v) for v in variations.values()), 15)
+
+    def test_fan_out_matches_searching_each_company(self):
+        variations, terms = plan_searches(COMPANIES)
+        found = fan_out(variations, {term: site_rows(term) for term in terms})
+
+        self.assertEqual(found, search_each_company(COMPANIES, site_rows))
+        self.assertEqual([r['company_name'] for r in found['101']], ['Southern Company', 'Southern Copper', 'Pacific Southern'])
+        self.assertEqual([r['company_name'] for r in found['103']], ['Caterpillar', 'Caterpillar Financial'])
+        self.assertEqual([r['company_name'] for r in found['105']], ['Motorola Solutions'])
+        # Booths sharing every term get equal but separate match lists
+        self.assertEqual(found['103'], found['104'])
+        self.assertIsNot(found['103'], found['104'])
+
+    def test_failed_searches_are_skipped(self):
+        variations, terms = plan_searches(COMPANIES)
+        rows_by_term = {term: site_rows(term) for term in terms}
+        rows_by_term['Southern'] = None
+        del rows_by_term['Motorola']
+
+        found = fan_out(variations, rows_by_term)
+
+        self.assertEqual([r['company_name'] for r in found['101']], ['Southern Company'])
+        self.assertEqual([r['company_name'] for r in found['102']], ['Southern Copper'])
+        self.assertEqual(found['105'], [])
+
+    def test_sequential_search_fetches_each_term_once(self):
+        variations, terms = plan_searches(COMPANIES)
+        FakeHttpClient.requested = []
+        with mock.patch.object(who_profits, 'HttpClient', FakeHttpClient), \
+                mock.patch.object(who_profits.time, 'sleep'):
+            rows_by_term = who_profits.search_all_sequential(COMPANIES, variations)
+
+        self.assertEqual(FakeHttpClient.requested, terms)
+        self.assertEqual(fan_out(variations, rows_by_term), search_each_company(COMPANIES, site_rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
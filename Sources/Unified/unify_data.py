@@ -10,21 +10,39 @@ import json
 import csv
 import os
 import sys
+import argparse
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Sequence, Tuple
 from pathlib import Path
 import hashlib
+import io
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
+try:
+    import ijson
+except ImportError:  # Fall back to json.load, which reads whole files into memory
+    ijson = None
+
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from schema_validator import BDSSchemaValidator
+from name_normalizer import normalize_name
+from entity_resolver import FuzzyEntityResolver
+from output_writer import OUTPUT_FORMATS, UnifiedDataWriter
+from columnar_export import EXPORT_FORMATS, export_columnar
+from stage_timer import StageTimer
+from source_cache import DEFAULT_MAX_BYTES, SourceCache
+from company_record import MISSING, UNORDERED_ARRAY_FIELDS, CompanyRecord
+from involvement_classifier import InvolvementClassifier, load_taxonomy
+from database_writer import DEFAULT_BATCH_SIZE, DEFAULT_WRITERS, PipelinedDatabaseWriter
+from database_schema import FULL_VIEW, FULL_VIEW_MATERIALIZED
 
 # Load environment variables
 load_dotenv()
@@ -36,26 +54,185 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Version of the unified schema written to the output metadata
+SCHEMA_VERSION = '1.0'
+
+# Bump when a loader's output changes, so cached parsed sources are rebuilt
+LOADER_VERSION = '2'
+
+# Columns of the companies table written by the loaders, in insert order
+COMPANY_COLUMNS = [
+    'id', 'name', 'standard_name', 'parent_company', 'country_hq',
+    'industry', 'description', 'booth_number', 'divestment_priority',
+    'confidence_score', 'verification_status', 'involvement_details',
+    'last_updated', 'content_hash', 'aliases_text'
+]
+
+# Child tables keyed by company_id, with the columns written after company_id
+CHILD_TABLE_COLUMNS = {
+    'company_stock_symbols': ['symbol', 'exchange', 'isin'],
+    'company_sources': ['source_url'],
+    'company_data_sources': ['data_source'],
+    'company_reasons': ['summary', 'details', 'source_url', 'date_added'],
+    'company_boycott_actions': ['action'],
+    'company_alternatives': ['alternative'],
+    'company_campaigns': ['campaign_name'],
+    'company_sectors': ['sector'],
+    'company_involvement_types': ['involvement_type'],
+    'company_aliases': ['alias'],
+}
+
+
+def _copy_text_value(value: Any) -> str:
+    """Format a value for PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """Hash a record's content, ignoring last_updated and the order of set-like arrays"""
+    canonical = {k: v for k, v in record.items() if k != 'last_updated'}
+    for field in UNORDERED_ARRAY_FIELDS:
+        if field in canonical:
+            canonical[field] = sorted(canonical[field])
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def aliases_text(record: Dict[str, Any]) -> Optional[str]:
+    """A record's aliases as one string, for the companies.search_vector column"""
+    return ' '.join(record.get('aliases', [])) or None
+
+
+def _iter_json_array(f, key: str) -> Iterator[Any]:
+    """Yield the items of a top-level array, parsing incrementally when ijson is installed"""
+    if ijson is not None:
+        yield from ijson.items(f, f'{key}.item', use_float=True)
+    else:
+        yield from json.load(f).get(key, [])
+
+
+def _iter_json_object(f, key: str) -> Iterator[Tuple[str, Any]]:
+    """Yield the key/value pairs of a top-level object, parsing incrementally when ijson is installed"""
+    if ijson is not None:
+        yield from ijson.kvitems(f, key, use_float=True)
+    else:
+        yield from json.load(f).get(key, {}).items()
+
+
+def _collect_records(loader, file_path: str) -> Tuple[List[Dict], Dict[str, Dict[str, Any]], List[str]]:
+    """Run a loader to completion (used in worker processes, which cannot stream)"""
+    unifier = loader.__self__
+    records = list(unifier.timer.iterate(loader.__name__, unifier._load_source(loader, file_path)))
+    return records, unifier.timer.stages, unifier.incomplete_sources
+
+
+def _replay_cached(records: Iterator[Dict], loader_name: str) -> Iterator[Dict]:
+    """Yield records from the source cache, stamped with the load time like fresh ones"""
+    count = 0
+    for record in records:
+        record['last_updated'] = datetime.now().isoformat()
+        yield record
+        count += 1
+    logger.info(f"Loaded {count} records for {loader_name} from the source cache")
+
+
 class DataUnifier:
     """Unifies BDS data from multiple sources into a single schema"""
 
-    def __init__(self, output_dir: str = "/app/output"):
+    def __init__(self, output_dir: str = "/app/output", fuzzy_threshold: Optional[float] = None,
+                 db_load_mode: str = "bulk", workers: int = 1, output_format: str = "json",
+                 export_formats: Sequence[str] = (), profile: bool = False, trace_memory: bool = False,
+                 source_cache_dir: Optional[str] = None, source_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 involvement_taxonomy: Optional[Dict[str, Dict[str, Any]]] = None,
+                 db_writers: int = DEFAULT_WRITERS, db_batch_size: int = DEFAULT_BATCH_SIZE):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.validator = BDSSchemaValidator()
         self.unified_data = {}
+        # Lookup indexes over unified_data: normalized name -> id, id -> insertion position
+        self._name_index: Dict[str, str] = {}
+        self._record_order: Dict[str, int] = {}
         self.stats = {
             'total_records': 0,
             'sources_processed': [],
             'duplicates_merged': 0,
             'validation_errors': 0,
             'database_inserts': 0,
-            'database_errors': 0
+            'database_errors': 0,
+            'fuzzy_clusters_merged': 0,
+            'database_unchanged': 0,
+            'database_deletes': 0,
+            'stages': {}
         }
+        # Source files that were missing or failed to load; stored companies are only
+        # deleted after a load in which every source was read completely
+        self.incomplete_sources: List[str] = []
+
+        # Per-stage wall/CPU time, throughput and peak memory, plus optional cProfile data
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.timer = StageTimer(trace_memory=trace_memory, profile=profile)
+
+        # Similarity threshold for fuzzy entity resolution (None disables it)
+        self.fuzzy_threshold = fuzzy_threshold
 
         # Database connection
         self.database_url = os.getenv('DATABASE_URL')
         self.db_conn = None
+        # "bulk" loads everything through staging tables, "row" inserts company by company
+        if db_load_mode not in ('bulk', 'row'):
+            raise ValueError(f"Unknown database load mode: {db_load_mode}")
+        self.db_load_mode = db_load_mode
+        # Threads writing committed batches while validation runs (0 writes everything
+        # in one transaction after validation)
+        self.db_writers = max(0, db_writers)
+        self.db_batch_size = db_batch_size
+
+        # Number of processes used to run the source loaders and validation concurrently
+        self.workers = max(1, workers)
+
+        # Serialization of the unified data file: "json" or "ndjson"
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.output_format = output_format
+
+        # Extra columnar exports ("parquet", "arrow") written next to the JSON output
+        unknown_formats = set(export_formats) - set(EXPORT_FORMATS)
+        if unknown_formats:
+            raise ValueError(f"Unknown export formats: {sorted(unknown_formats)}")
+        self.export_formats = list(export_formats)
+
+        # Involvement types found in free text by all loaders (None uses the default taxonomy)
+        self.involvement_taxonomy = involvement_taxonomy
+        self.classifier = InvolvementClassifier(involvement_taxonomy)
+
+        # Parsed records of unchanged source files are replayed from here (None disables it)
+        self.source_cache = None
+        if source_cache_dir is not None:
+            # Loader output depends on the taxonomy, so it is part of the loader version
+            self.source_cache = SourceCache(source_cache_dir, f"{LOADER_VERSION}-{self.classifier.fingerprint}",
+                                            SCHEMA_VERSION, source_cache_max_bytes)
+
+    def __getstate__(self):
+        """Pickle only configuration, so loaders can run in worker processes"""
+        state = self.__dict__.copy()
+        for unpicklable in ('validator', 'db_conn', 'timer', 'classifier'):
+            state[unpicklable] = None
+        for large in ('unified_data', '_name_index', '_record_order'):
+            state[large] = {}
+        # Workers report only their own sources back
+        state['incomplete_sources'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.validator = BDSSchemaValidator()
+        self.classifier = InvolvementClassifier(self.involvement_taxonomy)
+        # Workers report loader timings back to the parent's timer; they are not profiled
+        self.timer = StageTimer(trace_memory=self.trace_memory)
 
     def connect_to_database(self):
         """Connect to the PostgreSQL database"""
@@ -84,173 +261,443 @@ class DataUnifier:
 
         try:
             cursor = self.db_conn.cursor()
+            self._upsert_company(cursor, record)
+            cursor.close()
+            self.stats['database_inserts'] += 1
 
-            # Insert main company record
+        except Exception as e:
+            logger.error(f"Error inserting company {record['name']} to database: {e}")
+            self.stats['database_errors'] += 1
+
+    def _upsert_company(self, cursor, record: Dict[str, Any]):
+        """Upsert one company and replace its child rows (raises on database errors)"""
+        # Insert main company record
+        cursor.execute("""
+            INSERT INTO companies (
+                id, name, standard_name, parent_company, country_hq,
+                industry, description, booth_number, divestment_priority,
+                confidence_score, verification_status, involvement_details,
+                last_updated, content_hash, aliases_text
+            ) VALUES (
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            )
+            ON CONFLICT (id) DO UPDATE SET
+                name = EXCLUDED.name,
+                standard_name = EXCLUDED.standard_name,
+                parent_company = EXCLUDED.parent_company,
+                country_hq = EXCLUDED.country_hq,
+                industry = EXCLUDED.industry,
+                description = EXCLUDED.description,
+                booth_number = EXCLUDED.booth_number,
+                divestment_priority = EXCLUDED.divestment_priority,
+                confidence_score = EXCLUDED.confidence_score,
+                verification_status = EXCLUDED.verification_status,
+                involvement_details = EXCLUDED.involvement_details,
+                last_updated = EXCLUDED.last_updated,
+                content_hash = EXCLUDED.content_hash,
+                aliases_text = EXCLUDED.aliases_text
+        """, (
+            record['id'],
+            record['name'],
+            record.get('standard_name'),
+            record.get('parent_company'),
+            record.get('country_hq'),
+            record.get('industry'),
+            record.get('description'),
+            record.get('booth_number'),
+            record.get('divestment_priority'),
+            record.get('confidence_score'),
+            record.get('verification_status'),
+            json.dumps(record.get('involvement_details', {})),
+            record['last_updated'],
+            content_hash(record),
+            aliases_text(record)
+        ))
+
+        # Clear existing related records to avoid duplicates
+        cursor.execute("DELETE FROM company_stock_symbols WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_sources WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_data_sources WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_reasons WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_boycott_actions WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_alternatives WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_campaigns WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_sectors WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_involvement_types WHERE company_id = %s", (record['id'],))
+        cursor.execute("DELETE FROM company_aliases WHERE company_id = %s", (record['id'],))
+
+        # Insert stock symbols
+        for symbol_data in record.get('stock_symbols', []):
             cursor.execute("""
-                INSERT INTO companies (
-                    id, name, standard_name, parent_company, country_hq,
-                    industry, description, booth_number, divestment_priority,
-                    confidence_score, verification_status, involvement_details,
-                    last_updated
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                ON CONFLICT (id) DO UPDATE SET
-                    name = EXCLUDED.name,
-                    standard_name = EXCLUDED.standard_name,
-                    parent_company = EXCLUDED.parent_company,
-                    country_hq = EXCLUDED.country_hq,
-                    industry = EXCLUDED.industry,
-                    description = EXCLUDED.description,
-                    booth_number = EXCLUDED.booth_number,
-                    divestment_priority = EXCLUDED.divestment_priority,
-                    confidence_score = EXCLUDED.confidence_score,
-                    verification_status = EXCLUDED.verification_status,
-                    involvement_details = EXCLUDED.involvement_details,
-                    last_updated = EXCLUDED.last_updated
+                INSERT INTO company_stock_symbols (company_id, symbol, exchange, isin)
+                VALUES (%s, %s, %s, %s)
             """, (
                 record['id'],
-                record['name'],
-                record.get('standard_name'),
-                record.get('parent_company'),
-                record.get('country_hq'),
-                record.get('industry'),
-                record.get('description'),
-                record.get('booth_number'),
-                record.get('divestment_priority'),
-                record.get('confidence_score'),
-                record.get('verification_status'),
-                json.dumps(record.get('involvement_details', {})),
-                record['last_updated']
+                symbol_data['symbol'],
+                symbol_data['exchange'],
+                symbol_data.get('isin')
             ))
 
-            # Clear existing related records to avoid duplicates
-            cursor.execute("DELETE FROM company_stock_symbols WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_sources WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_data_sources WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_reasons WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_boycott_actions WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_alternatives WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_campaigns WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_sectors WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_involvement_types WHERE company_id = %s", (record['id'],))
-            cursor.execute("DELETE FROM company_aliases WHERE company_id = %s", (record['id'],))
-
-            # Insert stock symbols
-            for symbol_data in record.get('stock_symbols', []):
+        # Insert sources
+        for source in record.get('sources', []):
+            if source and source.strip():
                 cursor.execute("""
-                    INSERT INTO company_stock_symbols (company_id, symbol, exchange, isin)
-                    VALUES (%s, %s, %s, %s)
-                """, (
-                    record['id'],
-                    symbol_data['symbol'],
-                    symbol_data['exchange'],
-                    symbol_data.get('isin')
-                ))
-
-            # Insert sources
-            for source in record.get('sources', []):
-                if source and source.strip():
-                    cursor.execute("""
-                        INSERT INTO company_sources (company_id, source_url)
-                        VALUES (%s, %s)
-                    """, (record['id'], source.strip()))
-
-            # Insert data sources
-            for data_source in record.get('data_sources', []):
-                cursor.execute("""
-                    INSERT INTO company_data_sources (company_id, data_source)
+                    INSERT INTO company_sources (company_id, source_url)
                     VALUES (%s, %s)
-                """, (record['id'], data_source))
+                """, (record['id'], source.strip()))
 
-            # Insert reasons
-            for reason in record.get('reasons', []):
-                cursor.execute("""
-                    INSERT INTO company_reasons (company_id, summary, details, source_url, date_added)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    record['id'],
-                    reason['summary'],
-                    reason.get('details'),
-                    reason.get('source'),
-                    reason.get('date_added')
-                ))
-
-            # Insert boycott actions
-            for action in record.get('boycott_actions', []):
-                cursor.execute("""
-                    INSERT INTO company_boycott_actions (company_id, action)
-                    VALUES (%s, %s)
-                """, (record['id'], action))
+        # Insert data sources
+        for data_source in record.get('data_sources', []):
+            cursor.execute("""
+                INSERT INTO company_data_sources (company_id, data_source)
+                VALUES (%s, %s)
+            """, (record['id'], data_source))
 
-            # Insert alternatives
-            for alternative in record.get('alternatives', []):
-                cursor.execute("""
-                    INSERT INTO company_alternatives (company_id, alternative)
-                    VALUES (%s, %s)
-                """, (record['id'], alternative))
+        # Insert reasons
+        for reason in record.get('reasons', []):
+            cursor.execute("""
+                INSERT INTO company_reasons (company_id, summary, details, source_url, date_added)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (
+                record['id'],
+                reason['summary'],
+                reason.get('details'),
+                reason.get('source'),
+                reason.get('date_added')
+            ))
 
-            # Insert campaigns
-            for campaign in record.get('campaigns', []):
-                cursor.execute("""
-                    INSERT INTO company_campaigns (company_id, campaign_name)
-                    VALUES (%s, %s)
-                """, (record['id'], campaign))
+        # Insert boycott actions
+        for action in record.get('boycott_actions', []):
+            cursor.execute("""
+                INSERT INTO company_boycott_actions (company_id, action)
+                VALUES (%s, %s)
+            """, (record['id'], action))
 
-            # Insert sectors
-            for sector in record.get('sectors', []):
-                cursor.execute("""
-                    INSERT INTO company_sectors (company_id, sector)
-                    VALUES (%s, %s)
-                """, (record['id'], sector))
+        # Insert alternatives
+        for alternative in record.get('alternatives', []):
+            cursor.execute("""
+                INSERT INTO company_alternatives (company_id, alternative)
+                VALUES (%s, %s)
+            """, (record['id'], alternative))
 
-            # Insert involvement types
-            for involvement_type in record.get('involvement_types', []):
-                cursor.execute("""
-                    INSERT INTO company_involvement_types (company_id, involvement_type)
-                    VALUES (%s, %s)
-                """, (record['id'], involvement_type))
+        # Insert campaigns
+        for campaign in record.get('campaigns', []):
+            cursor.execute("""
+                INSERT INTO company_campaigns (company_id, campaign_name)
+                VALUES (%s, %s)
+            """, (record['id'], campaign))
 
-            # Insert aliases
-            for alias in record.get('aliases', []):
-                cursor.execute("""
-                    INSERT INTO company_aliases (company_id, alias)
-                    VALUES (%s, %s)
-                """, (record['id'], alias))
+        # Insert sectors
+        for sector in record.get('sectors', []):
+            cursor.execute("""
+                INSERT INTO company_sectors (company_id, sector)
+                VALUES (%s, %s)
+            """, (record['id'], sector))
 
-            cursor.close()
-            self.stats['database_inserts'] += 1
+        # Insert involvement types
+        for involvement_type in record.get('involvement_types', []):
+            cursor.execute("""
+                INSERT INTO company_involvement_types (company_id, involvement_type)
+                VALUES (%s, %s)
+            """, (record['id'], involvement_type))
+
+        # Insert aliases
+        for alias in record.get('aliases', []):
+            cursor.execute("""
+                INSERT INTO company_aliases (company_id, alias)
+                VALUES (%s, %s)
+            """, (record['id'], alias))
+
+    def _company_row(self, record: Dict[str, Any]) -> tuple:
+        """Build the companies table row for a record"""
+        return (
+            record['id'],
+            record['name'],
+            record.get('standard_name'),
+            record.get('parent_company'),
+            record.get('country_hq'),
+            record.get('industry'),
+            record.get('description'),
+            record.get('booth_number'),
+            record.get('divestment_priority'),
+            record.get('confidence_score'),
+            record.get('verification_status'),
+            json.dumps(record.get('involvement_details', {})),
+            record['last_updated'],
+            content_hash(record),
+            aliases_text(record)
+        )
+
+    def _child_rows(self, record: Dict[str, Any]) -> Dict[str, List[tuple]]:
+        """Build the child table rows for a record, keyed by table name"""
+        company_id = record['id']
+        return {
+            'company_stock_symbols': [
+                (company_id, s['symbol'], s['exchange'], s.get('isin'))
+                for s in record.get('stock_symbols', [])
+            ],
+            'company_sources': [
+                (company_id, source.strip())
+                for source in record.get('sources', []) if source and source.strip()
+            ],
+            'company_data_sources': [(company_id, d) for d in record.get('data_sources', [])],
+            'company_reasons': [
+                (company_id, r['summary'], r.get('details'), r.get('source'), r.get('date_added'))
+                for r in record.get('reasons', [])
+            ],
+            'company_boycott_actions': [(company_id, a) for a in record.get('boycott_actions', [])],
+            'company_alternatives': [(company_id, a) for a in record.get('alternatives', [])],
+            'company_campaigns': [(company_id, c) for c in record.get('campaigns', [])],
+            'company_sectors': [(company_id, s) for s in record.get('sectors', [])],
+            'company_involvement_types': [(company_id, t) for t in record.get('involvement_types', [])],
+            'company_aliases': [(company_id, a) for a in record.get('aliases', [])],
+        }
+
+    def _copy_rows(self, cursor, table: str, columns: List[str], rows: List[tuple]):
+        """Stream rows into a table with a single COPY"""
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_text_value(v) for v in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+    def bulk_insert_to_database(self, records: List[Dict[str, Any]]):
+        """
+        Load all records in a handful of round trips
+
+        Companies and child rows are streamed with COPY into temporary staging
+        tables, then applied with set-based statements: an upsert into
+        companies, and a delete plus insert for each child table.
+        """
+        if not self.db_conn or not records:
+            return
+
+        cursor = self.db_conn.cursor()
+        try:
+            self._bulk_upsert(cursor, records)
+            self.stats['database_inserts'] += len(records)
 
         except Exception as e:
-            logger.error(f"Error inserting company {record['name']} to database: {e}")
-            self.stats['database_errors'] += 1
+            logger.error(f"Bulk database load failed: {e}")
+            self.stats['database_errors'] += len(records)
+            raise
 
-    def normalize_company_name(self, name: str) -> str:
-        """Normalize company name for matching"""
-        if not name:
-            return ""
-
-        # Remove common suffixes
-        suffixes = [
-            r'\s+LLC$', r'\s+Inc\.?$', r'\s+Ltd\.?$', r'\s+Corporation$',
-            r'\s+Corp\.?$', r'\s+Company$', r'\s+Co\.?$', r'\s+Group$',
-            r'\s+plc$', r'\s+PLC$', r'\s+SE$', r'\s+SA$', r'\s+AG$',
-            r'\s+GmbH$', r'\s+NV$', r'\s+BV$', r'\s+AB$', r'\s+AS$'
+        finally:
+            cursor.close()
+
+    def _bulk_upsert(self, cursor, records: List[Dict[str, Any]]):
+        """Stage records with COPY and apply them with set-based statements (raises on database errors)"""
+        child_rows = {table: [] for table in CHILD_TABLE_COLUMNS}
+        for record in records:
+            for table, rows in self._child_rows(record).items():
+                child_rows[table].extend(rows)
+
+        # Staging tables mirror the target columns and vanish at commit
+        cursor.execute(";".join(
+            [f"CREATE TEMP TABLE staging_companies ON COMMIT DROP AS "
+             f"SELECT {', '.join(COMPANY_COLUMNS)} FROM companies WITH NO DATA"] +
+            [f"CREATE TEMP TABLE staging_{table} ON COMMIT DROP AS "
+             f"SELECT company_id, {', '.join(columns)} FROM {table} WITH NO DATA"
+             for table, columns in CHILD_TABLE_COLUMNS.items()]
+        ))
+
+        self._copy_rows(cursor, 'staging_companies', COMPANY_COLUMNS,
+                        [self._company_row(r) for r in records])
+        for table, columns in CHILD_TABLE_COLUMNS.items():
+            if child_rows[table]:
+                self._copy_rows(cursor, f'staging_{table}', ['company_id'] + columns, child_rows[table])
+
+        updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in COMPANY_COLUMNS if c != 'id')
+        statements = [
+            f"INSERT INTO companies ({', '.join(COMPANY_COLUMNS)}) "
+            f"SELECT {', '.join(COMPANY_COLUMNS)} FROM staging_companies "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
         ]
+        for table, columns in CHILD_TABLE_COLUMNS.items():
+            # Replace the child rows of every staged company
+            statements.append(f"DELETE FROM {table} t USING staging_companies s WHERE t.company_id = s.id")
+            target_columns = ', '.join(['company_id'] + columns)
+            statements.append(f"INSERT INTO {table} ({target_columns}) "
+                              f"SELECT {target_columns} FROM staging_{table}")
+        cursor.execute(";".join(statements))
+
+    def _fetch_content_hashes(self) -> Dict[str, tuple]:
+        """Content hash and last_updated of every stored company, keyed by id"""
+        cursor = self.db_conn.cursor()
+        cursor.execute("SELECT id, content_hash, last_updated FROM companies")
+        existing = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        cursor.close()
+        return existing
+
+    def _content_changed(self, record: CompanyRecord, data: Dict[str, Any],
+                         existing: Dict[str, tuple]) -> bool:
+        """Whether a record differs from its stored version (unchanged ones get the stored last_updated)"""
+        stored_hash, stored_updated = existing.get(record.id, (None, None))
+        if stored_hash is None or stored_hash != content_hash(data):
+            return True
+
+        # Same content: keep the timestamp of the last real change
+        if stored_updated is not None:
+            record.last_updated = stored_updated.isoformat()
+        self.stats['database_unchanged'] += 1
+        return False
+
+    def _delete_removed(self, existing: Dict[str, tuple]) -> List[str]:
+        """
+        Delete stored companies that no source listed in this load (children cascade)
+
+        Every loaded company counts as listed, valid or not, so a validation
+        failure never deletes a company. Nothing is deleted when a source file
+        was missing or failed to load, as its companies would all look removed.
+        """
+        removed_ids = list(existing.keys() - self.unified_data.keys())
+        if removed_ids and self.incomplete_sources:
+            logger.warning(f"Skipping deletion of {len(removed_ids)} companies not in this load, "
+                           f"as these sources were missing or failed to load: {self.incomplete_sources}")
+            return []
+        if removed_ids:
+            cursor = self.db_conn.cursor()
+            cursor.execute("DELETE FROM companies WHERE id = ANY(%s)", (removed_ids,))
+            cursor.close()
+            self.stats['database_deletes'] += len(removed_ids)
+        return removed_ids
+
+    def _write_batch(self, conn, records: List[Dict[str, Any]]):
+        """Write a batch of changed companies on a pooled connection (runs on a writer thread)"""
+        cursor = conn.cursor()
+        try:
+            if self.db_load_mode == 'bulk':
+                self._bulk_upsert(cursor, records)
+            else:
+                for record in records:
+                    self._upsert_company(cursor, record)
+        finally:
+            cursor.close()
 
-        normalized = name.strip()
-        for suffix in suffixes:
-            normalized = re.sub(suffix, '', normalized, flags=re.IGNORECASE)
+    def start_database_writer(self) -> Optional[tuple]:
+        """
+        Start background writers for a pipelined database sync
 
-        # Convert to lowercase and remove special characters for matching
-        normalized = re.sub(r'[^\w\s]', '', normalized.lower())
-        normalized = ' '.join(normalized.split())  # Normalize whitespace
+        Returns:
+            (writer, stored content hashes), or None if the writers could not be started
+            (the changes are then written after validation in one transaction)
+        """
+        try:
+            existing = self._fetch_content_hashes()
+            writer = PipelinedDatabaseWriter(self.database_url, self._write_batch, writers=self.db_writers,
+                                             batch_size=self.db_batch_size)
+        except Exception as e:
+            logger.error(f"Failed to start database writers: {e}")
+            self.db_conn.rollback()
+            return None
+        return writer, existing
+
+    def finish_database_writer(self, writer: PipelinedDatabaseWriter, existing: Dict[str, tuple]):
+        """Wait for the background writers, then delete companies that are no longer listed"""
+        with self.timer.stage('database_drain'):
+            writer_stats = writer.close()
+
+        self.stats['database_inserts'] += writer_stats['records_written']
+        self.stats['database_errors'] += writer_stats['records_failed']
+        # Writer threads ran alongside validation, so their time overlaps the validate stage
+        self.timer.merge({'database_insert_background': {
+            'wall_seconds': writer_stats['write_seconds'], 'cpu_seconds': 0.0,
+            'records': writer_stats['records_written'], 'calls': writer_stats['batches_committed'],
+            'peak_memory_bytes': 0,
+        }})
+
+        removed_ids = []
+        if writer_stats['records_failed']:
+            logger.warning("Skipping deletion of removed companies after failed batches")
+        else:
+            removed_ids = self._delete_removed(existing)
+
+        logger.info(f"Database delta: {writer_stats['records_written'] + writer_stats['records_failed']} "
+                    f"new or changed in {writer_stats['batches_committed']} committed and "
+                    f"{writer_stats['batches_failed']} failed batches, "
+                    f"{self.stats['database_unchanged']} unchanged, {len(removed_ids)} removed; "
+                    f"validation waited {writer_stats['backpressure_seconds']:.2f}s on the writers")
+
+    def refresh_full_view(self):
+        """
+        Refresh the materialized full view if this load changed any company
+
+        The refresh runs CONCURRENTLY, so readers keep seeing the previous rows
+        until it commits (a never-populated view is refreshed normally).
+        Databases created before the view existed keep using the plain view.
+        """
+        if not self.stats['database_inserts'] and not self.stats['database_deletes']:
+            return
 
-        return normalized
+        cursor = self.db_conn.cursor()
+        try:
+            cursor.execute("SELECT ispopulated FROM pg_matviews WHERE matviewname = %s", (FULL_VIEW_MATERIALIZED,))
+            row = cursor.fetchone()
+            if row is None:
+                logger.warning(f"{FULL_VIEW_MATERIALIZED} not found, readers fall back to {FULL_VIEW} "
+                               f"(create it with: python database_schema.py --upgrade)")
+                return
+
+            concurrently = "CONCURRENTLY " if row[0] else ""
+            with self.timer.stage('refresh_full_view'):
+                cursor.execute(f"REFRESH MATERIALIZED VIEW {concurrently}{FULL_VIEW_MATERIALIZED}")
+                self.db_conn.commit()
+            logger.info(f"Refreshed {FULL_VIEW_MATERIALIZED}")
+
+        except Exception as e:
+            logger.error(f"Failed to refresh {FULL_VIEW_MATERIALIZED}: {e}")
+            self.db_conn.rollback()
+
+        finally:
+            cursor.close()
+
+    def sync_to_database(self, records: List[CompanyRecord]):
+        """
+        Write only the companies whose content changed since the last load
+
+        Existing content hashes are fetched in one query. Unchanged companies
+        are skipped and keep their stored last_updated, and companies no
+        longer present in any source are deleted (children cascade) unless a
+        source was missing or failed to load.
+        """
+        if not self.db_conn:
+            return
+
+        existing = self._fetch_content_hashes()
+
+        changed_records = []
+        for record in records:
+            data = record.to_dict()
+            if self._content_changed(record, data, existing):
+                changed_records.append(data)
+
+        removed_ids = self._delete_removed(existing)
+
+        logger.info(f"Database delta: {len(changed_records)} new or changed, "
+                    f"{self.stats['database_unchanged']} unchanged, {len(removed_ids)} removed")
+
+        if self.db_load_mode == 'bulk':
+            with self.timer.stage('database_insert', len(changed_records)):
+                self.bulk_insert_to_database(changed_records)
+        else:
+            for start in range(0, len(changed_records), 100):
+                batch = changed_records[start:start + 100]
+                with self.timer.stage('database_insert', len(batch)):
+                    for record in batch:
+                        self.insert_company_to_database(record)
+
+                    if start + len(batch) < len(changed_records):
+                        logger.info(f"  Inserted {start + len(batch)}/{len(changed_records)} records to database...")
+                        self.db_conn.commit()
+
+    def normalize_company_name(self, name: str) -> str:
+        """Normalize company name for matching"""
+        return normalize_name(name)
 
     def generate_id(self, name: str) -> str:
         """Generate a stable ID for a company"""
-        normalized = self.normalize_company_name(name)
+        normalized = normalize_name(name)
         # Create a short hash for the ID
         hash_obj = hashlib.md5(normalized.encode())
         short_hash = hash_obj.hexdigest()[:8]
@@ -258,13 +705,13 @@ class DataUnifier:
         clean_name = re.sub(r'[^a-z0-9]', '_', normalized)[:20]
         return f"comp_{clean_name}_{short_hash}"
 
-    def load_bds_coalition_csv(self, file_path: str) -> List[Dict]:
+    def load_bds_coalition_csv(self, file_path: str) -> Iterator[Dict]:
         """Load BDS Coalition CSV data"""
-        records = []
+        count = 0
 
         if not os.path.exists(file_path):
             logger.warning(f"BDS Coalition file not found: {file_path}")
-            return records
+            return
 
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -285,21 +732,22 @@ class DataUnifier:
                         'data_sources': ['bdscoalition.ca'],
                         'last_updated': datetime.now().isoformat()
                     }
-                    records.append(record)
+                    yield record
+                    count += 1
 
         except Exception as e:
             logger.error(f"Error loading BDS Coalition CSV: {e}")
+            self.incomplete_sources.append(file_path)
 
-        logger.info(f"Loaded {len(records)} records from BDS Coalition")
-        return records
+        logger.info(f"Loaded {count} records from BDS Coalition")
 
-    def load_afsc_investigate_csv(self, file_path: str) -> List[Dict]:
+    def load_afsc_investigate_csv(self, file_path: str) -> Iterator[Dict]:
         """Load AFSC Investigate CSV data"""
-        records = []
+        count = 0
 
         if not os.path.exists(file_path):
             logger.warning(f"AFSC file not found: {file_path}")
-            return records
+            return
 
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -322,13 +770,12 @@ class DataUnifier:
                         involvement_types.append('border_security')
 
                     # Check summary for additional involvement types
-                    summary = row.get('Summary', '').lower()
-                    if 'settlement' in summary:
-                        involvement_details['settlements'] = True
-                        involvement_types.append('settlements')
-                    if 'military' in summary or 'weapon' in summary or 'defense' in summary:
-                        involvement_details['military'] = True
-                        involvement_types.append('military_support')
+                    involvement = self.classifier.classify(row.get('Summary', ''))
+                    for involvement_type in involvement.types:
+                        if involvement_type not in involvement_types:
+                            involvement_types.append(involvement_type)
+                    for detail in involvement.details:
+                        involvement_details[detail] = True
 
                     record = {
                         'id': self.generate_id(row.get('Company Short Name', '')),
@@ -359,41 +806,29 @@ class DataUnifier:
                             'isin': row.get('Primary ISIN', '').strip() or None
                         })
 
-                    records.append(record)
+                    yield record
+                    count += 1
 
         except Exception as e:
             logger.error(f"Error loading AFSC CSV: {e}")
+            self.incomplete_sources.append(file_path)
 
-        logger.info(f"Loaded {len(records)} records from AFSC Investigate")
-        return records
+        logger.info(f"Loaded {count} records from AFSC Investigate")
 
-    def load_boycott_thewitness_json(self, file_path: str) -> List[Dict]:
+    def load_boycott_thewitness_json(self, file_path: str) -> Iterator[Dict]:
         """Load Boycott.thewitness JSON data"""
-        records = []
+        count = 0
 
         if not os.path.exists(file_path):
             logger.warning(f"Boycott.thewitness file not found: {file_path}")
-            return records
+            return
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-                brands = data.get('sample_enhanced_brands', [])
-                for brand in brands:
-                    # Map categories to involvement types
-                    involvement_types = []
+            with open(file_path, 'rb') as f:
+                for brand in _iter_json_array(f, 'sample_enhanced_brands'):
+                    # Map the reason to involvement types
                     categories = brand.get('categories', [])
-                    reason_text = brand.get('reason', '').lower()
-
-                    if 'military' in reason_text or 'weapon' in reason_text:
-                        involvement_types.append('military_support')
-                    if 'surveillance' in reason_text:
-                        involvement_types.append('surveillance')
-                    if 'settlement' in reason_text:
-                        involvement_types.append('settlements')
-                    if 'occupation' in reason_text:
-                        involvement_types.append('occupation')
+                    involvement_types = list(self.classifier.classify(brand.get('reason', '')).types)
 
                     record = {
                         'id': self.generate_id(brand.get('name', '')),
@@ -412,40 +847,30 @@ class DataUnifier:
                         'data_sources': ['boycott.thewitness'],
                         'last_updated': datetime.now().isoformat()
                     }
-                    records.append(record)
+                    yield record
+                    count += 1
 
         except Exception as e:
             logger.error(f"Error loading Boycott.thewitness JSON: {e}")
+            self.incomplete_sources.append(file_path)
 
-        logger.info(f"Loaded {len(records)} records from Boycott.thewitness")
-        return records
+        logger.info(f"Loaded {count} records from Boycott.thewitness")
 
-    def load_who_profits_json(self, file_path: str) -> List[Dict]:
+    def load_who_profits_json(self, file_path: str) -> Iterator[Dict]:
         """Load Who Profits search results JSON"""
-        records = []
+        count = 0
 
         if not os.path.exists(file_path):
             logger.warning(f"Who Profits file not found: {file_path}")
-            return records
+            return
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-                results = data.get('results', {})
-                for booth, company_data in results.items():
+            with open(file_path, 'rb') as f:
+                for booth, company_data in _iter_json_object(f, 'results'):
                     if company_data.get('found'):
                         for match in company_data.get('matches', []):
                             # Determine involvement types from the involvement field
-                            involvement_types = []
-                            involvement_text = match.get('involvement', '').lower()
-
-                            if 'settlement' in involvement_text:
-                                involvement_types.append('settlements')
-                            if 'military' in involvement_text or 'defense' in involvement_text:
-                                involvement_types.append('military_support')
-                            if 'occupation' in involvement_text:
-                                involvement_types.append('occupation')
+                            involvement_types = list(self.classifier.classify(match.get('involvement', '')).types)
 
                             record = {
                                 'id': self.generate_id(match.get('company_name', '')),
@@ -462,173 +887,311 @@ class DataUnifier:
                                 'data_sources': ['whoprofits.org'],
                                 'last_updated': datetime.now().isoformat()
                             }
-                            records.append(record)
+                            yield record
+                            count += 1
 
         except Exception as e:
             logger.error(f"Error loading Who Profits JSON: {e}")
+            self.incomplete_sources.append(file_path)
+
+        logger.info(f"Loaded {count} records from Who Profits")
 
-        logger.info(f"Loaded {len(records)} records from Who Profits")
-        return records
+    def merge_records(self, existing: CompanyRecord, new: CompanyRecord) -> CompanyRecord:
+        """
+        Merge a new record into the existing record for the same company
 
-    def merge_records(self, existing: Dict, new: Dict) -> Dict:
-        """Merge two records for the same company"""
-        # Start with existing record
-        merged = existing.copy()
+        The existing record is updated in place. Merged array fields are kept
+        as insertion-ordered sets (dicts), stock symbols as a map keyed by
+        symbol and reasons as a set of distinct reasons, so each merge only
+        touches the new values; CompanyRecord.finalize turns them back into lists.
+        """
+        merged = existing
 
         # Update basic fields if new has better data
-        if new.get('standard_name') and not merged.get('standard_name'):
-            merged['standard_name'] = new['standard_name']
+        if new.standard_name and not merged.standard_name:
+            merged.standard_name = new.standard_name
 
-        if new.get('parent_company') and not merged.get('parent_company'):
-            merged['parent_company'] = new['parent_company']
+        if new.parent_company and not merged.parent_company:
+            merged.parent_company = new.parent_company
 
-        if new.get('country_hq') and not merged.get('country_hq'):
-            merged['country_hq'] = new['country_hq']
+        if new.country_hq and not merged.country_hq:
+            merged.country_hq = new.country_hq
 
-        if new.get('industry') and not merged.get('industry'):
-            merged['industry'] = new['industry']
+        if new.industry and not merged.industry:
+            merged.industry = new.industry
 
-        if new.get('description') and len(new['description']) > len(merged.get('description', '')):
-            merged['description'] = new['description']
+        if new.description and len(new.description) > len(merged.description or ''):
+            merged.description = new.description
 
         # Merge arrays
-        for field in ['aliases', 'sectors', 'involvement_types', 'sources',
-                     'evidence_links', 'boycott_actions', 'alternatives',
-                     'campaigns', 'data_sources']:
-            if field in new:
-                if field not in merged:
-                    merged[field] = []
-                merged[field] = list(set(merged[field] + new[field]))
-
-        # Merge stock symbols
-        if 'stock_symbols' in new:
-            if 'stock_symbols' not in merged:
-                merged['stock_symbols'] = []
-            # Avoid duplicate symbols
-            existing_symbols = {s['symbol'] for s in merged['stock_symbols']}
-            for symbol in new['stock_symbols']:
-                if symbol['symbol'] not in existing_symbols:
-                    merged['stock_symbols'].append(symbol)
+        for field in UNORDERED_ARRAY_FIELDS:
+            new_values = getattr(new, field)
+            if new_values is not MISSING:
+                values = getattr(merged, field)
+                if not isinstance(values, dict):
+                    values = dict.fromkeys(values or ())
+                    setattr(merged, field, values)
+                values.update(dict.fromkeys(new_values))
+
+        # Merge stock symbols, keeping the first entry per symbol
+        if new.stock_symbols is not MISSING:
+            symbols = merged.stock_symbols
+            if not isinstance(symbols, dict):
+                symbols = {}
+                for symbol in merged.stock_symbols or ():
+                    symbols.setdefault(symbol.symbol, symbol)
+                merged.stock_symbols = symbols
+            for symbol in new.stock_symbols:
+                symbols.setdefault(symbol.symbol, symbol)
 
         # Merge involvement details
-        if 'involvement_details' in new:
-            if 'involvement_details' not in merged:
-                merged['involvement_details'] = {}
-            merged['involvement_details'].update(new['involvement_details'])
+        if new.involvement_details is not MISSING:
+            if merged.involvement_details is MISSING:
+                merged.involvement_details = {}
+            merged.involvement_details.update(new.involvement_details)
 
-        # Append reasons
-        if 'reasons' in new:
-            if 'reasons' not in merged:
-                merged['reasons'] = []
-            merged['reasons'].extend(new['reasons'])
+        # Add reasons, dropping exact duplicates
+        if new.reasons is not MISSING:
+            if not isinstance(merged.reasons, dict):
+                merged.reasons = dict.fromkeys(merged.reasons or ())
+            merged.reasons.update(dict.fromkeys(new.reasons))
 
         # Update priority if new has higher priority
-        if new.get('divestment_priority') == 'shortlist':
-            merged['divestment_priority'] = 'shortlist'
+        if new.divestment_priority == 'shortlist':
+            merged.divestment_priority = 'shortlist'
 
         # Update booth number if available
-        if new.get('booth_number'):
-            merged['booth_number'] = new['booth_number']
+        if new.booth_number:
+            merged.booth_number = new.booth_number
 
         # Calculate confidence score based on number of sources
-        merged['confidence_score'] = min(1.0, len(merged.get('data_sources', [])) * 0.25)
+        merged.confidence_score = min(1.0, len(merged.data_sources or ()) * 0.25)
 
         # Update timestamp
-        merged['last_updated'] = datetime.now().isoformat()
+        merged.last_updated = datetime.now().isoformat()
 
         self.stats['duplicates_merged'] += 1
 
         return merged
 
-    def unify_all_sources(self):
-        """Load and unify data from all available sources"""
+    def unify_all_sources(self, base_dir: Optional[str] = None):
+        """
+        Load and unify data from all available sources
+
+        Args:
+            base_dir: Directory holding the source folders (default: the Sources tree)
+        """
+        if base_dir is not None:
+            base_dir = Path(base_dir)
         # Check if running in Docker (Sources mounted at /app/Sources)
-        if os.path.exists('/app/Sources'):
+        elif os.path.exists('/app/Sources'):
             base_dir = Path('/app/Sources')
         else:
             # Running locally
             base_dir = Path(__file__).parent.parent
 
-        # Load BDS Coalition data
-        bds_file = base_dir / "bdscoalition.ca" / "BDS Shame List (20AUG2025).csv"
-        bds_records = self.load_bds_coalition_csv(str(bds_file))
-        self._add_records(bds_records)
-
-        # Load AFSC Investigate data
-        afsc_file = base_dir / "investigate.afsc.org" / "investigate-dataset-july-2025.csv"
-        afsc_records = self.load_afsc_investigate_csv(str(afsc_file))
-        self._add_records(afsc_records)
-
-        # Load Boycott.thewitness data
-        boycott_file = base_dir / "boycott.thewitness" / "sample_output.json"
-        boycott_records = self.load_boycott_thewitness_json(str(boycott_file))
-        self._add_records(boycott_records)
+        # Sources in the fixed order their records are merged
+        sources = [
+            (self.load_bds_coalition_csv, base_dir / "bdscoalition.ca" / "BDS Shame List (20AUG2025).csv"),
+            (self.load_afsc_investigate_csv, base_dir / "investigate.afsc.org" / "investigate-dataset-july-2025.csv"),
+            (self.load_boycott_thewitness_json, base_dir / "boycott.thewitness" / "sample_output.json"),
+        ]
 
-        # Load Who Profits data (if exists)
+        # Who Profits results exist once the scraper has run; until then the source counts as missing
         who_profits_file = base_dir / "dontbuyintooccupation.org" / "output" / "who_profits_results_latest.json"
-        if who_profits_file.exists():
-            who_profits_records = self.load_who_profits_json(str(who_profits_file))
-            self._add_records(who_profits_records)
+        sources.append((self.load_who_profits_json, who_profits_file))
 
-    def _add_records(self, records: List[Dict]):
+        if self.workers == 1:
+            for loader, file_path in sources:
+                self._add_records(self.timer.iterate(loader.__name__, self._load_source(loader, str(file_path))))
+        else:
+            # Loaders are independent, so parse all files at once and merge in source order
+            logger.info(f"Loading {len(sources)} sources with {self.workers} workers")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(sources))) as pool:
+                futures = [pool.submit(_collect_records, loader, str(file_path)) for loader, file_path in sources]
+                for future in futures:
+                    records, stages, incomplete_sources = future.result()
+                    self.timer.merge(stages)
+                    self.incomplete_sources.extend(incomplete_sources)
+                    self._add_records(records)
+
+        # Merge near-duplicate companies that exact matching missed
+        if self.fuzzy_threshold is not None:
+            self.resolve_fuzzy_duplicates(self.fuzzy_threshold)
+
+        self.finalize_records()
+
+    def finalize_records(self):
+        """Convert merged records to the schema's list form (safe to call more than once)"""
+        for record in self.unified_data.values():
+            record.finalize()
+
+    def _load_source(self, loader, file_path: str) -> Iterator[Dict]:
+        """Run a loader, or replay its cached output if the source file is unchanged"""
+        if not os.path.exists(file_path):
+            self.incomplete_sources.append(file_path)
+            return loader(file_path)
+        if self.source_cache is None:
+            return loader(file_path)
+
+        key = self.source_cache.key(loader.__name__, file_path)
+        cached = self.source_cache.get(loader.__name__, key)
+        if cached is None:
+            return self._cache_complete_load(loader, file_path, key)
+        return _replay_cached(cached, loader.__name__)
+
+    def _cache_complete_load(self, loader, file_path: str, key: str) -> Iterator[Dict]:
+        """Run a loader through the source cache, dropping the entry if the load failed part way"""
+        yield from self.source_cache.put(loader.__name__, key, loader(file_path))
+        # Loaders log errors and stop early, so a replay would pass partial output off as complete
+        if file_path in self.incomplete_sources:
+            self.source_cache.invalidate(loader.__name__)
+
+    def _index_record(self, record_id: str, normalized_name: str):
+        """Register a newly added record in the lookup indexes"""
+        self._record_order[record_id] = len(self._record_order)
+        # Only the first record with a given normalized name is ever matched
+        self._name_index.setdefault(normalized_name, record_id)
+
+    def _find_existing_id(self, record: CompanyRecord, normalized_name: str) -> Optional[str]:
+        """Find the id of the existing record that a new record should merge into"""
+        candidates = []
+        name_match = self._name_index.get(normalized_name)
+        if name_match is not None:
+            candidates.append(name_match)
+        if record.id in self.unified_data:
+            candidates.append(record.id)
+        if not candidates:
+            return None
+
+        # Prefer the earliest inserted record, as a linear scan would
+        return min(candidates, key=self._record_order.__getitem__)
+
+    def _add_records(self, records: Iterable[Dict]):
         """Add records to unified data, merging duplicates"""
-        logger.info(f"Processing {len(records)} records...")
-        for i, record in enumerate(records):
-            if i % 100 == 0 and i > 0:
-                logger.info(f"  Processed {i}/{len(records)} records...")
-            # Normalize the company name for matching
-            normalized_name = self.normalize_company_name(record['name'])
-
-            # Check if we already have this company
-            found = False
-            for existing_id, existing_record in self.unified_data.items():
-                existing_normalized = self.normalize_company_name(existing_record['name'])
-
-                # Check for name match or same ID
-                if existing_normalized == normalized_name or existing_id == record['id']:
+        logger.info("Processing records...")
+        with self.timer.stage('add_records') as stage:
+            for i, record in enumerate(records):
+                if i % 100 == 0 and i > 0:
+                    logger.info(f"  Processed {i} records...")
+                record = CompanyRecord.from_dict(record)
+                # Normalize the company name for matching
+                normalized_name = self.normalize_company_name(record.name)
+
+                # Check if we already have this company
+                existing_id = self._find_existing_id(record, normalized_name)
+
+                if existing_id is not None:
                     # Merge the records
-                    self.unified_data[existing_id] = self.merge_records(existing_record, record)
-                    found = True
-                    break
-
-            if not found:
-                # Add as new record
-                self.unified_data[record['id']] = record
-                self.stats['total_records'] += 1
+                    self.unified_data[existing_id] = self.merge_records(self.unified_data[existing_id], record)
+                else:
+                    # Add as new record
+                    self.unified_data[record.id] = record
+                    self._index_record(record.id, normalized_name)
+                    self.stats['total_records'] += 1
+                stage['records'] += 1
+
+    def resolve_fuzzy_duplicates(self, threshold: float) -> List[Dict[str, Any]]:
+        """
+        Merge near-duplicate companies (e.g. "HPE" and "Hewlett Packard Enterprise (HPE)")
+
+        Args:
+            threshold: Minimum name similarity (0-1] for two companies to be merged
+
+        Returns:
+            One entry per merged cluster with the surviving id and the merged names
+        """
+        record_ids = list(self.unified_data.keys())
+        with self.timer.stage('resolve_fuzzy_duplicates', len(record_ids)):
+            normalized_names = [self.normalize_company_name(self.unified_data[rid].name) for rid in record_ids]
+
+            resolver = FuzzyEntityResolver(threshold)
+            clusters = resolver.find_clusters(normalized_names)
+        logger.info(f"Fuzzy resolution compared {resolver.comparisons} candidate pairs "
+                    f"for {len(record_ids)} companies, found {len(clusters)} clusters")
+
+        merged_clusters = []
+        for members in clusters:
+            # Members are in insertion order, so the earliest record survives
+            survivor_id = record_ids[members[0]]
+            merged_names = [self.unified_data[survivor_id].name]
+
+            for position in members[1:]:
+                duplicate_id = record_ids[position]
+                duplicate = self.unified_data.pop(duplicate_id).finalize()
+                self.unified_data[survivor_id] = self.merge_records(self.unified_data[survivor_id], duplicate)
+                merged_names.append(duplicate.name)
+
+                # Point lookups for the duplicate at the surviving record
+                del self._record_order[duplicate_id]
+                self._name_index[normalized_names[position]] = survivor_id
+                self.stats['total_records'] -= 1
+
+            logger.info(f"  Merged fuzzy cluster into {survivor_id}: {merged_names}")
+            merged_clusters.append({'id': survivor_id, 'names': merged_names})
+
+        self.stats['fuzzy_clusters_merged'] += len(merged_clusters)
+        return merged_clusters
 
     def validate_and_save(self):
         """Validate unified data, save to file, and insert to database"""
+        self.finalize_records()
         logger.info("Validating unified data...")
 
         valid_records = []
         invalid_records = []
 
-        for record_id, record in self.unified_data.items():
-            is_valid, errors = self.validator.validate_record(record)
+        # Changed companies are handed to background writers as soon as they validate
+        connected = self.connect_to_database()
+        pipeline = self.start_database_writer() if connected and self.db_writers else None
+        db_writer, existing = pipeline or (None, None)
 
-            if is_valid:
-                valid_records.append(record)
-            else:
-                logger.warning(f"Validation errors for {record['name']}: {errors}")
-                invalid_records.append(record)
-                self.stats['validation_errors'] += 1
+        # Records are validated in their schema (dict) form, converted one at a time
+        records = list(self.unified_data.values())
+        try:
+            with self.timer.stage('validate', len(records)):
+                results = self.validator.validate_iter((record.to_dict() for record in records),
+                                                       workers=self.workers)
+                for record, (data, is_valid, errors) in zip(records, results):
+                    if is_valid:
+                        valid_records.append(record)
+                        if db_writer is not None and self._content_changed(record, data, existing):
+                            db_writer.put(data)
+                    else:
+                        logger.warning(f"Validation errors for {record.name}: {errors}")
+                        invalid_records.append(record)
+                        self.stats['validation_errors'] += 1
+        except BaseException:
+            if db_writer is not None:
+                db_writer.close()
+            self.close_database_connection()
+            raise
+
+        if db_writer is not None:
+            try:
+                self.finish_database_writer(db_writer, existing)
+                self.db_conn.commit()
+                logger.info(f"Database sync complete! Inserted {self.stats['database_inserts']} records")
+                self.refresh_full_view()
+            except Exception as e:
+                logger.error(f"Database sync failed: {e}")
+                self.db_conn.rollback()
+            finally:
+                self.close_database_connection()
 
-        # Connect to database and insert records
-        if self.connect_to_database():
+        # Otherwise write all changed companies in one transaction
+        elif connected:
             logger.info(f"Inserting {len(valid_records)} valid records to database...")
             self.db_conn.autocommit = False  # Use transactions
 
             try:
-                for i, record in enumerate(valid_records):
-                    if i % 100 == 0 and i > 0:
-                        logger.info(f"  Inserted {i}/{len(valid_records)} records to database...")
-                        self.db_conn.commit()
-
-                    self.insert_company_to_database(record)
+                with self.timer.stage('database_sync'):
+                    self.sync_to_database(valid_records)
 
                 # Final commit
                 self.db_conn.commit()
                 logger.info(f"Database insertion complete! Inserted {self.stats['database_inserts']} records")
+                self.refresh_full_view()
 
             except Exception as e:
                 logger.error(f"Database transaction failed: {e}")
@@ -637,56 +1200,49 @@ class DataUnifier:
             finally:
                 self.close_database_connection()
 
-        # Save valid records
+        # Save valid records and the CSV summary in a single pass
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        # Save main unified data file
-        output_file = self.output_dir / f'unified_bds_data_{timestamp}.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'metadata': {
-                    'generated_at': datetime.now().isoformat(),
-                    'total_records': len(valid_records),
-                    'sources_processed': list(set(sum([r['data_sources'] for r in valid_records], []))),
-                    'schema_version': '1.0',
-                    'stats': self.stats
-                },
-                'companies': valid_records
-            }, f, indent=2, ensure_ascii=False)
-
-        # Save latest version
-        latest_file = self.output_dir / 'unified_bds_data_latest.json'
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'metadata': {
-                    'generated_at': datetime.now().isoformat(),
-                    'total_records': len(valid_records),
-                    'sources_processed': list(set(sum([r['data_sources'] for r in valid_records], []))),
-                    'schema_version': '1.0',
-                    'stats': self.stats
-                },
-                'companies': valid_records
-            }, f, indent=2, ensure_ascii=False)
-
-        # Save CSV summary
         csv_file = self.output_dir / f'unified_bds_summary_{timestamp}.csv'
-        with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        with UnifiedDataWriter(self.output_dir, timestamp, self.output_format) as data_writer, \
+                open(csv_file, 'w', encoding='utf-8', newline='') as f:
             fieldnames = ['name', 'standard_name', 'parent_company', 'country_hq',
                          'industry', 'involvement_types', 'data_sources', 'confidence_score']
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
 
-            for record in valid_records:
-                writer.writerow({
-                    'name': record.get('name'),
-                    'standard_name': record.get('standard_name'),
-                    'parent_company': record.get('parent_company'),
-                    'country_hq': record.get('country_hq'),
-                    'industry': record.get('industry'),
-                    'involvement_types': ', '.join(record.get('involvement_types', [])),
-                    'data_sources': ', '.join(record.get('data_sources', [])),
-                    'confidence_score': record.get('confidence_score', 0)
-                })
+            with self.timer.stage('write_output', len(valid_records)):
+                for record in valid_records:
+                    record = record.to_dict()
+                    data_writer.write(record)
+                    writer.writerow({
+                        'name': record.get('name'),
+                        'standard_name': record.get('standard_name'),
+                        'parent_company': record.get('parent_company'),
+                        'country_hq': record.get('country_hq'),
+                        'industry': record.get('industry'),
+                        'involvement_types': ', '.join(record.get('involvement_types', [])),
+                        'data_sources': ', '.join(record.get('data_sources', [])),
+                        'confidence_score': record.get('confidence_score', 0)
+                    })
+
+            # Stages up to here; later ones (columnar export) are only logged
+            self.stats['stages'] = self.timer.summary()
+            data_writer.finalize({
+                'generated_at': datetime.now().isoformat(),
+                'total_records': data_writer.count,
+                'sources_processed': sorted(data_writer.sources_processed),
+                'schema_version': SCHEMA_VERSION,
+                'stats': self.stats
+            })
+        output_file = data_writer.path
+
+        # Columnar copies for analysts
+        if self.export_formats:
+            with self.timer.stage('export_columnar', len(valid_records)):
+                export_dir = export_columnar((record.to_dict() for record in valid_records),
+                                             self.output_dir, timestamp, self.export_formats)
+            logger.info(f"Columnar export ({', '.join(self.export_formats)}) saved to: {export_dir}")
 
         # Print summary
         logger.info("=" * 50)
@@ -699,26 +1255,98 @@ class DataUnifier:
         logger.info(f"Output saved to: {output_file}")
         logger.info(f"Summary saved to: {csv_file}")
 
+        self.stats['stages'] = self.timer.summary()
+        logger.info("Stage timings:")
+        for name, stage in self.stats['stages'].items():
+            throughput = f"{stage['records_per_sec']:.0f} records/s" if stage['records_per_sec'] else "-"
+            memory = f", peak {stage['peak_memory_mb']:.1f} MB" if stage['peak_memory_mb'] is not None else ""
+            logger.info(f"  {name}: {stage['wall_seconds']:.2f}s wall, {stage['cpu_seconds']:.2f}s CPU, "
+                        f"{throughput}{memory}")
+        if self.profile:
+            profile_dir = self.output_dir / f'profile_{timestamp}'
+            self.timer.dump_profiles(profile_dir)
+            logger.info(f"cProfile data per stage saved to: {profile_dir}")
+
         # Print top companies by confidence
         sorted_companies = sorted(valid_records,
-                                 key=lambda x: x.get('confidence_score', 0),
+                                 key=lambda x: x.confidence_score or 0,
                                  reverse=True)[:10]
         logger.info("\nTop 10 companies by confidence score:")
         for company in sorted_companies:
-            logger.info(f"  - {company['name']}: {company.get('confidence_score', 0):.2f} "
-                       f"(sources: {len(company.get('data_sources', []))})")
+            logger.info(f"  - {company.name}: {company.confidence_score or 0:.2f} "
+                       f"(sources: {len(company.data_sources or [])})")
 
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Unify BDS data from all sources")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('UNIFY_WORKERS', 1)),
+                        help="Processes used to load sources and validate records concurrently "
+                             "(default: 1, sequential)")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS,
+                        default=os.environ.get('OUTPUT_FORMAT', 'json'),
+                        help="Unified data file format: compact JSON or NDJSON (default: json)")
+    parser.add_argument('--export', choices=EXPORT_FORMATS, action='append',
+                        default=[f for f in os.environ.get('EXPORT_FORMATS', '').split(',') if f],
+                        help="Also export companies and child lists as Parquet/Arrow (repeatable)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Dump cProfile data per stage to OUTPUT_DIR/profile_<timestamp>/")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record tracemalloc peak memory per stage (slows allocation-heavy stages)")
+    parser.add_argument('--no-source-cache', action='store_true',
+                        help="Parse every source file instead of reusing cached records")
+    parser.add_argument('--clear-source-cache', action='store_true',
+                        help="Delete all cached parsed sources before loading")
+    parser.add_argument('--involvement-taxonomy', default=os.environ.get('INVOLVEMENT_TAXONOMY'),
+                        help="JSON file mapping involvement types to detail flags and keywords "
+                             "(default: the built-in taxonomy)")
+    args = parser.parse_args()
+
     output_dir = os.environ.get('OUTPUT_DIR', '/app/output')
 
     logger.info("Starting BDS Data Unification")
     logger.info(f"Output directory: {output_dir}")
 
-    unifier = DataUnifier(output_dir)
-    unifier.unify_all_sources()
-    unifier.validate_and_save()
+    # Optional fuzzy matching of near-duplicate names, e.g. FUZZY_MATCH_THRESHOLD=0.9
+    fuzzy_threshold = os.environ.get('FUZZY_MATCH_THRESHOLD')
+
+    # "bulk" (default) loads through staging tables, "row" inserts one company at a time
+    db_load_mode = os.environ.get('DB_LOAD_MODE', 'bulk')
+
+    # Database writer threads overlapping validation, and companies per committed batch
+    # (DB_WRITERS=0 writes everything in one transaction after validation)
+    db_writers = int(os.environ.get('DB_WRITERS', DEFAULT_WRITERS))
+    db_batch_size = int(os.environ.get('DB_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+
+    # Cache of parsed source files, bounded to SOURCE_CACHE_MAX_MB
+    source_cache_dir = None
+    if not args.no_source_cache:
+        source_cache_dir = os.environ.get('SOURCE_CACHE_DIR', os.path.join(output_dir, '.source_cache'))
+    source_cache_max_mb = os.environ.get('SOURCE_CACHE_MAX_MB')
+
+    unifier = DataUnifier(output_dir,
+                          fuzzy_threshold=float(fuzzy_threshold) if fuzzy_threshold else None,
+                          db_load_mode=db_load_mode,
+                          db_writers=db_writers,
+                          db_batch_size=db_batch_size,
+                          workers=args.workers,
+                          output_format=args.output_format,
+                          export_formats=args.export,
+                          profile=args.profile,
+                          trace_memory=args.trace_memory,
+                          source_cache_dir=source_cache_dir,
+                          source_cache_max_bytes=(int(source_cache_max_mb) * 1024 * 1024
+                                                  if source_cache_max_mb else DEFAULT_MAX_BYTES),
+                          involvement_taxonomy=(load_taxonomy(args.involvement_taxonomy)
+                                                if args.involvement_taxonomy else None))
+    if args.clear_source_cache and unifier.source_cache is not None:
+        removed = unifier.source_cache.invalidate()
+        logger.info(f"Cleared {removed} source cache entries")
+    try:
+        unifier.unify_all_sources()
+        unifier.validate_and_save()
+    finally:
+        unifier.timer.close()
 
 
 if __name__ == "__main__":
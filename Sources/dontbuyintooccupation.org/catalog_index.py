@@ -0,0 +1,123 @@
+"""
+Who Profits Catalog Index
+
+This module stores the complete Who Profits company table, crawled once by
+main.py --catalog, and matches company names against it locally instead of
+sending searches to whoprofits.org.
+
+Every word of every catalog company name goes into an in-memory token index
+(token -> catalog positions), and a search term is looked up like a site
+search: the candidates are the companies whose names contain all of its
+words, found by intersecting their posting lists. Screening N companies then
+costs the fixed number of page fetches of the crawl plus O(N) local lookups,
+one dictionary lookup per word. Lookups return
+rows shaped like the rows parsed from a search page, so they go through the
+scraper's usual match filter.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Bump when the stored layout changes; older catalogs must be crawled again
+CATALOG_FORMAT_VERSION = 1
+
+CATALOG_FIELDS = ('company_name', 'traded_in', 'headquarters', 'involvement')
+
+# Runs of Latin letters and digits, or of other letters: catalog names often
+# run straight into their Hebrew form ("Ashtrom Groupקבוצת אשטרום")
+_TOKEN = re.compile(r'[0-9a-z\u00c0-\u024f]+|[^\W\d_a-z\u00c0-\u024f]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a name, as indexed and looked up"""
+    return _TOKEN.findall(text.lower())
+
+
+def save_catalog(path: str, entries: List[Dict[str, Any]], metadata: Dict[str, Any]):
+    """
+    Write the catalog as JSON, replacing any previous file atomically
+
+    Args:
+        path: Catalog file
+        entries: Catalog companies (CATALOG_FIELDS)
+        metadata: Crawl details stored alongside (date, pages, ...)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    catalog = {
+        'metadata': dict(metadata, format_version=CATALOG_FORMAT_VERSION, total_companies=len(entries)),
+        'companies': [{field: entry.get(field, '') for field in CATALOG_FIELDS} for entry in entries],
+    }
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=2, ensure_ascii=False)
+    os.replace(temporary_path, path)
+
+
+def load_catalog(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Read a catalog written by save_catalog
+
+    Returns:
+        (catalog companies, metadata)
+
+    Raises:
+        ValueError: If the file was written in another format version
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    version = catalog.get('metadata', {}).get('format_version')
+    if version != CATALOG_FORMAT_VERSION:
+        raise ValueError(f"Catalog {path} has format version {version}, expected {CATALOG_FORMAT_VERSION}")
+    return catalog['companies'], catalog['metadata']
+
+
+class CatalogIndex:
+    """In-memory token index over the catalog company names"""
+
+    def __init__(self, entries: Iterable[Dict[str, Any]]):
+        """
+        Build the index
+
+        Args:
+            entries: Catalog companies (CATALOG_FIELDS)
+        """
+        self.entries = [{field: entry.get(field, '') for field in CATALOG_FIELDS} for entry in entries]
+        self._postings: Dict[str, List[int]] = {}
+        for position, entry in enumerate(self.entries):
+            for token in dict.fromkeys(tokenize(entry['company_name'])):
+                self._postings.setdefault(token, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def candidates(self, search_term: str) -> List[int]:
+        """Catalog positions of the companies whose names contain every word of the search term, in catalog order"""
+        tokens = set(tokenize(search_term))
+        if not tokens:
+            return []
+        # Intersect starting from the rarest word, so the working set only shrinks
+        postings = sorted((self._postings.get(token, []) for token in tokens), key=len)
+        positions = set(postings[0])
+        for posting in postings[1:]:
+            if not positions:
+                break
+            positions.intersection_update(posting)
+        return sorted(positions)
+
+    def lookup(self, search_term: str) -> List[Dict[str, Any]]:
+        """
+        Candidate rows for a search term
+
+        Args:
+            search_term: Term that would have been searched for
+
+        Returns:
+            Rows shaped like those parsed from a search page (catalog fields and
+            search_term), to be narrowed down by the usual match filter
+        """
+        return [dict(self.entries[position], search_term=search_term)
+                for position in self.candidates(search_term)]
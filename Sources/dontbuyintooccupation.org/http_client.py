@@ -0,0 +1,426 @@
+"""
+HTTP Client
+
+Shared HTTP layer of the Who Profits scraper. Both search modes send their
+requests through it:
+
+- HttpClient: a requests.Session with a connection pool, for the sequential search
+- AsyncHttpClient: an aiohttp.ClientSession with a limited connector, for the
+  concurrent search, paced by a global TokenBucket
+
+Connections are kept alive and reused between requests, responses may be
+gzip-compressed, and failed requests (connection errors, timeouts, 429 and
+5xx responses) are retried with exponential backoff and full jitter; a
+Retry-After header from the server takes precedence over the backoff. Each
+client counts its requests, retries and how many requests went out on a
+reused connection instead of a new TCP+TLS handshake.
+
+With a ResponseCache, fresh cached pages are served without touching the
+network (or the rate limit), stale ones are revalidated with a conditional
+request, and in offline mode only the cache is consulted.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import aiohttp
+except ImportError:  # Only AsyncHttpClient needs aiohttp
+    aiohttp = None
+
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRIES = 3
+# Seconds before the first retry; doubled for every further one
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 4
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Answer to an offline request that is not cached (as for Cache-Control: only-if-cached)
+OFFLINE_MISS_STATUS = 504
+
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed request"""
+
+    def __init__(self, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        """
+        Args:
+            retries: Retries after the first attempt (0 disables retrying)
+            backoff: Upper bound of the first delay in seconds, doubled per retry
+            max_backoff: Longest delay, also applied to Retry-After
+        """
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before retry number attempt + 1
+
+        Args:
+            attempt: Attempts made so far, minus one (0 after the first failure)
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            The server's delay if given, else a random delay up to the
+            exponential backoff (full jitter, so concurrent clients spread out)
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def _new_stats() -> Dict[str, int]:
+    return {
+        'requests': 0,
+        # Requests that went to the server, i.e. were not answered from the cache
+        'network_requests': 0,
+        'retries': 0,
+        'failures': 0,
+        'connections_opened': 0,
+        'connections_reused': 0,
+        # Requests answered from the cache without a request, after a 304,
+        # and offline requests that were not cached
+        'cache_hits': 0,
+        'cache_revalidated': 0,
+        'cache_misses_offline': 0,
+    }
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of client statistics"""
+    attempts = stats['connections_opened'] + stats['connections_reused']
+    reuse = stats['connections_reused'] / attempts if attempts else 0.0
+    return (f"{stats['requests']} requests ({stats['network_requests']} sent), {stats['retries']} retries, "
+            f"{stats['failures']} failed, "
+            f"{stats['connections_opened']} connections opened, {stats['connections_reused']} reused "
+            f"({reuse:.0%}), {stats['cache_hits']} cache hits, {stats['cache_revalidated']} revalidated, "
+            f"{stats['cache_misses_offline']} offline misses")
+
+
+class HttpResponse(NamedTuple):
+    """Status, headers and body of a completed request"""
+
+    status: int
+    # Charset from the Content-Type header, resolved as requests does
+    encoding: Optional[str]
+    body: bytes
+    headers: Mapping[str, str] = {}
+
+    @property
+    def text(self) -> str:
+        """Body decoded like requests' response.text, so both clients yield the same text"""
+        return self.body.decode(self.encoding or 'ISO-8859-1', errors='replace')
+
+
+class _CachingClient:
+    """Response cache handling shared by HttpClient and AsyncHttpClient"""
+
+    def __init__(self, cache: Optional[ResponseCache], offline: bool):
+        if offline and cache is None:
+            raise ValueError("Offline mode needs a response cache")
+        self.cache = cache
+        self.offline = offline
+        self.stats = _new_stats()
+
+    def _lookup(self, url: str, params: Optional[Dict[str, Any]]):
+        """
+        Consult the cache before a request
+
+        Returns:
+            (response to serve without a request or None, cached entry to revalidate or None)
+        """
+        self.stats['requests'] += 1
+        if self.cache is None:
+            return None, None
+        entry = self.cache.get(url, params)
+        if entry is not None and (self.offline or entry.is_fresh(self.cache.ttl)):
+            self.stats['cache_hits'] += 1
+            return HttpResponse(entry.status, entry.encoding, entry.body), None
+        if self.offline:
+            self.stats['cache_misses_offline'] += 1
+            logger.debug(f"Offline, not cached: {ResponseCache.request_url(url, params)}")
+            return HttpResponse(OFFLINE_MISS_STATUS, None, b''), None
+        return None, entry
+
+    def _store(self, url: str, params: Optional[Dict[str, Any]], entry, response: HttpResponse) -> HttpResponse:
+        """Cache a fresh 200 response, or serve the cached entry the server confirmed with a 304"""
+        if self.cache is None:
+            return response
+        if response.status == 304 and entry is not None:
+            self.cache.refresh(entry.key)
+            self.stats['cache_revalidated'] += 1
+            return HttpResponse(entry.status, entry.encoding, entry.body)
+        if response.status == 200:
+            self.cache.put(url, params, response.status, response.encoding, response.body,
+                           response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response
+
+
+class HttpClient(_CachingClient):
+    """Pooled keep-alive requests session with retries"""
+
+    def __init__(self, retry_policy: Optional[RetryPolicy] = None, timeout: float = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE, cache: Optional[ResponseCache] = None,
+                 offline: bool = False):
+        """
+        Args:
+            retry_policy: Retry settings (default: RetryPolicy())
+            timeout: Seconds per attempt
+            pool_size: Connections kept open per host
+            cache: Response cache to serve and store pages (default: none)
+            offline: Serve only from the cache, never send a request
+        """
+        super().__init__(cache, offline)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Retries are done here, not in urllib3, so they honor Retry-After and are counted
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+
+    def _connections_opened(self) -> int:
+        pools = self._adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> HttpResponse:
+        """
+        GET a URL, retrying connection errors, timeouts, 429 and 5xx responses
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+
+        Returns:
+            The cached or fetched response (may still be a 429/5xx once retries
+            are exhausted, or a 504 for an uncached page in offline mode)
+
+        Raises:
+            requests.RequestException: If the last attempt failed without a response
+        """
+        cached, entry = self._lookup(url, params)
+        if cached is not None:
+            return cached
+        response = self._fetch(url, params, entry.validators() if entry else None)
+        return self._store(url, params, entry, response)
+
+    def _fetch(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> HttpResponse:
+        self.stats['network_requests'] += 1
+        policy = self.retry_policy
+        for attempt in range(policy.retries + 1):
+            opened = self._connections_opened()
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt == policy.retries:
+                    self.stats['failures'] += 1
+                    raise
+                logger.debug(f"Request to {url} failed ({e}), retrying")
+            else:
+                self._count_connection(opened)
+                if response.status_code not in RETRY_STATUSES or attempt == policy.retries:
+                    if response.status_code in RETRY_STATUSES:
+                        self.stats['failures'] += 1
+                    return HttpResponse(response.status_code, response.encoding, response.content,
+                                        response.headers)
+                retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                logger.debug(f"Request to {url} returned {response.status_code}, retrying")
+                response.close()
+
+            self.stats['retries'] += 1
+            time.sleep(policy.delay(attempt, retry_after))
+
+    def _count_connection(self, opened_before: int):
+        if self._connections_opened() > opened_before:
+            self.stats['connections_opened'] += 1
+        else:
+            self.stats['connections_reused'] += 1
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class TokenBucket:
+    """Global request rate limit shared by all concurrent requests"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: Tokens (requests) added per second; 0 or less disables the limit
+            capacity: Most tokens that can be saved up, i.e. the largest burst
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out first come, first served
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncHttpClient(_CachingClient):
+    """Pooled keep-alive aiohttp session with a concurrency limit, rate limit and retries"""
+
+    def __init__(self, concurrency: int = DEFAULT_POOL_SIZE, rate: float = 0, burst: int = 1,
+                 retry_policy: Optional[RetryPolicy] = None, timeout: float = DEFAULT_TIMEOUT,
+                 cache: Optional[ResponseCache] = None, offline: bool = False):
+        """
+        Args:
+            concurrency: Most requests in flight at once (and pooled connections)
+            rate: Requests per second over all requests, retries included (0: unlimited)
+            burst: Requests that may be sent back to back after an idle period
+            retry_policy: Retry settings (default: RetryPolicy())
+            timeout: Seconds per attempt
+            cache: Response cache to serve and store pages (default: none)
+            offline: Serve only from the cache, never send a request
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncHttpClient requires aiohttp")
+        super().__init__(cache, offline)
+        self.concurrency = max(1, concurrency)
+        self.limiter = TokenBucket(rate, burst)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.session = None
+
+    async def __aenter__(self):
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS,
+                                             trace_configs=[trace])
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    async def _on_connection_created(self, session, context, params):
+        self.stats['connections_opened'] += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self.stats['connections_reused'] += 1
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> HttpResponse:
+        """
+        GET a URL, retrying connection errors, timeouts, 429 and 5xx responses
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+
+        Returns:
+            The cached or fetched response (may still be a 429/5xx once retries
+            are exhausted, or a 504 for an uncached page in offline mode)
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If the last attempt failed without a response
+        """
+        # Cache hits skip the concurrency and rate limits
+        cached, entry = self._lookup(url, params)
+        if cached is not None:
+            return cached
+        response = await self._fetch(url, params, entry.validators() if entry else None)
+        return self._store(url, params, entry, response)
+
+    async def _fetch(self, url: str, params: Optional[Dict[str, Any]],
+                     headers: Optional[Dict[str, str]]) -> HttpResponse:
+        self.stats['network_requests'] += 1
+        policy = self.retry_policy
+        for attempt in range(policy.retries + 1):
+            retry_after = None
+            try:
+                # Backoff sleeps happen outside the semaphore, so waiting retries don't hold a slot
+                async with self._semaphore:
+                    await self.limiter.acquire()
+                    async with self.session.get(url, params=params, headers=headers,
+                                                timeout=self.timeout) as response:
+                        result = HttpResponse(response.status, response.charset, await response.read(),
+                                              response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == policy.retries:
+                    self.stats['failures'] += 1
+                    raise
+                logger.debug(f"Request to {url} failed ({e!r}), retrying")
+            else:
+                if result.status not in RETRY_STATUSES or attempt == policy.retries:
+                    if result.status in RETRY_STATUSES:
+                        self.stats['failures'] += 1
+                    return result
+                retry_after = retry_after_seconds(result.headers.get('Retry-After'))
+                logger.debug(f"Request to {url} returned {result.status}, retrying")
+
+            self.stats['retries'] += 1
+            await asyncio.sleep(policy.delay(attempt, retry_after))
@@ -1,12 +1,29 @@
 import requests
 from bs4 import BeautifulSoup
+import argparse
+import asyncio
 import json
+import math
 import time
 import os
+import sys
 import logging
 from datetime import datetime
 from urllib.parse import quote
 
+# The shared name normalizer lives with the unifier (copied next to main.py in Docker)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Unified'))
+
+from name_normalizer import LEGAL_SUFFIXES, NameNormalizer
+from http_client import AsyncHttpClient, HttpClient, RetryPolicy, format_stats
+from response_cache import ResponseCache
+from catalog_index import CatalogIndex, load_catalog, save_catalog
+
+try:
+    import aiohttp
+except ImportError:  # The concurrent search needs aiohttp; fall back to the sequential one
+    aiohttp = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +34,32 @@ logger = logging.getLogger(__name__)
 # Get output directory from environment variable
 OUTPUT_DIR = os.environ.get('OUTPUT_DIR', '/app/output')
 
+SEARCH_URL = "https://www.whoprofits.org/companies/find"
+
+# Searches in flight at once (0 runs the original sequential search), and the
+# global request rate shared by all of them, in requests per second with bursts
+# of up to SEARCH_BURST requests
+SEARCH_CONCURRENCY = int(os.environ.get('SEARCH_CONCURRENCY', '4'))
+SEARCH_RATE = float(os.environ.get('SEARCH_RATE', '2'))
+SEARCH_BURST = int(os.environ.get('SEARCH_BURST', '2'))
+
+# Retries of failed requests (connection errors, timeouts, 429/5xx), and the
+# backoff before the first retry in seconds (doubled per retry, jittered)
+HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', '3'))
+HTTP_BACKOFF = float(os.environ.get('HTTP_BACKOFF', '0.5'))
+
+# Response cache (empty path disables it); entries older than the TTL in
+# seconds are revalidated with the server, and the file is trimmed to the size limit
+HTTP_CACHE_PATH = os.environ.get('HTTP_CACHE_PATH', os.path.join(OUTPUT_DIR, 'http_cache.sqlite'))
+HTTP_CACHE_TTL = float(os.environ.get('HTTP_CACHE_TTL', str(24 * 60 * 60)))
+HTTP_CACHE_MAX_MB = int(os.environ.get('HTTP_CACHE_MAX_MB', '64'))
+
+# Local copy of the complete company table for --catalog, the query parameter
+# that selects a page of /companies/find, and a bound on the pages crawled
+CATALOG_PATH = os.environ.get('CATALOG_PATH', os.path.join(OUTPUT_DIR, 'who_profits_catalog.json'))
+CATALOG_PAGE_PARAM = os.environ.get('CATALOG_PAGE_PARAM', 'page')
+CATALOG_MAX_PAGES = int(os.environ.get('CATALOG_MAX_PAGES', '1000'))
+
 # Company data with booth numbers
 companies = {
     "20": "Arm Guard",
@@ -119,116 +162,438 @@ companies = {
     "402": "Procter & Gamble"
 }
 
+# Booth listings append qualifiers such as " Guard" that are not part of the company name
+search_normalizer = NameNormalizer(LEGAL_SUFFIXES + ("(HPE)", "Guard"))
+
 def clean_company_name(name):
     """Clean company name for better search matching"""
-    suffixes = [
-        " LLC", " Inc.", " Inc", " Ltd.", " Ltd", " Corporation", " Corp.",
-        " Corp", " Company", " Co.", " Group", " LLC", " (HPE)", " Guard"
-    ]
-    
-    clean_name = name
-    for suffix in suffixes:
-        clean_name = clean_name.replace(suffix, "")
-    
-    return clean_name.strip()
+    return search_normalizer.strip_suffixes(name)
 
-def search_who_profits(company_name):
-    """Search Who Profits database for a company"""
-    base_url = "https://www.whoprofits.org/companies/find"
-    
-    search_variations = [
+def build_search_variations(company_name):
+    """Build the search terms tried for a company: full, cleaned and first word"""
+    return [
         company_name,
         clean_company_name(company_name),
         company_name.split()[0] if len(company_name.split()) > 1 else company_name
     ]
-    
-    all_results = []
-    
-    for search_term in search_variations:
-        params = {
-            'Text': search_term,
-            'Name': '',
-            'Category': '',
-            'Sector': '',
-            'Headquarter': '',
-            'Revenue': '',
-            'Traded': '',
-            'Presence': '',
-            'Settlement': '',
-            'Type': 'Table'
-        }
-        
+
+def build_search_params(search_term):
+    """Query parameters of a Who Profits table search"""
+    return {
+        'Text': search_term,
+        'Name': '',
+        'Category': '',
+        'Sector': '',
+        'Headquarter': '',
+        'Revenue': '',
+        'Traded': '',
+        'Presence': '',
+        'Settlement': '',
+        'Type': 'Table'
+    }
+
+def parse_search_rows(soup, search_term):
+    """Read the rows of a search results table"""
+    rows_found = []
+    table = soup.find('table', class_='search-tbl')
+    if table:
+        tbody = table.find('tbody')
+        if tbody:
+            for row in tbody.find_all('tr'):
+                cols = row.find_all('td')
+                if len(cols) >= 5:
+                    rows_found.append({
+                        'company_name': cols[1].get_text(strip=True),
+                        'traded_in': cols[2].get_text(strip=True),
+                        'headquarters': cols[3].get_text(strip=True),
+                        'involvement': cols[4].get_text(strip=True),
+                        'search_term': search_term
+                    })
+    return rows_found
+
+def parse_results_number(soup):
+    """Total number of results reported above the table (None if missing)"""
+    results_number = soup.find('h5', class_='search-results-number')
+    if results_number is None:
+        return None
+    digits = ''.join(c for c in results_number.get_text(strip=True) if c.isdigit())
+    return int(digits) if digits else None
+
+def matches_search_term(company_name, search_term):
+    """Whether a result row plausibly names the company searched for"""
+    company_lower = company_name.lower()
+    search_lower = search_term.lower()
+    return (search_lower in company_lower or
+            any(word in company_lower for word in search_lower.split()) or
+            search_lower.split()[0] in company_lower)
+
+def merge_matches(all_results, rows):
+    """Append matching rows whose company is not in all_results yet"""
+    for company_info in rows:
+        if matches_search_term(company_info['company_name'], company_info['search_term']):
+            if not any(r['company_name'] == company_info['company_name'] for r in all_results):
+                all_results.append(company_info)
+
+def plan_searches(companies):
+    """
+    Plan the searches for all companies, so each distinct search term is fetched once
+
+    Companies often share terms: a company listed at two booths, a cleaned name
+    equal to the full name, or common first words ("Southern", "Pacific").
+
+    Args:
+        companies: Booth -> company name
+
+    Returns:
+        (booth -> search variations, distinct search terms in order of first use)
+    """
+    variations = {booth: build_search_variations(company) for booth, company in companies.items()}
+    terms = list(dict.fromkeys(term for booth_terms in variations.values() for term in booth_terms))
+    return variations, terms
+
+def fan_out(variations, rows_by_term):
+    """
+    Build each booth's matches from the rows fetched per search term
+
+    Args:
+        variations: Booth -> search variations, from plan_searches
+        rows_by_term: Search term -> parsed rows (None if the search failed)
+
+    Returns:
+        Booth -> matches, merged in variation order through the match filter
+    """
+    found = {}
+    for booth, search_variations in variations.items():
+        all_results = []
+        for search_term in search_variations:
+            rows = rows_by_term.get(search_term)
+            if rows:
+                merge_matches(all_results, rows)
+        found[booth] = all_results
+    return found
+
+def fetch_search_rows(client, search_term):
+    """Fetch and parse the results of one search term (None if the search failed)"""
+    try:
+        logger.debug(f"Searching with term: {search_term}")
+        response = client.get(SEARCH_URL, params=build_search_params(search_term))
+    except requests.RequestException as e:
+        logger.error(f"Error searching for {search_term}: {e}")
+        return None
+    if response.status != 200:
+        return None
+    return parse_search_rows(BeautifulSoup(response.text, 'html.parser'), search_term)
+
+async def fetch_search_rows_async(client, search_term):
+    """Fetch and parse the results of one search term (None if the search failed)"""
+    try:
+        logger.debug(f"Searching with term: {search_term}")
+        response = await client.get(SEARCH_URL, params=build_search_params(search_term))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Error searching for {search_term}: {e!r}")
+        return None
+    if response.status != 200:
+        return None
+    return parse_search_rows(BeautifulSoup(response.text, 'html.parser'), search_term)
+
+async def search_all_async(terms, concurrency, rate, burst, cache=None, offline=False):
+    """
+    Fetch all planned search terms concurrently
+
+    Args:
+        terms: Distinct search terms, from plan_searches
+        concurrency: Most requests in flight at once
+        rate: Requests per second across all searches
+        burst: Requests that may be sent back to back after an idle period
+        cache: ResponseCache to serve and store search pages
+        offline: Serve search pages only from the cache
+
+    Returns:
+        Search term -> parsed rows (None if the search failed)
+    """
+    total_terms = len(terms)
+    done = 0
+
+    async def search(search_term):
+        nonlocal done
+        rows = await fetch_search_rows_async(client, search_term)
+        done += 1
+        logger.info(f"[{done}/{total_terms}] Searched: {search_term}")
+        return rows
+
+    retry_policy = RetryPolicy(HTTP_RETRIES, HTTP_BACKOFF)
+    async with AsyncHttpClient(concurrency, rate, burst, retry_policy=retry_policy,
+                               cache=cache, offline=offline) as client:
+        rows = await asyncio.gather(*(search(search_term) for search_term in terms))
+    logger.info(f"HTTP: {format_stats(client.stats)}")
+    return dict(zip(terms, rows))
+
+def search_all_sequential(names, variations, cache=None, offline=False):
+    """
+    Fetch the planned search terms one request at a time, company by company
+
+    Args:
+        names: Booth -> company name
+        variations: Booth -> search variations, from plan_searches
+        cache: ResponseCache to serve and store search pages
+        offline: Serve search pages only from the cache
+
+    Returns:
+        Search term -> parsed rows (None if the search failed)
+    """
+    rows_by_term = {}
+    total_companies = len(names)
+    retry_policy = RetryPolicy(HTTP_RETRIES, HTTP_BACKOFF)
+    with HttpClient(retry_policy=retry_policy, cache=cache, offline=offline) as client:
+        for i, (booth, company) in enumerate(names.items(), 1):
+            logger.info(f"[{i}/{total_companies}] Searching: {company} (Booth {booth})")
+            company_sent = client.stats['network_requests']
+            for search_term in variations[booth]:
+                # Fetched for an earlier company (or variation) already
+                if search_term in rows_by_term:
+                    continue
+                sent = client.stats['network_requests']
+                rows_by_term[search_term] = fetch_search_rows(client, search_term)
+                # Cached pages cost the site nothing, so only pause after real requests
+                if client.stats['network_requests'] > sent:
+                    time.sleep(0.5)
+            if client.stats['network_requests'] > company_sent:
+                time.sleep(1)
+    logger.info(f"HTTP: {format_stats(client.stats)}")
+    return rows_by_term
+
+def load_company_list(path):
+    """Read company names to screen, one per line (blank lines and # comments skipped)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        names = [line.strip() for line in f]
+    names = [name for name in names if name and not name.startswith('#')]
+    return {str(n): name for n, name in enumerate(names, 1)}
+
+def build_catalog_params(page):
+    """Query parameters of one page of the unfiltered company table"""
+    params = build_search_params('')
+    params[CATALOG_PAGE_PARAM] = page
+    return params
+
+def parse_catalog_page(response):
+    """Catalog rows and reported total of a table page (rows None if the request failed)"""
+    if response.status != 200:
+        return None, None
+    soup = BeautifulSoup(response.text, 'html.parser')
+    rows = parse_search_rows(soup, '')
+    for row in rows:
+        del row['search_term']
+    return rows, parse_results_number(soup)
+
+def fetch_catalog_page(client, page):
+    try:
+        return parse_catalog_page(client.get(SEARCH_URL, params=build_catalog_params(page)))
+    except requests.RequestException as e:
+        logger.error(f"Error fetching catalog page {page}: {e}")
+        return None, None
+
+async def fetch_catalog_page_async(client, page):
+    try:
+        return parse_catalog_page(await client.get(SEARCH_URL, params=build_catalog_params(page)))
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Error fetching catalog page {page}: {e!r}")
+        return None, None
+
+def catalog_page_count(first_rows, total, max_pages):
+    """Pages to crawl, from the first page's size and the reported total (None if unknown)"""
+    if not first_rows or total is None:
+        return None
+    return min(max_pages, math.ceil(total / len(first_rows)))
+
+async def crawl_catalog_async(concurrency, rate, burst, cache=None, offline=False, max_pages=CATALOG_MAX_PAGES):
+    """
+    Crawl the complete company table, fetching pages concurrently
+
+    The first page tells the page size and the total, so all other pages are
+    requested at once; without a total, pages are followed until one is empty.
+
+    Returns:
+        (rows of each page in page order, None for failed pages; reported total)
+    """
+    async def page_rows(page):
+        rows, _ = await fetch_catalog_page_async(client, page)
+        logger.debug(f"Catalog page {page}: {len(rows) if rows is not None else 'failed'}")
+        return rows
+
+    retry_policy = RetryPolicy(HTTP_RETRIES, HTTP_BACKOFF)
+    async with AsyncHttpClient(concurrency, rate, burst, retry_policy=retry_policy,
+                               cache=cache, offline=offline) as client:
+        first_rows, total = await fetch_catalog_page_async(client, 1)
+        pages = [first_rows]
+        page_count = catalog_page_count(first_rows, total, max_pages)
+        if page_count is not None:
+            logger.info(f"Catalog: {total} companies on {page_count} pages")
+            pages += await asyncio.gather(*(page_rows(page) for page in range(2, page_count + 1)))
+        elif first_rows:
+            for page in range(2, max_pages + 1):
+                rows = await page_rows(page)
+                pages.append(rows)
+                if not rows:
+                    break
+    logger.info(f"HTTP: {format_stats(client.stats)}")
+    return pages, total
+
+def crawl_catalog_sequential(cache=None, offline=False, max_pages=CATALOG_MAX_PAGES):
+    """Crawl the complete company table one page at a time; returns the same as crawl_catalog_async"""
+    retry_policy = RetryPolicy(HTTP_RETRIES, HTTP_BACKOFF)
+    with HttpClient(retry_policy=retry_policy, cache=cache, offline=offline) as client:
+        first_rows, total = fetch_catalog_page(client, 1)
+        pages = [first_rows]
+        page_count = catalog_page_count(first_rows, total, max_pages)
+        if page_count is not None:
+            logger.info(f"Catalog: {total} companies on {page_count} pages")
+        page = 2
+        while first_rows and page <= (page_count or max_pages):
+            sent = client.stats['network_requests']
+            rows, _ = fetch_catalog_page(client, page)
+            pages.append(rows)
+            if page_count is None and not rows:
+                break
+            # Cached pages cost the site nothing, so only pause after real requests
+            if client.stats['network_requests'] > sent:
+                time.sleep(0.5)
+            page += 1
+    logger.info(f"HTTP: {format_stats(client.stats)}")
+    return pages, total
+
+def merge_catalog_pages(pages):
+    """Catalog companies of all pages in page order, each company once"""
+    entries = []
+    seen = set()
+    for rows in pages:
+        for row in rows or ():
+            if row['company_name'] not in seen:
+                seen.add(row['company_name'])
+                entries.append(row)
+    return entries
+
+def load_catalog_index(refresh=False, cache=None, offline=False):
+    """
+    Load the local catalog into a token index, crawling it first if it is missing
+
+    Args:
+        refresh: Crawl again even if a catalog exists
+        cache: ResponseCache for the page fetches
+        offline: Crawl only from the response cache
+
+    Returns:
+        CatalogIndex, or None if the crawl failed
+    """
+    if os.path.exists(CATALOG_PATH) and not refresh:
         try:
-            logger.debug(f"Searching with term: {search_term}")
-            response = requests.get(base_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                table = soup.find('table', class_='search-tbl')
-                
-                if table:
-                    tbody = table.find('tbody')
-                    if tbody:
-                        rows = tbody.find_all('tr')
-                        
-                        for row in rows:
-                            cols = row.find_all('td')
-                            if len(cols) >= 5:
-                                company_info = {
-                                    'company_name': cols[1].get_text(strip=True),
-                                    'traded_in': cols[2].get_text(strip=True),
-                                    'headquarters': cols[3].get_text(strip=True),
-                                    'involvement': cols[4].get_text(strip=True),
-                                    'search_term': search_term
-                                }
-                                
-                                company_lower = company_info['company_name'].lower()
-                                search_lower = search_term.lower()
-                                
-                                if (search_lower in company_lower or 
-                                    any(word in company_lower for word in search_lower.split()) or
-                                    search_lower.split()[0] in company_lower):
-                                    
-                                    if not any(r['company_name'] == company_info['company_name'] for r in all_results):
-                                        all_results.append(company_info)
-                
-                if not all_results:
-                    results_number = soup.find('h5', class_='search-results-number')
-                    if results_number and results_number.get_text(strip=True) == '0':
-                        continue
-                        
-        except requests.RequestException as e:
-            logger.error(f"Error searching for {search_term}: {e}")
-        
-        time.sleep(0.5)
-    
-    return all_results
+            entries, catalog_metadata = load_catalog(CATALOG_PATH)
+        except ValueError as e:
+            logger.warning(f"{e}, crawling again")
+        else:
+            logger.info(f"Catalog: {len(entries)} companies from {CATALOG_PATH} "
+                        f"(crawled {catalog_metadata.get('crawl_date')})")
+            return CatalogIndex(entries)
+
+    logger.info("Crawling the Who Profits company table...")
+    if SEARCH_CONCURRENCY > 0 and aiohttp is not None:
+        pages, total = asyncio.run(crawl_catalog_async(SEARCH_CONCURRENCY, SEARCH_RATE, SEARCH_BURST,
+                                                       cache=cache, offline=offline))
+    else:
+        pages, total = crawl_catalog_sequential(cache=cache, offline=offline)
+
+    failed_pages = [page for page, rows in enumerate(pages, 1) if rows is None]
+    entries = merge_catalog_pages(pages)
+    if failed_pages or not entries:
+        # Keep any previous catalog rather than replacing it with a partial one
+        logger.error(f"Catalog crawl failed (pages {failed_pages or [1]}), catalog not saved")
+        return None
+    if total is not None and len(entries) < total:
+        # Typically every page came back as page 1 and deduplicated away
+        logger.error(f"Catalog crawl found {len(entries)} of {total} companies, catalog not saved; "
+                     f"check that CATALOG_PAGE_PARAM={CATALOG_PAGE_PARAM} selects the page")
+        return None
+
+    save_catalog(CATALOG_PATH, entries, {
+        'crawl_date': datetime.now().isoformat(),
+        'pages': len(pages),
+        'reported_total': total,
+    })
+    logger.info(f"Catalog of {len(entries)} companies saved to {CATALOG_PATH}")
+    return CatalogIndex(entries)
+
 
 def main():
     """Main function to search all companies and save results"""
+    parser = argparse.ArgumentParser(description="Search Who Profits for the booth companies")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve search pages only from the response cache, sending no requests")
+    parser.add_argument('--no-cache', action='store_true', help="Neither read nor write the response cache")
+    parser.add_argument('--catalog', action='store_true',
+                        help="Match against the local copy of the whole Who Profits table (crawled once) "
+                             "instead of searching for each company")
+    parser.add_argument('--refresh-catalog', action='store_true', help="Crawl the catalog again (implies --catalog)")
+    parser.add_argument('--companies-file',
+                        help="Screen the company names in this file, one per line, instead of the booth list")
+    args = parser.parse_args()
+    args.catalog = args.catalog or args.refresh_catalog
+    
+    if args.offline and (args.no_cache or not HTTP_CACHE_PATH):
+        parser.error("--offline needs the response cache")
+    
     logger.info("Starting Who Profits search...")
     
     # Ensure output directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
+    names = load_company_list(args.companies_file) if args.companies_file else companies
+    
     results = {}
     metadata = {
         'search_date': datetime.now().isoformat(),
-        'total_companies': len(companies),
+        'total_companies': len(names),
         'companies_found': 0,
         'companies_not_found': 0
     }
     
-    total_companies = len(companies)
+    total_companies = len(names)
     
     logger.info(f"Searching {total_companies} companies...")
     print("-" * 50)
     
-    for i, (booth, company) in enumerate(companies.items(), 1):
-        logger.info(f"[{i}/{total_companies}] Searching: {company} (Booth {booth})")
-        
-        company_results = search_who_profits(company)
+    cache = None
+    if HTTP_CACHE_PATH and not args.no_cache:
+        cache = ResponseCache(HTTP_CACHE_PATH, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024)
+        logger.info(f"Response cache: {HTTP_CACHE_PATH} ({len(cache)} pages)"
+                    f"{', offline' if args.offline else ''}")
+    
+    variations, terms = plan_searches(names)
+    planned_searches = sum(len(search_variations) for search_variations in variations.values())
+    requests_saved = planned_searches - len(terms)
+    logger.info(f"Search plan: {len(terms)} distinct terms for {planned_searches} searches "
+                f"({requests_saved} requests saved)")
+    
+    if args.catalog:
+        index = load_catalog_index(refresh=args.refresh_catalog, cache=cache, offline=args.offline)
+        if index is None:
+            sys.exit(1)
+        # Every planned search becomes a local lookup, so all of them are saved
+        rows_by_term = {search_term: index.lookup(search_term) for search_term in terms}
+        requests_saved = planned_searches
+        logger.info(f"Matched {len(terms)} search terms against {len(index)} catalog companies")
+    elif SEARCH_CONCURRENCY > 0 and aiohttp is not None:
+        logger.info(f"Concurrent search: {SEARCH_CONCURRENCY} requests in flight, "
+                    f"{SEARCH_RATE} requests/s (bursts of {SEARCH_BURST})")
+        rows_by_term = asyncio.run(search_all_async(terms, SEARCH_CONCURRENCY, SEARCH_RATE, SEARCH_BURST,
+                                                    cache=cache, offline=args.offline))
+    else:
+        if SEARCH_CONCURRENCY > 0:
+            logger.warning("aiohttp is not installed, searching sequentially")
+        rows_by_term = search_all_sequential(names, variations, cache=cache, offline=args.offline)
+    
+    found = fan_out(variations, rows_by_term)
+    
+    for booth, company in names.items():
+        company_results = found[booth]
         
         if company_results:
             results[booth] = {
@@ -237,7 +602,7 @@ def main():
                 'matches': company_results
             }
             metadata['companies_found'] += 1
-            logger.info(f"  ✓ Found {len(company_results)} match(es)")
+            logger.info(f"  ✓ {company}: found {len(company_results)} match(es)")
         else:
             results[booth] = {
                 'company_name': company,
@@ -245,9 +610,7 @@ def main():
                 'matches': []
             }
             metadata['companies_not_found'] += 1
-            logger.info(f"  ✗ No matches found")
-        
-        time.sleep(1)
+            logger.info(f"  ✗ {company}: no matches found")
     
     # Create timestamped filename
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -276,6 +639,10 @@ def main():
     print(f"  Companies searched: {metadata['total_companies']}")
     print(f"  Companies found in Who Profits: {metadata['companies_found']}")
     print(f"  Companies not found: {metadata['companies_not_found']}")
+    if args.catalog:
+        print(f"  Search terms matched locally: {len(terms)} ({requests_saved} search requests saved)")
+    else:
+        print(f"  Search terms fetched: {len(terms)} of {planned_searches} ({requests_saved} requests saved)")
     
     # Print list of companies found
     if metadata['companies_found'] > 0:
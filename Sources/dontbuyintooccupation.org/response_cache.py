@@ -0,0 +1,198 @@
+"""
+HTTP Response Cache
+
+This module keeps successful HTTP responses in a SQLite file, so reruns of
+the scraper (and iterations on its parsing code) read search pages from disk
+instead of downloading them again.
+
+Entries are keyed on the URL and its query parameters, in sorted order.
+An entry younger than the TTL is served as is; an older one is revalidated
+with a conditional request (If-None-Match / If-Modified-Since) when the
+server sent an ETag or Last-Modified, so an unchanged page costs a 304 with
+no body. Bodies are zlib compressed, and the total size of the stored bodies
+is kept under a limit by evicting the least recently used entries after each
+write. The file runs in incremental auto-vacuum mode, so the pages freed by an
+eviction are given back and the file stays close to that limit (plus URLs,
+validators and the index, a few hundred bytes per entry).
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Bump when the table layout changes; older tables are dropped
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Fast zlib: HTML shrinks several times over for well under a ms per page
+COMPRESS_LEVEL = 1
+
+# PRAGMA auto_vacuum value of INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class CachedResponse(NamedTuple):
+    """A stored response and the validators to revalidate it with"""
+
+    key: str
+    status: int
+    encoding: Optional[str]
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Headers of a conditional request for this response"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite-backed HTTP response cache with a TTL and size-based LRU eviction"""
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            path: SQLite file holding the cache (created if missing)
+            ttl: Seconds an entry is served without asking the server
+            max_bytes: Total size of stored (compressed) bodies the cache is trimmed to after each write
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit: every write is its own small transaction
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        # Lets evict() shrink the file; an existing file only switches modes with a VACUUM
+        if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            self._conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+            self._conn.execute("VACUUM")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_table()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _create_table(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_FORMAT_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS responses")
+            self._conn.execute(f"PRAGMA user_version = {CACHE_FORMAT_VERSION}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                encoding TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+
+    @staticmethod
+    def request_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """URL with its query parameters in sorted order"""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def key(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Cache key of a request"""
+        return hashlib.sha256(self.request_url(url, params).encode('utf-8')).hexdigest()[:32]
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[CachedResponse]:
+        """
+        Look up a request, whatever the age of its entry
+
+        Args:
+            url: Request URL
+            params: Query parameters
+
+        Returns:
+            The stored response (check is_fresh() before serving it), or None
+        """
+        key = self.key(url, params)
+        row = self._conn.execute(
+            "SELECT status, encoding, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        status, encoding, body, etag, last_modified, stored_at = row
+        return CachedResponse(key, status, encoding, zlib.decompress(body), etag, last_modified, stored_at)
+
+    def put(self, url: str, params: Optional[Dict[str, Any]], status: int, encoding: Optional[str],
+            body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a response, replacing any previous entry for the request"""
+        key = self.key(url, params)
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        now = time.time()
+
+        previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, url, status, encoding, body, size, etag, last_modified, stored_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, self.request_url(url, params), status, encoding, compressed, len(compressed),
+             etag, last_modified, now, now)
+        )
+        self._size += len(compressed) - (previous[0] if previous else 0)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def refresh(self, key: str):
+        """Restart the TTL of an entry the server confirmed unchanged (304)"""
+        self._conn.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes, and shrink the file"""
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= size
+            evicted += 1
+        if evicted:
+            # Give the freed pages back; execute() would only free one per call,
+            # as it steps the result-less pragma just once
+            self._conn.executescript("PRAGMA incremental_vacuum")
+            logger.debug(f"Evicted {evicted} cached responses")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total size of the stored (compressed) bodies in bytes"""
+        return self._size
+
+    def close(self):
+        self._conn.close()
@@ -8,27 +8,85 @@ const pool = new Pool({
   ssl: process.env.NODE_ENV === 'production' ? { rejectUnauthorized: false } : false
 });
 
+// Same lookups as suggest_companies() in Sources/Unified/company_search.py,
+// served by the indexes from database_schema.create_search_indexes
+const LIMIT = 10;
+// Shorter queries have no complete trigram, so only prefixes can use an index
+const MIN_TRIGRAM_LENGTH = 3;
+// Substring matches per column taken from the trigram index before ranking
+const SUBSTRING_CANDIDATES = 200;
+
+// Prefix matches on name, standard name and aliases, in alphabetical order
+const PREFIX_QUERY = `
+  SELECT c.id, c.name
+  FROM (
+    (SELECT id, lower(name) AS matched FROM companies
+     WHERE lower(name) LIKE $1 ORDER BY lower(name) USING ~<~ LIMIT $2)
+    UNION ALL
+    (SELECT id, lower(standard_name) FROM companies
+     WHERE lower(standard_name) LIKE $1 ORDER BY lower(standard_name) USING ~<~ LIMIT $2)
+    UNION ALL
+    (SELECT company_id, lower(alias) FROM company_aliases
+     WHERE lower(alias) LIKE $1 ORDER BY lower(alias) USING ~<~ LIMIT $2)
+  ) m
+  JOIN companies c ON c.id = m.id
+  GROUP BY c.id
+  ORDER BY min(m.matched COLLATE "C"), c.id
+  LIMIT $2
+`;
+
+// Substring matches, shortest names first, ranked over the first $3 matches per column
+const SUBSTRING_QUERY = `
+  SELECT c.id, c.name
+  FROM companies c
+  WHERE c.id IN (
+    (SELECT id FROM (SELECT id, name AS matched, row_number() OVER () AS n FROM companies
+                     WHERE name ILIKE $1) m
+     WHERE n <= $3 ORDER BY length(matched), matched, id LIMIT $2)
+    UNION
+    (SELECT id FROM (SELECT id, standard_name AS matched, row_number() OVER () AS n FROM companies
+                     WHERE standard_name ILIKE $1) m
+     WHERE n <= $3 ORDER BY length(matched), matched, id LIMIT $2)
+    UNION
+    (SELECT id FROM (SELECT company_id AS id, alias AS matched, row_number() OVER () AS n
+                     FROM company_aliases WHERE alias ILIKE $1) m
+     WHERE n <= $3 ORDER BY length(matched), matched, id LIMIT $2)
+  )
+  ORDER BY length(c.name), c.name, c.id
+  LIMIT $2
+`;
+
+// Escape LIKE wildcards so user input matches literally
+function escapeLike(text: string) {
+  return text.replace(/[\\%_]/g, (char) => `\\${char}`);
+}
+
 export async function GET({ url }) {
   try {
-    const search = url.searchParams.get('q') || '';
+    const search = (url.searchParams.get('q') || '').trim();
 
     if (search.length < 2) {
       return json([]);
     }
 
-    const query = `
-      SELECT DISTINCT c.name, c.id
-      FROM companies c
-      WHERE c.name ILIKE $1
-      ORDER BY c.confidence_score DESC NULLS LAST, c.name
-      LIMIT 10
-    `;
+    const escaped = escapeLike(search);
+    const prefixResult = await pool.query(PREFIX_QUERY, [`${escaped.toLowerCase()}%`, LIMIT]);
+    const suggestions = prefixResult.rows;
 
-    const result = await pool.query(query, [`%${search}%`]);
+    if (suggestions.length < LIMIT && search.length >= MIN_TRIGRAM_LENGTH) {
+      const found = new Set(suggestions.map((row) => row.id));
+      const limit = LIMIT + found.size;
+      const substringResult = await pool.query(SUBSTRING_QUERY, [
+        `%${escaped}%`,
+        limit,
+        Math.max(SUBSTRING_CANDIDATES, limit)
+      ]);
+      suggestions.push(...substringResult.rows.filter((row) => !found.has(row.id)));
+    }
 
-    return json(result.rows);
+    return json(suggestions.slice(0, LIMIT));
   } catch (error) {
     console.error('Error fetching suggestions:', error);
     return json({ error: 'Internal server error' }, { status: 500 });
   }
-}
\ No newline at end of file
+}